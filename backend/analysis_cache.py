@@ -0,0 +1,124 @@
+# backend/analysis_cache.py - Dauerhafter Cache für analyze_news-Ergebnisse (SQLite, Schlüssel = Inhalts-Hash)
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+
+ANALYSIS_CACHE_ENABLED = os.environ.get("ANALYSIS_CACHE_ENABLED", "1") == "1"
+ANALYSIS_CACHE_DB = Path(os.environ.get("ANALYSIS_CACHE_DB", Path(__file__).parent.parent / "data" / "analysis_cache.db"))
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.environ.get("ANALYSIS_CACHE_MAX_ENTRIES", "50000"))
+ANALYSIS_CACHE_MAX_AGE_DAYS = float(os.environ.get("ANALYSIS_CACHE_MAX_AGE_DAYS", "30"))
+# Eviction nicht bei jedem Schreiben, sondern alle N neuen Einträge
+EVICT_EVERY = 200
+
+
+def normalize_text(text: str) -> str:
+    """Unicode-normalized, lower-cased, whitespace-collapsed – trivial formatting changes hit the same entry."""
+    return " ".join(unicodedata.normalize("NFKC", text or "").lower().split())
+
+
+class AnalysisCache:
+    """SQLite-backed ``key → analysis dict`` store with age and size based eviction.
+
+    Entries older than ``max_age_days`` are dropped; beyond ``max_entries``
+    the least recently used ones go first. One connection is shared by all
+    threads behind a lock (lookups take microseconds).
+    """
+
+    def __init__(self, path: Path = ANALYSIS_CACHE_DB, max_entries: int = ANALYSIS_CACHE_MAX_ENTRIES,
+                 max_age_days: float = ANALYSIS_CACHE_MAX_AGE_DAYS):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_days * 86400
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evicted = 0
+        self.lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS analyses ("
+            " key TEXT PRIMARY KEY, result TEXT NOT NULL, model TEXT, prompt_version TEXT,"
+            " created_at REAL NOT NULL, last_used REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS analyses_last_used ON analyses (last_used)")
+        self.evict()
+
+    @staticmethod
+    def key(title: str, description: str, body: str = None, model: str = "", prompt_version: str = "") -> str:
+        parts = [normalize_text(title), normalize_text(description), normalize_text(body), model, prompt_version]
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT result, created_at FROM analyses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.max_age_seconds:
+                self.misses += 1
+                return None
+            self.conn.execute("UPDATE analyses SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, result: dict, model: str = None, prompt_version: str = None):
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO analyses (key, result, model, prompt_version, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)", (key, json.dumps(result), model, prompt_version, now, now))
+            self.writes += 1
+            due = self.writes % EVICT_EVERY == 0
+        if due:
+            self.evict()
+
+    def evict(self) -> int:
+        """Drop expired entries, then the least recently used ones above ``max_entries``."""
+        with self.lock:
+            removed = self.conn.execute("DELETE FROM analyses WHERE created_at < ?",
+                                        (time.time() - self.max_age_seconds,)).rowcount
+            excess = self.conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0] - self.max_entries
+            if excess > 0:
+                removed += self.conn.execute(
+                    "DELETE FROM analyses WHERE key IN (SELECT key FROM analyses ORDER BY last_used LIMIT ?)",
+                    (excess,)).rowcount
+            self.evicted += removed
+        return removed
+
+    def stats(self) -> dict:
+        with self.lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {"entries": entries, "hits": self.hits, "misses": self.misses,
+                    "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                    "writes": self.writes, "evicted": self.evicted}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Process-wide cache, or None if disabled via ``ANALYSIS_CACHE_ENABLED=0``."""
+    global _cache
+    if not ANALYSIS_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = AnalysisCache()
+        return _cache
+
+
+def report_cache():
+    if _cache is None:
+        return
+    s = _cache.stats()
+    print(f"🗄️  Analysis cache: {s['hits']} hits, {s['misses']} misses ({s['hit_rate']:.0%}), "
+          f"{s['entries']} entries, {s['evicted']} evicted")
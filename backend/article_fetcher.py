@@ -0,0 +1,276 @@
+# backend/article_fetcher.py - Volltexte der Artikel laden (async, Limits pro Domain) mit inhaltsadressiertem Disk-Cache
+
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import urlsplit
+import requests
+from finnhub_client import get_session
+from http_client import get_client
+from dedup import canonical_url
+
+# === 1) Konfiguration ===
+ARTICLE_BODY_ENABLED = os.environ.get("ARTICLE_BODY_ENABLED", "0") == "1"
+CACHE_DIR = Path(os.environ.get("ARTICLE_CACHE_DIR", Path(__file__).parent.parent / "data" / "article_cache"))
+BODY_CONCURRENCY = int(os.environ.get("ARTICLE_BODY_CONCURRENCY", "16"))
+BODY_PER_DOMAIN = int(os.environ.get("ARTICLE_BODY_PER_DOMAIN", "2"))
+# Obergrenze für Download und gespeicherten Text
+BODY_MAX_BYTES = int(os.environ.get("ARTICLE_BODY_MAX_BYTES", str(2 * 1024 * 1024)))
+BODY_MAX_CHARS = int(os.environ.get("ARTICLE_BODY_MAX_CHARS", "20000"))
+
+# Dauerhafte Fehler werden gecacht, vorübergehende (5xx, Timeouts) beim nächsten Lauf erneut versucht
+PERMANENT_STATUSES = {401, 403, 404, 410, 451}
+
+
+# === 2) Text-Extraktion ===
+class _TextExtractor(HTMLParser):
+    SKIP = {"script", "style", "noscript", "nav", "header", "footer", "aside", "form", "svg", "figure"}
+    BLOCKS = {"p", "h1", "h2", "h3", "li", "blockquote"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.skip_depth = 0
+        self.article_depth = 0
+        self.block = None
+        self.paragraphs = []  # (im <article>?, Text)
+        self.description = ""
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self.skip_depth += 1
+        elif tag == "article":
+            self.article_depth += 1
+        elif tag in self.BLOCKS and not self.skip_depth:
+            self.block = []
+        elif tag == "meta":
+            attrs = dict(attrs)
+            if attrs.get("property") == "og:description" or attrs.get("name") == "description":
+                self.description = self.description or (attrs.get("content") or "").strip()
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag == "article":
+            self.article_depth = max(0, self.article_depth - 1)
+        elif tag in self.BLOCKS and self.block is not None:
+            text = " ".join("".join(self.block).split())
+            if text:
+                self.paragraphs.append((self.article_depth > 0, text))
+            self.block = None
+
+    def handle_data(self, data):
+        if self.block is not None and not self.skip_depth:
+            self.block.append(data)
+
+
+def extract_text(html: str) -> str:
+    """Main text of a news page: paragraphs inside ``<article>`` if present, else all
+    paragraphs long enough to be prose (drops menus, bylines and cookie banners)."""
+    parser = _TextExtractor()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception:
+        pass
+    in_article = [text for inside, text in parser.paragraphs if inside]
+    paragraphs = in_article or [text for _, text in parser.paragraphs if len(text) >= 80]
+    text = "\n\n".join(paragraphs) or parser.description
+    return text[:BODY_MAX_CHARS]
+
+
+# === 3) Cache ===
+class ArticleCache:
+    """Content-addressed store: ``objects/`` holds gzip texts named by their SHA-256,
+    ``index/`` maps the hash of each canonical URL to an object (or a permanent error).
+
+    Syndicated copies of the same text under different URLs are stored once.
+    """
+
+    def __init__(self, directory: Path = CACHE_DIR):
+        self.directory = Path(directory)
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def url_key(url: str) -> str:
+        return hashlib.sha256(canonical_url(url).encode("utf-8")).hexdigest()
+
+    def _index_path(self, url: str) -> Path:
+        key = self.url_key(url)
+        return self.directory / "index" / key[:2] / f"{key}.json"
+
+    def _object_path(self, digest: str) -> Path:
+        return self.directory / "objects" / digest[:2] / f"{digest}.txt.gz"
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def lookup(self, url: str):
+        """Return ``(found, text)``; ``text`` is None for cached permanent failures."""
+        path = self._index_path(url)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            text = None
+            if entry.get("sha256"):
+                text = gzip.decompress(self._object_path(entry["sha256"]).read_bytes()).decode("utf-8")
+        except (OSError, ValueError):
+            with self.lock:
+                self.misses += 1
+            return False, None
+        with self.lock:
+            self.hits += 1
+        return True, text
+
+    def store(self, url: str, text: str = None, status: int = 200):
+        entry = {"url": url, "status": status, "fetched_at": datetime.now(timezone.utc).isoformat(), "sha256": None}
+        if text:
+            data = text.encode("utf-8")
+            entry["sha256"] = hashlib.sha256(data).hexdigest()
+            entry["chars"] = len(text)
+            obj = self._object_path(entry["sha256"])
+            if not obj.exists():
+                self._write_atomic(obj, gzip.compress(data))
+        self._write_atomic(self._index_path(url), json.dumps(entry).encode("utf-8"))
+        return entry["sha256"]
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+# === 4) Fetcher ===
+class ArticleFetcher:
+    """Downloads article pages with a global and a per-domain concurrency limit.
+
+    Coordination runs on an asyncio loop in a background thread; the
+    downloads themselves use the pooled ``requests`` session (via the
+    resilient client) in worker threads, so keep-alive connections are
+    reused. ``fetch`` can be called from any thread, ``fetch_many`` takes a
+    whole batch.
+    """
+
+    def __init__(self, cache: ArticleCache = None, concurrency: int = BODY_CONCURRENCY,
+                 per_domain: int = BODY_PER_DOMAIN, session: requests.Session = None):
+        self.cache = cache or ArticleCache()
+        self.concurrency = max(1, concurrency)
+        self.per_domain = max(1, per_domain)
+        self.session = session or get_session(self.concurrency)
+        self.stats = {"downloaded": 0, "failed": 0, "bytes": 0, "download_seconds": 0.0}
+        self.loop = asyncio.new_event_loop()
+        # Downloads und HTML-Parsing laufen in Threads, damit der Loop nur koordiniert
+        self.loop.set_default_executor(ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="article-download"))
+        self.thread = threading.Thread(target=self.loop.run_forever, name="article-fetcher", daemon=True)
+        self.thread.start()
+        self.global_limit = None
+        self.domain_limits = {}
+        asyncio.run_coroutine_threadsafe(self._init_limits(), self.loop).result()
+
+    async def _init_limits(self):
+        self.global_limit = asyncio.Semaphore(self.concurrency)
+
+    def _download(self, url: str):
+        resp = get_client(self.session).get(url, stream=True, headers={"Accept": "text/html"})
+        try:
+            if resp.status_code >= 400:
+                return resp.status_code, None
+            chunks, size = [], 0
+            for chunk in resp.iter_content(64 * 1024):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= BODY_MAX_BYTES:
+                    break
+            content = b"".join(chunks)
+            return resp.status_code, content.decode(resp.encoding or "utf-8", errors="replace")
+        finally:
+            resp.close()
+
+    async def _fetch(self, url: str):
+        # Cache-Zugriffe sind Datei-I/O (gzip) – im Executor, damit der Loop nicht blockiert
+        found, text = await self.loop.run_in_executor(None, self.cache.lookup, url)
+        if found:
+            return text
+
+        domain = urlsplit(url).netloc.lower()
+        limit = self.domain_limits.setdefault(domain, asyncio.Semaphore(self.per_domain))
+        # Erst das Domain-Limit, damit wartende Artikel einer Domain keine globalen Slots blockieren
+        async with limit, self.global_limit:
+            started = time.perf_counter()
+            try:
+                status, html = await self.loop.run_in_executor(None, self._download, url)
+            except Exception as e:
+                self.stats["failed"] += 1
+                print(f"⚠️  Article download failed for {url[:60]}: {e}")
+                return None
+            self.stats["download_seconds"] += time.perf_counter() - started
+
+        if html is None:
+            self.stats["failed"] += 1
+            if status in PERMANENT_STATUSES:
+                await self.loop.run_in_executor(None, self.cache.store, url, None, status)
+            return None
+        self.stats["downloaded"] += 1
+        self.stats["bytes"] += len(html)
+        return await self.loop.run_in_executor(None, self._extract_and_store, url, html, status)
+
+    def _extract_and_store(self, url: str, html: str, status: int):
+        text = extract_text(html)
+        self.cache.store(url, text, status)
+        return text or None
+
+    def fetch(self, url: str):
+        """Main text for ``url`` (from the cache if present), None if unavailable."""
+        if not url:
+            return None
+        return asyncio.run_coroutine_threadsafe(self._fetch(url), self.loop).result()
+
+    def fetch_many(self, urls: list) -> dict:
+        async def _all():
+            unique = list(dict.fromkeys(u for u in urls if u))
+            texts = await asyncio.gather(*(self._fetch(u) for u in unique))
+            return dict(zip(unique, texts))
+        return asyncio.run_coroutine_threadsafe(_all(), self.loop).result()
+
+    def attach_bodies(self, articles: list) -> list:
+        """Set ``article["body"]`` for every article whose page could be fetched."""
+        bodies = self.fetch_many([a.get("url", "") for a in articles])
+        for article in articles:
+            body = bodies.get(article.get("url", ""))
+            if body:
+                article["body"] = body
+        return articles
+
+    def report(self) -> dict:
+        s = dict(self.stats, cache_hits=self.cache.hits, cache_misses=self.cache.misses,
+                 hit_rate=round(self.cache.hit_rate(), 3))
+        print(f"📰 Article bodies: {s['downloaded']} downloaded ({s['bytes'] / 1024:,.0f} KiB), {s['failed']} failed, "
+              f"cache hit rate {s['hit_rate']:.0%} ({s['cache_hits']}/{s['cache_hits'] + s['cache_misses']})")
+        return s
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+
+def get_fetcher() -> ArticleFetcher:
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = ArticleFetcher()
+        return _fetcher
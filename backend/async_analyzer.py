@@ -0,0 +1,111 @@
+# backend/async_analyzer.py - Nebenläufige GPT-Analyse auf AsyncOpenAI (Semaphore, ein gemeinsamer Client, Timeouts)
+
+import asyncio
+import os
+import threading
+import openai
+from model_router import get_router
+from news_processor import (
+    OPENAI_API_KEY, build_prompt, get_fallback_analysis, lookup_analysis, request_analysis_async,
+    finish_analysis, analysis_failed,
+)
+
+ASYNC_ANALYSIS_CONCURRENCY = int(os.environ.get("ASYNC_ANALYSIS_CONCURRENCY", "8"))
+# Timeout pro Request; danach Fallback statt eines hängenden Batches
+ASYNC_ANALYSIS_TIMEOUT = float(os.environ.get("ASYNC_ANALYSIS_TIMEOUT", "60"))
+
+
+class AsyncAnalyzer:
+    """Runs ``analyze_news``-equivalent requests concurrently on one shared AsyncOpenAI client.
+
+    The event loop lives in a background thread, so ``analyze`` can be called
+    from any thread and ``analyze_many`` takes a whole batch. At most
+    ``concurrency`` requests are in flight; each one is bounded by
+    ``timeout``. Cache, fallback, usage and parsing use the same
+    ``news_processor`` helpers as ``analyze_news``; with
+    ``MODEL_ROUTING_ENABLED`` articles go through the model router instead,
+    on the same client and concurrency limit.
+    Results are the same dicts ``analyze_news`` returns, in input order.
+    """
+
+    def __init__(self, concurrency: int = ASYNC_ANALYSIS_CONCURRENCY, timeout: float = ASYNC_ANALYSIS_TIMEOUT,
+                 client=None):
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        # Ein Client = ein Connection-Pool für alle Requests; Retries übernimmt der Client selbst
+        if client is None and OPENAI_API_KEY:
+            client = openai.AsyncOpenAI(api_key=OPENAI_API_KEY, timeout=timeout, max_retries=2)
+        self.client = client
+        self.stats = {"requests": 0, "timeouts": 0, "failed": 0, "cached": 0, "peak_in_flight": 0}
+        self.in_flight = 0
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="async-analyzer", daemon=True)
+        self.thread.start()
+        self.limit = None
+        asyncio.run_coroutine_threadsafe(self._init_limit(), self.loop).result()
+
+    async def _init_limit(self):
+        self.limit = asyncio.Semaphore(self.concurrency)
+
+    async def _analyze(self, title: str, description: str, body: str = None) -> dict:
+        # MODEL_ROUTING_ENABLED: Triage/Eskalation (inkl. Cache pro Modell) wie im Sync-Pfad, auf demselben Client
+        router = get_router()
+        if not router:
+            cache_key, cached = lookup_analysis(title, description, body)
+            if cached:
+                self.stats["cached"] += 1
+                return cached
+            if not self.client:
+                return get_fallback_analysis(title, description)
+
+        async with self.limit:
+            self.in_flight += 1
+            self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self.in_flight)
+            try:
+                self.stats["requests"] += 1
+                if router:
+                    return await router.analyze_async(self.client, title, description, body, self.timeout)
+                parsed, _ = await request_analysis_async(self.client, build_prompt(title, description, body),
+                                                         timeout=self.timeout)
+            except asyncio.TimeoutError:
+                self.stats["timeouts"] += 1
+                return analysis_failed(title, description, f"timed out after {self.timeout:.0f}s")
+            except Exception as e:
+                self.stats["failed"] += 1
+                return analysis_failed(title, description, e)
+            finally:
+                self.in_flight -= 1
+        return finish_analysis(parsed, title, description, cache_key)
+
+    def analyze(self, title: str, description: str, body: str = None) -> dict:
+        return asyncio.run_coroutine_threadsafe(self._analyze(title, description, body), self.loop).result()
+
+    def analyze_many(self, articles: list) -> list:
+        """``(title, description[, body])`` tuples → result dicts in the same order."""
+        async def _all():
+            return await asyncio.gather(*(self._analyze(*article) for article in articles))
+        return asyncio.run_coroutine_threadsafe(_all(), self.loop).result()
+
+    def report(self) -> dict:
+        s = dict(self.stats, concurrency=self.concurrency)
+        print(f"⚡ Async analysis: {s['requests']} requests (peak {s['peak_in_flight']} in flight), "
+              f"{s['cached']} cached, {s['timeouts']} timeouts, {s['failed']} failed")
+        return s
+
+    def close(self):
+        if self.client is not None and hasattr(self.client, "close"):
+            asyncio.run_coroutine_threadsafe(self.client.close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+_analyzer = None
+_analyzer_lock = threading.Lock()
+
+
+def get_analyzer() -> AsyncAnalyzer:
+    global _analyzer
+    with _analyzer_lock:
+        if _analyzer is None:
+            _analyzer = AsyncAnalyzer()
+        return _analyzer
@@ -0,0 +1,198 @@
+# backend/backfill.py - Historischen Zeitraum nachladen: Datums-Chunks parallel, mit Checkpoints und ETA
+
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+import pandas as pd
+from finnhub_client import fetch_symbols, company_key, COMPANY_CONCURRENCY
+from fast_parse import payload_to_frame, dedupe_frame, frame_to_articles, iso_timestamps
+from rate_limiter import report_throttling
+from http_client import report_latency
+from bulk_analyzer import pending_analysis
+from news_ingest import (
+    FINNHUB_API_KEY, DATA_DIR, OUTPUT, ANALYZE_WORKERS, require_api_key, load_watchlist,
+    load_existing_entries, append_to_csv, analyze_article, load_near_index,
+)
+
+# Abgeschlossene Chunks; ein neuer Lauf mit gleichem Zeitraum/Watchlist setzt dort fort
+CHECKPOINT_FILE = Path(os.environ.get("BACKFILL_CHECKPOINT_FILE", DATA_DIR / "backfill_state.json"))
+CHUNK_DAYS = int(os.environ.get("BACKFILL_CHUNK_DAYS", "1"))
+CHUNK_WORKERS = int(os.environ.get("BACKFILL_WORKERS", "2"))
+
+
+# === 1) Chunks & Checkpoints ===
+def date_chunks(start: date, end: date, days: int = CHUNK_DAYS) -> list:
+    """Split ``[start, end]`` (inclusive) into consecutive ``(from, to)`` day ranges, newest first."""
+    chunks = []
+    cursor = start
+    while cursor <= end:
+        chunk_end = min(end, cursor + timedelta(days=max(1, days) - 1))
+        chunks.append((cursor, chunk_end))
+        cursor = chunk_end + timedelta(days=1)
+    return chunks[::-1]
+
+
+def chunk_id(chunk) -> str:
+    return f"{chunk[0].isoformat()}..{chunk[1].isoformat()}"
+
+
+def load_checkpoint(symbols: list, path: Path = CHECKPOINT_FILE) -> dict:
+    if path.exists():
+        checkpoint = json.loads(path.read_text(encoding="utf-8"))
+        if checkpoint.get("symbols") == symbols:
+            return checkpoint
+        print(f"⚠️  Watchlist changed since the last backfill – ignoring checkpoint {path}")
+    return {"symbols": symbols, "done": {}}
+
+
+def save_checkpoint(checkpoint: dict, path: Path = CHECKPOINT_FILE):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    checkpoint["updated_at"] = datetime.now(timezone.utc).isoformat()
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(checkpoint, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+# === 2) Backfill ===
+def backfill(start: date, end: date, symbols: list, chunk_days: int = CHUNK_DAYS, workers: int = CHUNK_WORKERS,
+             analyze_workers: int = ANALYZE_WORKERS, output: Path = OUTPUT, checkpoint_path: Path = CHECKPOINT_FILE,
+             reuse_near_duplicates: bool = False, dry_run: bool = False, defer_analysis: bool = False) -> dict:
+    """Fetch ``/company-news`` for ``symbols`` chunk by chunk, analyze and append to ``output``.
+
+    Chunks run on a worker pool and share one analysis pool; Finnhub and
+    OpenAI calls go through the provider rate limiters. A chunk is recorded
+    in the checkpoint only after all of its articles were fetched, analyzed
+    and written, so a rerun resumes at unfinished chunks and retries failed
+    analyses. With ``defer_analysis``
+    articles are written with a placeholder for ``bulk_analyzer.py run``.
+    """
+    checkpoint = load_checkpoint(symbols, checkpoint_path)
+    chunks = [c for c in date_chunks(start, end, chunk_days) if chunk_id(c) not in checkpoint["done"]]
+    skipped = len(date_chunks(start, end, chunk_days)) - len(chunks)
+    print(f"🗓️  Backfill {start} → {end}: {len(chunks)} chunks of {chunk_days} day(s) for {len(symbols)} symbols"
+          + (f" ({skipped} already done)" if skipped else ""))
+
+    existing_entries = load_existing_entries(output)
+    near_index = load_near_index(output) if reuse_near_duplicates else None
+    lock = threading.Lock()
+    totals = {"chunks": 0, "fetched": 0, "new": 0, "analyzed": 0, "failed": 0, "fetch_errors": 0}
+    started = time.perf_counter()
+
+    def _analyze(article):
+        try:
+            if defer_analysis:
+                article.update(pending_analysis(article.get("headline", "")))
+            else:
+                analyze_article(article, near_index)
+            return article, None
+        except Exception as e:
+            return article, e
+
+    def _run_chunk(chunk, analysis_pool) -> dict:
+        date_range = (chunk[0].isoformat(), chunk[1].isoformat())
+        results = fetch_symbols(symbols, FINNHUB_API_KEY, {s: date_range for s in symbols}, COMPANY_CONCURRENCY)
+        frames, errors = [], 0
+        for symbol, payload in results.items():
+            if isinstance(payload, Exception):
+                print(f"❌ {symbol} {date_range[0]}: {payload}")
+                errors += 1
+                continue
+            frames.append(payload_to_frame(payload, company_key(symbol)))
+        # Symbole spaltenweise parsen und zusammenführen, erst danach Artikel-Dicts bauen
+        df = dedupe_frame(pd.concat(frames, ignore_index=True)) if frames else pd.DataFrame()
+        articles = frame_to_articles(df)
+
+        # Bereits gespeicherte Artikel (z.B. aus einem abgebrochenen Lauf) nicht erneut analysieren
+        published = iso_timestamps(df["datetime"].to_numpy()) if articles else []
+        with lock:
+            fresh = [a for a, p in zip(articles, published)
+                     if (a.get("headline", "").strip(), p) not in existing_entries]
+
+        analyzed, failed = [], 0
+        if not dry_run:
+            for article, error in analysis_pool.map(_analyze, fresh):
+                if error:
+                    print(f"❌ Analysis failed: {article.get('headline', '')[:30]}... Error: {error}")
+                    failed += 1
+                else:
+                    analyzed.append(article)
+            analyzed.sort(key=lambda x: x.get("datetime", 0), reverse=True)
+            with lock:
+                append_to_csv(analyzed, output, existing_entries)
+        return {"fetched": len(articles), "new": len(fresh), "analyzed": len(analyzed),
+                "failed": failed, "fetch_errors": errors}
+
+    with ThreadPoolExecutor(max_workers=max(1, analyze_workers), thread_name_prefix="backfill-analyze") as analysis_pool, \
+            ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="backfill-chunk") as chunk_pool:
+        futures = {chunk_pool.submit(_run_chunk, chunk, analysis_pool): chunk for chunk in chunks}
+        try:
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"❌ Chunk {chunk_id(chunk)} failed: {e} – will be retried on the next run")
+                    continue
+
+                with lock:
+                    for k, v in result.items():
+                        totals[k] += v
+                    totals["chunks"] += 1
+                    # Chunks mit Fetch- oder Analysefehlern bleiben offen; der nächste Lauf holt sie erneut
+                    # und analysiert nur die noch nicht gespeicherten Artikel
+                    if not result["fetch_errors"] and not result["failed"] and not dry_run:
+                        checkpoint["done"][chunk_id(chunk)] = result
+                        save_checkpoint(checkpoint, checkpoint_path)
+
+                elapsed = time.perf_counter() - started
+                remaining = len(chunks) - totals["chunks"]
+                eta = elapsed / totals["chunks"] * remaining
+                print(f"⏳ {totals['chunks']}/{len(chunks)} chunks ({chunk_id(chunk)}: {result['new']} new, "
+                      f"{result['analyzed']} analyzed) – {totals['analyzed'] / elapsed:.2f} articles/s, "
+                      f"ETA {timedelta(seconds=int(eta))}")
+        except KeyboardInterrupt:
+            print("🛑 Interrupted – finished chunks are checkpointed, rerun the same command to resume.")
+            for future in futures:
+                future.cancel()
+            raise
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Backfill finished: {totals['chunks']}/{len(chunks)} chunks, {totals['fetched']} fetched, "
+          f"{totals['new']} new, {totals['analyzed']} analyzed, {totals['failed']} failed, "
+          f"{totals['fetch_errors']} fetch errors in {elapsed:.1f}s")
+    if totals["failed"] or totals["fetch_errors"]:
+        print("🔁 Chunks with errors were not checkpointed – rerun the same command to retry them.")
+    report_throttling()
+    report_latency()
+    return totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill news_analysis_results.csv with Finnhub company news for a past date range.")
+    parser.add_argument("--start", type=date.fromisoformat, required=True, help="First day (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, help="Last day (YYYY-MM-DD), defaults to yesterday")
+    parser.add_argument("--symbols", help="Comma-separated symbols (default: watchlist)")
+    parser.add_argument("--chunk-days", type=int, default=CHUNK_DAYS, help="Days per chunk")
+    parser.add_argument("--workers", type=int, default=CHUNK_WORKERS, help="Chunks processed in parallel")
+    parser.add_argument("--analyze-workers", type=int, default=ANALYZE_WORKERS, help="Parallel analyses across all chunks")
+    parser.add_argument("--output", type=Path, default=OUTPUT)
+    parser.add_argument("--checkpoint", type=Path, default=CHECKPOINT_FILE)
+    parser.add_argument("--reuse-near-duplicates", action="store_true",
+                        help="Reuse analyses of near-duplicate stories instead of re-analyzing them")
+    parser.add_argument("--dry-run", action="store_true", help="Only fetch and count, do not analyze or checkpoint")
+    parser.add_argument("--defer-analysis", action="store_true",
+                        help="Write placeholders and analyze later in bulk (bulk_analyzer.py run)")
+    args = parser.parse_args()
+
+    require_api_key()
+    symbols = [s.strip().upper() for s in args.symbols.split(",")] if args.symbols else load_watchlist()
+    if not symbols:
+        parser.error("no symbols – pass --symbols or fill the watchlist")
+    end = args.end or (date.today() - timedelta(days=1))
+    backfill(args.start, end, symbols, args.chunk_days, args.workers, args.analyze_workers, args.output,
+             args.checkpoint, args.reuse_near_duplicates, args.dry_run, args.defer_analysis)
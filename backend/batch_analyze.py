@@ -1,12 +1,16 @@
+import os
 import pandas as pd
 from news_fetcher import fetch_news
-from news_processor import analyze_news
+from news_processor import analyze_news_batch
+from async_analyzer import get_analyzer
 from pathlib import Path
 
 # Pfad zur Ausgabedatei
 output_path = Path("data/news_analysis_results.csv")
+# "batch": mehrere Artikel pro Request, "async": ein Request pro Artikel, nebenläufig
+ANALYZE_MODE = os.environ.get("BATCH_ANALYZE_MODE", "batch")
 
-def analyze_all():
+def analyze_all(mode=ANALYZE_MODE):
     print("Das Skript läuft...")
 
     # Nachrichten abrufen
@@ -18,14 +22,22 @@ def analyze_all():
 
     print(f"{len(df)} Nachrichten gespeichert in data/latest_news.csv")
 
+    rows = [row for _, row in df.iterrows()]
+    items = [(row.get("title", ""), row.get("description", "")) for row in rows]
+    # Reihenfolge der Ergebnisse entspricht in beiden Modi der Eingabe
+    if mode == "async":
+        print(f"Analysiere {len(rows)} Nachrichten nebenläufig...")
+        analyses = get_analyzer().analyze_many(items)
+        get_analyzer().report()
+    else:
+        print(f"Analysiere {len(rows)} Nachrichten in Batches...")
+        analyses = analyze_news_batch(items)
+
     results = []
 
-    for i, row in df.iterrows():
+    for row, result in zip(rows, analyses):
         title = row.get("title", "")
         description = row.get("description", "")
-        print(f"Analysiere Nachricht {i+1}...")
-
-        result = analyze_news(title, description)
 
         # Ergänze Metadaten
         result["title"] = title
@@ -0,0 +1,110 @@
+# backend/bench_article_fetcher.py - Volltext-Fetcher gegen einen lokalen HTTP-Server messen (Durchsatz, Cache-Trefferquote)
+
+import argparse
+import random
+import shutil
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from article_fetcher import ArticleFetcher, ArticleCache, extract_text
+from http_client import report_latency
+
+PARAGRAPH = ("Stocks moved as investors weighed fresh inflation data, central bank comments and a busy "
+             "earnings calendar, with traders repricing the path of interest rates for the coming quarters.")
+
+
+def article_html(n: int, paragraphs: int) -> str:
+    body = "".join(f"<p>Story {n}, paragraph {i}. {PARAGRAPH}</p>" for i in range(paragraphs))
+    return (f"<html><head><title>Story {n}</title><meta name=\"description\" content=\"Story {n}\">"
+            f"<script>var tracking = 1;</script></head><body><nav><ul><li>Markets</li><li>Tech</li></ul></nav>"
+            f"<header><p>Subscribe to our newsletter for the latest market-moving headlines every day.</p></header>"
+            f"<article><h1>Story {n}</h1>{body}</article><footer><p>© Mock News</p></footer></body></html>")
+
+
+class _ArticleHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            server.active[self.headers.get("Host")] = server.active.get(self.headers.get("Host"), 0) + 1
+            server.peak = max(server.peak, server.active[self.headers.get("Host")])
+        try:
+            time.sleep(max(0.0, random.gauss(server.latency_ms, server.latency_ms / 4)) / 1000)
+            if self.path.endswith("/missing"):
+                status, data = 404, b"not found"
+            else:
+                status, data = 200, article_html(hash(self.path) % 100000, server.paragraphs).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        finally:
+            with server.lock:
+                server.active[self.headers.get("Host")] -= 1
+
+
+def start_article_server(latency_ms: float = 50, paragraphs: int = 12) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("0.0.0.0", 0), _ArticleHandler)
+    server.daemon_threads = True
+    server.latency_ms = latency_ms
+    server.paragraphs = paragraphs
+    server.requests = 0
+    server.active = {}
+    server.peak = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, name="article-server", daemon=True).start()
+    return server
+
+
+def run(articles: int, domains: int, concurrency: int, per_domain: int, latency_ms: float):
+    server = start_article_server(latency_ms)
+    port = server.server_address[1]
+    # 127.0.0.x sind getrennte "Domains" für das Limit pro Domain
+    urls = [f"http://127.0.0.{1 + i % domains}:{port}/news/{i}" for i in range(articles)]
+    urls += [f"http://127.0.0.1:{port}/news/{i}/missing" for i in range(max(1, articles // 50))]
+    cache_dir = Path(tempfile.mkdtemp(prefix="article_cache_"))
+
+    sample = extract_text(article_html(1, 3))
+    assert "Subscribe" not in sample and sample.startswith("Story 1"), "extraction kept boilerplate"
+
+    print(f"{len(urls)} URLs over {domains} domains, {latency_ms:.0f}ms latency, "
+          f"concurrency {concurrency} (max {per_domain} per domain)")
+    print(f"{'pass':<6} | {'urls/s':>8} | {'seconds':>7} | {'requests':>8} | {'hit rate':>8} | {'peak/domain':>11}")
+    print("-" * 64)
+    try:
+        for name in ("cold", "warm"):
+            fetcher = ArticleFetcher(ArticleCache(cache_dir), concurrency, per_domain)
+            before = server.requests
+            server.peak = 0
+            started = time.perf_counter()
+            bodies = fetcher.fetch_many(urls)
+            elapsed = time.perf_counter() - started
+            fetcher.close()
+            assert sum(1 for b in bodies.values() if b) == articles
+            print(f"{name:<6} | {len(urls) / elapsed:>8,.0f} | {elapsed:>7.2f} | {server.requests - before:>8} | "
+                  f"{fetcher.cache.hit_rate():>8.0%} | {server.peak:>11}")
+        objects = len(list((cache_dir / "objects").rglob("*.gz")))
+        print(f"\nCache: {objects} text objects for {articles} articles in {cache_dir}")
+        report_latency()
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the article body fetcher against a local HTTP server.")
+    parser.add_argument("--articles", type=int, default=400)
+    parser.add_argument("--domains", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--per-domain", type=int, default=2)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    args = parser.parse_args()
+    run(args.articles, args.domains, args.concurrency, args.per_domain, args.latency_ms)
@@ -0,0 +1,94 @@
+# backend/bench_ingest.py - End-to-End-Benchmark der Fetch-Pfade gegen den lokalen Finnhub-Mock
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Vor den Imports setzen: Key, kein Rate-Limit, kein Roh-Archiv während des Benchmarks
+os.environ.setdefault("FINNHUB_API_KEY", "mock")
+os.environ["FINNHUB_REQUESTS_PER_MINUTE"] = "0"
+os.environ["RAW_ARCHIVE_ENABLED"] = "0"
+
+import finnhub_client
+from mock_finnhub import start_mock_server, SyntheticFeed
+from news_ingest import fetch_latest_articles, fetch_company_articles
+from news_fetcher import fetch_news
+from http_client import report_latency
+
+
+def _percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] if ordered else 0.0
+
+
+def measure(name: str, fn, runs: int):
+    """Run ``fn`` (returns an article count) ``runs`` times, then once more under tracemalloc."""
+    latencies = []
+    articles = 0
+    for _ in range(runs):
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            articles += fn()
+        latencies.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+    snapshot = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sum(stat.count for stat in snapshot.statistics("filename"))
+
+    total = sum(latencies)
+    print(f"{name:<16} | {articles / total if total else 0:>10,.0f} | {statistics.median(latencies) * 1000:>8.1f} | "
+          f"{_percentile(latencies, 95) * 1000:>8.1f} | {peak / 1024:>9,.0f} | {blocks:>9,}")
+
+
+def run(runs: int, volume: int, symbols: int, latency_ms: float, error_rate: float, overlap: float):
+    server = start_mock_server(feed=SyntheticFeed(volume=volume, overlap=overlap), latency_ms=latency_ms, error_rate=error_rate)
+    finnhub_client.FINNHUB_BASE_URL = server.base_url
+    now = datetime.now(timezone.utc)
+    window_start = now - timedelta(days=365)
+    watchlist = [f"SYM{i}" for i in range(symbols)]
+    workdir = Path(tempfile.mkdtemp(prefix="bench_ingest_"))
+    (workdir / "data").mkdir()
+
+    def _fetch_news():
+        # fetch_news schreibt data/latest_news.csv relativ zum Arbeitsverzeichnis
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            return len(fetch_news(page_size=volume * 4))
+        finally:
+            os.chdir(cwd)
+
+    print(f"Mock: {volume} articles/response, {latency_ms:.0f}ms latency, {error_rate:.0%} errors, {overlap:.0%} overlap; {runs} runs each")
+    print(f"{'path':<16} | {'articles/s':>10} | {'p50 ms':>8} | {'p95 ms':>8} | {'peak KiB':>9} | {'allocs':>9}")
+    print("-" * 76)
+    measure("latest_articles", lambda: len(fetch_latest_articles("mock", window_start, now)), runs)
+    measure("fetch_news", _fetch_news, runs)
+    if symbols:
+        measure(f"company x{symbols}", lambda: len(fetch_company_articles("mock", watchlist, now - timedelta(days=1), now)), runs)
+
+    print(f"\nMock served {server.requests} requests")
+    report_latency()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark fetch_latest_articles / fetch_news against a local Finnhub mock.")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--volume", type=int, default=100, help="Articles per mock response")
+    parser.add_argument("--symbols", type=int, default=50, help="Watchlist size for the company-news path (0 = skip)")
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--overlap", type=float, default=0.5)
+    args = parser.parse_args()
+    run(args.runs, args.volume, args.symbols, args.latency_ms, args.error_rate, args.overlap)
@@ -0,0 +1,65 @@
+# backend/bench_near_dedup.py - Benchmark: Lookup-Kosten des SimHash-Index bei wachsender Historie
+
+import argparse
+import random
+import time
+from near_dedup import SimHashIndex, article_fingerprint, NEAR_DUP_MAX_DISTANCE, NEAR_DUP_BANDS_PER_KEY, FINGERPRINT_BITS
+
+SAMPLE_TITLE = "Walmart shoppers' behavior hasn't changed much even as tariffs push prices higher, analysts say"
+SAMPLE_SUMMARY = "While there were signs that customers were switching from more expensive items to more affordable ones, Walmart was taking less price than its peers."
+
+
+def flip_bits(fingerprint: int, n: int, rng: random.Random) -> int:
+    for bit in rng.sample(range(FINGERPRINT_BITS), n):
+        fingerprint ^= 1 << bit
+    return fingerprint
+
+
+def run(sizes, max_distance: int, bands_per_key: int, queries: int, seed: int = 42):
+    rng = random.Random(seed)
+    print(f"max_distance={max_distance}, bands_per_key={bands_per_key}")
+    print(f"{'history':>10} | {'build s':>8} | {'lookup µs':>9} | {'candidates':>10} | {'recall':>6}")
+    print("-" * 56)
+
+    for size in sizes:
+        index = SimHashIndex(max_distance, bands_per_key)
+        start = time.perf_counter()
+        # Zufällige Fingerprints stehen für die Historie (SimHash ist ~gleichverteilt)
+        for i in range(size):
+            index.add(rng.getrandbits(FINGERPRINT_BITS), i)
+        build = time.perf_counter() - start
+
+        # Hälfte der Queries sind Beinahe-Duplikate bekannter Einträge, Hälfte neue Artikel
+        probes = []
+        for q in range(queries):
+            if q % 2 == 0:
+                base = index.fingerprints[rng.randrange(size)]
+                probes.append((flip_bits(base, rng.randint(0, max_distance), rng), True))
+            else:
+                probes.append((rng.getrandbits(FINGERPRINT_BITS), False))
+
+        candidates = sum(
+            len(index.tables[t].get(key, ())) for fp, _ in probes for t, key in index._keys(fp)
+        )
+        start = time.perf_counter()
+        hits = sum(1 for fp, expected in probes if expected and index.query(fp) is not None)
+        elapsed = time.perf_counter() - start
+
+        print(f"{size:>10,} | {build:>8.2f} | {elapsed / queries * 1e6:>9.1f} | "
+              f"{candidates / queries:>10.1f} | {hits / (queries // 2 or 1):>6.0%}")
+
+    start = time.perf_counter()
+    for _ in range(100):
+        article_fingerprint(SAMPLE_TITLE, SAMPLE_SUMMARY)
+    print(f"\nFingerprint cost per article: {(time.perf_counter() - start) / 100 * 1e6:.0f} µs")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark near-duplicate lookups against a growing history.")
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000",
+                        help="Comma-separated history sizes")
+    parser.add_argument("--max-distance", type=int, default=NEAR_DUP_MAX_DISTANCE)
+    parser.add_argument("--bands-per-key", type=int, default=NEAR_DUP_BANDS_PER_KEY)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+    run([int(s) for s in args.sizes.split(",")], args.max_distance, args.bands_per_key, args.queries)
@@ -0,0 +1,248 @@
+# backend/bulk_analyzer.py - Offline-Massenanalyse über die OpenAI Batch API (JSONL → Batch-Job → Ergebnisse zurück in die CSV)
+
+import argparse
+import csv
+import json
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+import openai
+from analysis_cache import get_cache, AnalysisCache
+from csv_store import csv_lock
+from news_processor import (
+    OPENAI_API_KEY, OPENAI_MODEL, PROMPT_VERSION, build_prompt, to_result,
+)
+from structured_output import format_kwargs, parse_analysis
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+RESULTS_CSV = DATA_DIR / "news_analysis_results.csv"
+BULK_DIR = Path(os.environ.get("BULK_DIR", DATA_DIR / "bulk"))
+JOBS_FILE = BULK_DIR / "jobs.json"
+BULK_POLL_SECONDS = float(os.environ.get("BULK_POLL_SECONDS", "60"))
+# Obergrenze der API pro Batch-Datei
+BULK_MAX_REQUESTS = int(os.environ.get("BULK_MAX_REQUESTS", "50000"))
+ANALYSIS_FIELDS = ("sentiment", "markets", "intensity", "impact", "confidence", "patterns", "explanation")
+FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+# Platzhalter für Zeilen, deren Analyse per Bulk-Lauf nachgeholt wird ("unavailable" → von
+# Near-Dedup und Relevanz-Gate ignoriert, wie API-Fehler-Fallbacks)
+PENDING_PATTERNS = "Analysis unavailable – pending bulk analysis"
+
+
+def pending_analysis(title: str) -> dict:
+    return {
+        "sentiment": "Finance", "markets": "General", "intensity": "low", "impact": "0", "confidence": "low",
+        "patterns": PENDING_PATTERNS, "explanation": f"Queued for offline bulk analysis: {title}",
+    }
+
+
+def get_bulk_client():
+    """Synchronous client for the Files/Batch endpoints (``OPENAI_BASE_URL`` points it at a stand-in)."""
+    if not OPENAI_API_KEY:
+        raise RuntimeError("OPENAI_API_KEY ist nicht gesetzt.")
+    return openai.OpenAI(api_key=OPENAI_API_KEY)
+
+
+# === 1) Auswahl & Request-Datei ===
+def select_rows(path: Path = RESULTS_CSV, select: str = "unavailable", since: str = None) -> list:
+    """CSV rows to (re-)analyze: ``unavailable`` = fallbacks and pending rows, ``all`` = every row
+    (e.g. after a prompt change). ``since`` filters on ``publishedAt``."""
+    with open(path, encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    if select == "unavailable":
+        rows = [r for r in rows if "unavailable" in (r.get("patterns") or "").lower()]
+    if since:
+        rows = [r for r in rows if (r.get("publishedAt") or "") >= since]
+    return rows
+
+
+def request_id(title: str, description: str) -> str:
+    # Gleicher Schlüssel wie im Analyse-Cache, damit Ergebnisse dort wiederverwendet werden
+    return AnalysisCache.key(title, description, None, OPENAI_MODEL, PROMPT_VERSION)
+
+
+def write_requests(rows: list, directory: Path = BULK_DIR, max_requests: int = BULK_MAX_REQUESTS) -> list:
+    """Write one chat-completion request per distinct article as JSONL; returns the file paths."""
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    lines = {}
+    for row in rows:
+        title, description = row.get("title", ""), row.get("description", "")
+        custom_id = request_id(title, description)
+        if custom_id not in lines:
+            lines[custom_id] = json.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {"model": OPENAI_MODEL, "messages": [{"role": "user", "content": build_prompt(title, description)}],
+                         "temperature": 0.5, "max_tokens": 1000, **format_kwargs(OPENAI_MODEL)},
+            })
+    requests = list(lines.values())
+    paths = []
+    for n, start in enumerate(range(0, len(requests), max_requests)):
+        path = directory / f"requests-{stamp}-{n}.jsonl"
+        path.write_text("\n".join(requests[start:start + max_requests]) + "\n", encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+# === 2) Jobs ===
+def load_jobs(path: Path = JOBS_FILE) -> dict:
+    if path.exists():
+        return json.loads(path.read_text(encoding="utf-8"))
+    return {}
+
+
+def save_jobs(jobs: dict, path: Path = JOBS_FILE):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(jobs, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def submit(client, request_file: Path, csv_path: Path = RESULTS_CSV, jobs_path: Path = JOBS_FILE) -> str:
+    """Upload ``request_file`` and start a batch job; the job is recorded so ``collect`` can resume it."""
+    with open(request_file, "rb") as f:
+        uploaded = client.files.create(file=f, purpose="batch")
+    batch = client.batches.create(input_file_id=uploaded.id, endpoint="/v1/chat/completions", completion_window="24h",
+                                  metadata={"prompt_version": PROMPT_VERSION, "model": OPENAI_MODEL})
+    jobs = load_jobs(jobs_path)
+    jobs[batch.id] = {"request_file": str(request_file), "csv": str(csv_path), "status": batch.status,
+                      "submitted_at": datetime.now(timezone.utc).isoformat(), "merged": False}
+    save_jobs(jobs, jobs_path)
+    print(f"📤 Batch {batch.id} submitted ({sum(1 for _ in open(request_file, encoding='utf-8'))} requests)")
+    return batch.id
+
+
+def wait_for(client, batch_id: str, poll_seconds: float = BULK_POLL_SECONDS, timeout: float = None):
+    started = time.monotonic()
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        if batch.status in FINAL_STATUSES:
+            return batch
+        if timeout is not None and time.monotonic() - started > timeout:
+            return batch
+        counts = getattr(batch, "request_counts", None)
+        done = f"{counts.completed}/{counts.total}" if counts and counts.total else "?"
+        print(f"⏳ Batch {batch_id}: {batch.status} ({done} done), next check in {poll_seconds:.0f}s")
+        time.sleep(poll_seconds)
+
+
+# === 3) Ergebnisse ===
+def read_results(client, batch) -> tuple:
+    """``({custom_id: result}, failed_ids)`` from the output and error files of a finished batch."""
+    results, failed = {}, set()
+    if batch.output_file_id:
+        for line in client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            response = entry.get("response") or {}
+            try:
+                if response.get("status_code") != 200:
+                    raise ValueError(f"status {response.get('status_code')}")
+                content = response["body"]["choices"][0]["message"]["content"]
+                parsed = parse_analysis(content)
+                if parsed is None:
+                    raise ValueError("invalid analysis")
+                results[entry["custom_id"]] = to_result(parsed)
+            except (KeyError, IndexError, ValueError) as e:
+                print(f"⚠️ Unusable batch result {entry.get('custom_id', '')[:12]}: {e}")
+                failed.add(entry.get("custom_id"))
+    if batch.error_file_id:
+        for line in client.files.content(batch.error_file_id).text.splitlines():
+            if line.strip():
+                failed.add(json.loads(line).get("custom_id"))
+    return results, failed
+
+
+def merge_into_csv(results: dict, path: Path = RESULTS_CSV) -> int:
+    """Replace the analysis columns of every row whose article has a result; returns the rows updated."""
+    if not results:
+        return 0
+    with csv_lock(path):
+        with open(path, encoding="utf-8", newline="") as f:
+            reader = csv.DictReader(f)
+            fieldnames = reader.fieldnames
+            rows = list(reader)
+        updated = 0
+        for row in rows:
+            result = results.get(request_id(row.get("title", ""), row.get("description", "")))
+            if result:
+                row.update({k: result.get(k, row.get(k, "")) for k in ANALYSIS_FIELDS if k in fieldnames})
+                updated += 1
+        tmp = path.with_suffix(".bulk.tmp")
+        with open(tmp, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+        os.replace(tmp, path)
+    return updated
+
+
+def collect(client, wait: bool = False, poll_seconds: float = BULK_POLL_SECONDS, jobs_path: Path = JOBS_FILE) -> dict:
+    """Check every unmerged job; merge finished ones into their CSV and the analysis cache."""
+    jobs = load_jobs(jobs_path)
+    totals = {"merged_jobs": 0, "results": 0, "failed": 0, "rows_updated": 0, "pending_jobs": 0}
+    cache = get_cache()
+    for batch_id, job in jobs.items():
+        if job.get("merged"):
+            continue
+        batch = wait_for(client, batch_id, poll_seconds) if wait else client.batches.retrieve(batch_id)
+        job["status"] = batch.status
+        if batch.status not in FINAL_STATUSES:
+            totals["pending_jobs"] += 1
+            print(f"⏳ Batch {batch_id}: {batch.status}")
+            continue
+        results, failed = read_results(client, batch)
+        if cache:
+            for custom_id, result in results.items():
+                cache.put(custom_id, result, OPENAI_MODEL, PROMPT_VERSION)
+        updated = merge_into_csv(results, Path(job["csv"]))
+        job.update(merged=True, results=len(results), failed=len(failed), rows_updated=updated,
+                   merged_at=datetime.now(timezone.utc).isoformat())
+        save_jobs(jobs, jobs_path)
+        totals["merged_jobs"] += 1
+        totals["results"] += len(results)
+        totals["failed"] += len(failed)
+        totals["rows_updated"] += updated
+        print(f"📥 Batch {batch_id} ({batch.status}): {len(results)} results, {len(failed)} failed, "
+              f"{updated} rows updated in {job['csv']}")
+    save_jobs(jobs, jobs_path)
+    return totals
+
+
+def run_bulk(client, csv_path: Path = RESULTS_CSV, select: str = "unavailable", since: str = None,
+             wait: bool = True, poll_seconds: float = BULK_POLL_SECONDS, jobs_path: Path = JOBS_FILE) -> dict:
+    """Select rows, submit them as batch jobs and (with ``wait``) merge the results once finished."""
+    rows = select_rows(csv_path, select, since)
+    if not rows:
+        print("✅ Nothing to analyze")
+        return {}
+    paths = write_requests(rows, jobs_path.parent)
+    print(f"📝 {len(rows)} rows → {sum(1 for p in paths for _ in open(p, encoding='utf-8'))} requests in {len(paths)} file(s)")
+    for path in paths:
+        submit(client, path, csv_path, jobs_path)
+    return collect(client, wait, poll_seconds, jobs_path) if wait else {}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline bulk analysis of news_analysis_results.csv via the OpenAI Batch API.")
+    parser.add_argument("command", choices=["run", "submit", "collect", "status"],
+                        help="run = submit + wait + merge; collect merges finished jobs")
+    parser.add_argument("--csv", type=Path, default=RESULTS_CSV)
+    parser.add_argument("--select", choices=["unavailable", "all"], default="unavailable",
+                        help="Rows to (re-)analyze: fallbacks/pending rows or all (prompt re-runs)")
+    parser.add_argument("--since", help="Only rows published on or after this date (YYYY-MM-DD)")
+    parser.add_argument("--wait", action="store_true", help="collect: poll until every job has finished")
+    parser.add_argument("--poll-seconds", type=float, default=BULK_POLL_SECONDS)
+    args = parser.parse_args()
+
+    if args.command == "status":
+        for batch_id, job in load_jobs().items():
+            print(f"{batch_id}: {job['status']}{' (merged)' if job.get('merged') else ''} – {job['request_file']}")
+    elif args.command == "collect":
+        print(collect(get_bulk_client(), args.wait, args.poll_seconds))
+    else:
+        print(run_bulk(get_bulk_client(), args.csv, args.select, args.since, args.command == "run", args.poll_seconds))
@@ -0,0 +1,28 @@
+# backend/csv_store.py - Gemeinsame Dateisperre für news_analysis_results.csv (Ingest hängt an, Bulk-Analyse schreibt neu)
+
+from contextlib import contextmanager
+from pathlib import Path
+
+# Dateisperre, damit mehrere Prozesse nicht gleichzeitig in die CSV schreiben (nur POSIX)
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+@contextmanager
+def csv_lock(path: Path):
+    """Exclusive lock on ``<path>.lock`` for the duration of one write to ``path``.
+
+    Not reentrant: ``flock`` locks per open file, so a nested ``csv_lock`` on
+    the same path blocks, even in the same process.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_suffix(path.suffix + ".lock"), "a") as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
@@ -0,0 +1,103 @@
+# backend/dedup.py - Kategorieübergreifende Duplikat-Erkennung vor der Analyse
+
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Tracking-Parameter, die für die Identität eines Artikels keine Rolle spielen
+TRACKING_PARAMS = {"utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content", "cmpid", "mod", "src", "ref"}
+
+
+def canonical_url(url: str) -> str:
+    """Normalize a URL so the same story under different categories maps to one key."""
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS
+    ))
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https", host, path, query, ""))
+
+
+class StreamingDeduper:
+    """Incremental form of ``dedupe_articles`` for articles that arrive one by one.
+
+    ``add`` returns True for the first copy of a story (which should be
+    passed on) and False for a later copy, whose category and id are merged
+    into ``source_categories``/``source_ids`` of the copy already kept.
+
+    For long-running callers ``ttl`` (seconds since a story was last seen)
+    and ``max_entries`` bound the memory; the least recently seen stories
+    are evicted first.
+    """
+
+    def __init__(self, ttl: float = None, max_entries: int = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.by_key = {}
+        # id(kept) → (kept, keys, zuletzt gesehen), älteste zuerst
+        self.entries = OrderedDict()
+
+    def add(self, article: dict, now: float = None) -> bool:
+        now = time.monotonic() if now is None else now
+        self.evict(now)
+        keys = []
+        if article.get("id"):
+            keys.append(("id", article["id"]))
+        url = canonical_url(article.get("url", ""))
+        if url:
+            keys.append(("url", url))
+
+        kept = next((self.by_key[k] for k in keys if k in self.by_key), None)
+        category = article.get("source_category")
+        # Bereits deduplizierte Artikel bringen ihre Kategorien mit (mehrstufiges Dedup)
+        source_ids = article.get("source_ids") or ({category: article.get("id")} if category else {})
+
+        is_new = kept is None
+        if is_new:
+            article["source_categories"] = list(article.get("source_categories") or source_ids)
+            article["source_ids"] = dict(source_ids)
+            kept = article
+        else:
+            for cat, article_id in source_ids.items():
+                if cat not in kept["source_categories"]:
+                    kept["source_categories"].append(cat)
+                kept["source_ids"].setdefault(cat, article_id)
+
+        for k in keys:
+            self.by_key.setdefault(k, kept)
+        _, kept_keys, _ = self.entries.pop(id(kept), (kept, [], now))
+        self.entries[id(kept)] = (kept, kept_keys + [k for k in keys if k not in kept_keys], now)
+        self.evict(now)
+        return is_new
+
+    def forget(self, article: dict):
+        """Drop a kept article again (e.g. its analysis failed), so a later copy counts as new."""
+        _, keys, _ = self.entries.pop(id(article), (article, [], None))
+        for k in keys:
+            if self.by_key.get(k) is article:
+                del self.by_key[k]
+
+    def evict(self, now: float):
+        while self.entries:
+            kept, _, seen = next(iter(self.entries.values()))
+            expired = self.ttl is not None and now - seen > self.ttl
+            if not expired and (self.max_entries is None or len(self.entries) <= self.max_entries):
+                break
+            self.forget(kept)
+
+
+def dedupe_articles(articles: list) -> list:
+    """Collapse copies of the same Finnhub article (same ``id`` or canonical URL).
+
+    The first occurrence is kept; every copy's category is collected in
+    ``source_categories`` and its own Finnhub id in ``source_ids`` so that
+    per-category watermarks can still advance correctly.
+    """
+    deduper = StreamingDeduper()
+    return [article for article in articles if deduper.add(article)]
@@ -0,0 +1,100 @@
+# backend/fast_parse.py - Spaltenweises Parsen von Finnhub-Payloads (schneller JSON-Decoder, vektorisierte Zeiten)
+
+import json
+import sys
+import numpy as np
+import pandas as pd
+from dedup import canonical_url
+
+# orjson ist optional – ohne fällt das Decoding auf die Standardbibliothek zurück
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+    _loads = json.loads
+
+# Spalten von data/latest_news.csv
+FRAME_COLUMNS = ["title", "description", "content", "url", "publishedAt", "source_category", "source_categories"]
+# Felder einer Finnhub-Antwort (/news und /company-news), die in die Spalten übernommen werden
+PAYLOAD_COLUMNS = ["id", "datetime", "headline", "summary", "url", "image", "source", "related"]
+# Textspalten, die wie in news_sources.normalize_article leer statt None sind
+TEXT_COLUMNS = ["headline", "summary", "url", "image", "source", "related"]
+
+
+# === 1) Decoding ===
+def decode(content: bytes):
+    """Decode a JSON response body straight from bytes (orjson if installed)."""
+    return _loads(content)
+
+
+# === 2) Zeitstempel ===
+def iso_timestamps(epochs) -> list:
+    """Unix seconds → ISO-8601 UTC strings, identical to ``datetime.fromtimestamp(..., tz=utc).isoformat()``."""
+    seconds = np.asarray(epochs, dtype="int64").astype("datetime64[s]")
+    return np.char.add(np.datetime_as_string(seconds, unit="s"), "+00:00").tolist()
+
+
+# === 3) Spalten ===
+def payload_to_frame(payload: list, category: str) -> pd.DataFrame:
+    """Columns straight from one decoded Finnhub response, without building normalized article dicts."""
+    df = pd.DataFrame.from_records(payload, columns=PAYLOAD_COLUMNS) if payload else pd.DataFrame(columns=PAYLOAD_COLUMNS)
+    for column in ("id", "datetime"):
+        df[column] = pd.to_numeric(df[column], errors="coerce").fillna(0).astype("int64")
+    for column in TEXT_COLUMNS:
+        df[column] = df[column].fillna("").astype(str).str.strip()
+    df["source_category"] = sys.intern(category)
+    return df
+
+
+def dedupe_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Column-wise ``dedupe_articles``: first copy per id or canonical URL, categories merged in order."""
+    if df.empty:
+        return df.assign(source_categories=[])
+    df = df.reset_index(drop=True)
+    rows = np.arange(len(df))
+    ids = df["id"].to_numpy()
+    urls = df["url"].map(canonical_url).to_numpy()
+    # Gruppe = erste Zeile mit gleicher ID, dann über die kanonische URL zusammengeführt
+    id_keys = np.where(ids != 0, ids, -(rows + 1))
+    group = pd.Series(rows).groupby(id_keys).transform("min").to_numpy()
+    by_url = pd.Series(group).groupby(urls).transform("min").to_numpy()
+    group = np.where(urls != "", by_url, group)
+    group = pd.Series(group).groupby(id_keys).transform("min").to_numpy()
+    categories = df.groupby(group, sort=False)["source_category"].unique()
+    kept = df[group == rows].copy()
+    kept["source_categories"] = [list(c) for c in categories.loc[kept.index]]
+    return kept
+
+
+def payloads_to_frame(payloads: list, page_size: int) -> pd.DataFrame:
+    """Build the ``latest_news.csv`` DataFrame from ``(category, payload)`` pairs in one shot.
+
+    Copies across categories are merged, the newest ``page_size`` articles
+    kept and timestamps converted vectorized.
+    """
+    frames = [payload_to_frame(payload, category) for category, payload in payloads]
+    if not frames:
+        return pd.DataFrame(columns=FRAME_COLUMNS)
+    df = dedupe_frame(pd.concat(frames, ignore_index=True))
+    df = df.sort_values("datetime", ascending=False, kind="stable").head(page_size)
+    return pd.DataFrame({
+        "title": df["headline"].to_numpy(),
+        "description": df["summary"].to_numpy(),
+        "content": df["summary"].to_numpy(),
+        "url": df["url"].to_numpy(),
+        "publishedAt": iso_timestamps(df["datetime"].to_numpy()),
+        "source_category": pd.Categorical(df["source_category"].to_numpy()),
+        # Gleiches Format wie die source_categories-Spalte von append_to_csv
+        "source_categories": [", ".join(c) for c in df["source_categories"]],
+    }, columns=FRAME_COLUMNS)
+
+
+def frame_to_articles(df: pd.DataFrame) -> list:
+    """Normalized article dicts (``news_sources.normalize_article`` schema) from a parsed frame."""
+    return df.to_dict("records")
+
+
+def parse_articles(payload: list, category: str) -> list:
+    """One decoded Finnhub response → normalized articles, parsed column-wise."""
+    return frame_to_articles(payload_to_frame(payload, category))
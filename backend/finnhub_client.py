@@ -0,0 +1,146 @@
+# backend/finnhub_client.py - Gemeinsamer, gepoolter Zugriff auf die Finnhub-API
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+from requests.adapters import HTTPAdapter
+from rate_limiter import get_limiter
+from http_client import get_client
+from raw_archive import archive_payload
+from fast_parse import decode
+
+# === 1) Konfiguration ===
+FINNHUB_BASE_URL = os.environ.get("FINNHUB_BASE_URL", "https://finnhub.io/api/v1").rstrip("/")
+
+# Maximale Anzahl paralleler Finnhub-Requests (1 = sequentiell wie früher)
+FETCH_CONCURRENCY = int(os.environ.get("FINNHUB_FETCH_CONCURRENCY", "4"))
+# Parallelität für /company-news (Watchlist mit vielen Symbolen)
+COMPANY_CONCURRENCY = int(os.environ.get("FINNHUB_COMPANY_CONCURRENCY", "16"))
+
+_session = None
+_session_pool_size = 0
+_session_lock = threading.Lock()
+
+
+# === 2) Keep-Alive Session ===
+def get_session(pool_size: int = FETCH_CONCURRENCY) -> requests.Session:
+    """Return the process-wide session so TCP/TLS connections are reused between calls.
+
+    The connection pool grows if a caller needs more parallel connections than
+    an earlier one did.
+    """
+    global _session, _session_pool_size
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+        if pool_size > _session_pool_size:
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(pool_size, 1))
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+            _session_pool_size = pool_size
+    return _session
+
+
+# === 3) Einzelne Endpunkte ===
+def company_key(symbol: str) -> str:
+    """Watermark/category key under which a symbol's company news is tracked."""
+    return f"company:{symbol}"
+
+
+def _get_json(session: requests.Session, path: str, params: dict, key: str):
+    limiter = get_limiter("finnhub")
+    # Timeouts, Retries, Hedging und Circuit-Breaker; jeder Versuch zählt gegen das Rate-Limit
+    resp = get_client(session).get(f"{FINNHUB_BASE_URL}{path}", params=params, before_attempt=limiter.acquire)
+    if resp.status_code == 429:
+        # Quota erschöpft: alle weiteren Finnhub-Calls im Prozess warten mit
+        limiter.pause(float(resp.headers.get("Retry-After", 60)))
+    resp.raise_for_status()
+    payload = decode(resp.content)
+    # Roh-Payload aufheben, damit Analysen später offline wiederholt werden können
+    archive_payload("finnhub", path, key, params, payload)
+    return payload
+
+
+def fetch_category(category: str, api_key: str, session: requests.Session = None, **params) -> list:
+    return _get_json(session or get_session(), "/news", {"category": category, "token": api_key, **params}, category)
+
+
+def fetch_company_news(symbol: str, api_key: str, from_date: str, to_date: str, session: requests.Session = None) -> list:
+    return _get_json(
+        session or get_session(),
+        "/company-news",
+        {"symbol": symbol, "from": from_date, "to": to_date, "token": api_key},
+        company_key(symbol),
+    )
+
+
+# === 4) Parallel holen ===
+def _iter_parallel(keys, fetch_one, max_workers: int):
+    """Run ``fetch_one(key, session)`` for every key on a bounded thread pool.
+
+    Yields ``(key, result)`` as soon as each request finishes; a key whose
+    request failed yields the raised exception instead of a result.
+    """
+    keys = list(keys)
+    if not keys:
+        return
+
+    workers = max(1, min(max_workers, len(keys)))
+    session = get_session(workers)
+
+    def _fetch(key):
+        try:
+            return fetch_one(key, session)
+        except Exception as e:
+            return e
+
+    if workers == 1:
+        for k in keys:
+            yield k, _fetch(k)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="finnhub") as pool:
+        futures = {pool.submit(_fetch, k): k for k in keys}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def _fetch_parallel(keys, fetch_one, max_workers: int) -> dict:
+    """Like ``_iter_parallel`` but waits for all keys; returns ``{key: result}`` in key order."""
+    keys = list(keys)
+    results = dict(_iter_parallel(keys, fetch_one, max_workers))
+    return {k: results[k] for k in keys}
+
+
+def _category_fetcher(api_key: str, params_by_category):
+    params_by_category = params_by_category or {}
+    return lambda category, session: fetch_category(category, api_key, session, **params_by_category.get(category, {}))
+
+
+def _symbol_fetcher(api_key: str, date_range_by_symbol: dict):
+    return lambda symbol, session: fetch_company_news(symbol, api_key, *date_range_by_symbol[symbol], session=session)
+
+
+def fetch_categories(categories, api_key: str, max_workers: int = FETCH_CONCURRENCY, params_by_category=None) -> dict:
+    """Fetch several ``/news`` categories concurrently over one pooled session."""
+    return _fetch_parallel(categories, _category_fetcher(api_key, params_by_category), max_workers)
+
+
+def iter_categories(categories, api_key: str, max_workers: int = FETCH_CONCURRENCY, params_by_category=None):
+    """Streaming variant of ``fetch_categories``: yields ``(category, articles)`` as they arrive."""
+    return _iter_parallel(categories, _category_fetcher(api_key, params_by_category), max_workers)
+
+
+def fetch_symbols(symbols, api_key: str, date_range_by_symbol: dict, max_workers: int = COMPANY_CONCURRENCY) -> dict:
+    """Fetch ``/company-news`` for many symbols concurrently.
+
+    ``date_range_by_symbol`` maps each symbol to its ``(from, to)`` dates
+    (``YYYY-MM-DD``), i.e. the per-symbol cursor.
+    """
+    return _fetch_parallel(symbols, _symbol_fetcher(api_key, date_range_by_symbol), max_workers)
+
+
+def iter_symbols(symbols, api_key: str, date_range_by_symbol: dict, max_workers: int = COMPANY_CONCURRENCY):
+    """Streaming variant of ``fetch_symbols``: yields ``(symbol, articles)`` as they arrive."""
+    return _iter_parallel(symbols, _symbol_fetcher(api_key, date_range_by_symbol), max_workers)
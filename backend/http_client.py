@@ -0,0 +1,251 @@
+# backend/http_client.py - Robuster HTTP-Layer: Timeouts, Retries mit Jitter, Hedging, Circuit-Breaker
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from urllib.parse import urlsplit
+import requests
+
+# === 1) Konfiguration ===
+CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", "10"))
+MAX_RETRIES = int(os.environ.get("HTTP_MAX_RETRIES", "3"))
+BACKOFF_BASE = float(os.environ.get("HTTP_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.environ.get("HTTP_BACKOFF_MAX", "30"))
+# Zweiter (gehedgter) Request, wenn der erste nach so vielen Sekunden noch läuft (0 = aus)
+HEDGE_AFTER = float(os.environ.get("HTTP_HEDGE_AFTER", "0"))
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get("HTTP_BREAKER_FAILURES", "5"))
+BREAKER_RESET_SECONDS = float(os.environ.get("HTTP_BREAKER_RESET_SECONDS", "30"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised without sending a request while a host's circuit breaker is open."""
+
+
+# === 2) Circuit-Breaker pro Host ===
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive failures and fails fast for ``reset_timeout``
+    seconds; afterwards a single trial request decides whether it closes again."""
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD, reset_timeout: float = BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self.lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self.trial_running:
+                self.trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.trial_running = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+# === 3) Latenz-Statistik pro Host ===
+class LatencyStats:
+    def __init__(self, window: int = 1000):
+        self.samples = deque(maxlen=window)
+        self.outcomes = {}
+        self.lock = threading.Lock()
+
+    def record(self, seconds: float, outcome: str):
+        with self.lock:
+            self.samples.append(seconds)
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+    def percentile(self, p: float) -> float:
+        with self.lock:
+            ordered = sorted(self.samples)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    def summary(self) -> dict:
+        with self.lock:
+            outcomes = dict(self.outcomes)
+            count = len(self.samples)
+        return {
+            "attempts": sum(outcomes.values()),
+            "window": count,
+            "p50": round(self.percentile(50), 4),
+            "p95": round(self.percentile(95), 4),
+            "p99": round(self.percentile(99), 4),
+            "outcomes": outcomes,
+        }
+
+
+# === 4) Client ===
+class ResilientClient:
+    """Wraps a pooled ``requests.Session`` with deadlines, jittered exponential
+    retries, optional hedged second requests and a per-host circuit breaker.
+
+    Only use it for idempotent requests (GET), since retries and hedges may
+    send the same request more than once.
+    """
+
+    def __init__(self, session: requests.Session, connect_timeout: float = CONNECT_TIMEOUT,
+                 read_timeout: float = READ_TIMEOUT, max_retries: int = MAX_RETRIES,
+                 backoff_base: float = BACKOFF_BASE, backoff_max: float = BACKOFF_MAX,
+                 hedge_after: float = HEDGE_AFTER):
+        self.session = session
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_after = hedge_after
+        self.breakers = {}
+        self.stats = {}
+        self.lock = threading.Lock()
+        self._hedge_pool = None
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        with self.lock:
+            return self.breakers.setdefault(host, CircuitBreaker())
+
+    def latency(self, host: str) -> LatencyStats:
+        with self.lock:
+            return self.stats.setdefault(host, LatencyStats())
+
+    def backoff(self, attempt: int) -> float:
+        # "Full jitter": zufällig zwischen 0 und dem exponentiellen Deckel
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _timed_get(self, url: str, host: str, **kwargs) -> requests.Response:
+        started = time.perf_counter()
+        try:
+            resp = self.session.get(url, timeout=self.timeout, **kwargs)
+        except requests.Timeout:
+            self.latency(host).record(time.perf_counter() - started, "timeout")
+            raise
+        except requests.RequestException:
+            self.latency(host).record(time.perf_counter() - started, "error")
+            raise
+        self.latency(host).record(time.perf_counter() - started, str(resp.status_code))
+        return resp
+
+    def _hedged_get(self, url: str, host: str, **kwargs) -> requests.Response:
+        if not self.hedge_after:
+            return self._timed_get(url, host, **kwargs)
+        with self.lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="http-hedge")
+            pool = self._hedge_pool
+
+        first = pool.submit(self._timed_get, url, host, **kwargs)
+        done, _ = wait([first], timeout=self.hedge_after)
+        if done:
+            return first.result()
+
+        # Erster Versuch hängt – zweiten starten und den schnelleren erfolgreichen nehmen
+        futures = {first, pool.submit(self._timed_get, url, host, **kwargs)}
+        error = None
+        while futures:
+            done, futures = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result()
+                except requests.RequestException as e:
+                    error = e
+        raise error
+
+    def get(self, url: str, before_attempt=None, **kwargs) -> requests.Response:
+        """GET with retries; ``before_attempt`` (e.g. a rate limiter) runs before every attempt."""
+        host = urlsplit(url).netloc
+        breaker = self.breaker(host)
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            if not breaker.allow():
+                raise CircuitOpenError(f"Circuit breaker open for {host} – failing fast")
+            if before_attempt:
+                before_attempt()
+
+            try:
+                resp = self._hedged_get(url, host, **kwargs)
+            except requests.RequestException as e:
+                breaker.record_failure()
+                last_error = e
+                if attempt < self.max_retries:
+                    time.sleep(self.backoff(attempt))
+                continue
+
+            if resp.status_code not in RETRY_STATUSES:
+                breaker.record_success()
+                return resp
+
+            # 429 heißt "zu schnell", nicht "kaputt" – zählt nicht gegen den Breaker
+            if resp.status_code == 429:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+            if attempt == self.max_retries:
+                return resp
+            retry_after = resp.headers.get("Retry-After")
+            try:
+                delay = min(self.backoff_max, float(retry_after)) if retry_after else self.backoff(attempt)
+            except ValueError:
+                delay = self.backoff(attempt)
+            time.sleep(delay)
+
+        raise last_error
+
+    def latency_summary(self) -> dict:
+        with self.lock:
+            hosts = list(self.stats.items())
+        return {host: stats.summary() for host, stats in hosts}
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client(session: requests.Session) -> ResilientClient:
+    """Process-wide client around the shared session, so breakers and stats are shared too."""
+    global _client
+    with _client_lock:
+        if _client is None or _client.session is not session:
+            _client = ResilientClient(session)
+        return _client
+
+
+def latency_summary() -> dict:
+    return _client.latency_summary() if _client is not None else {}
+
+
+def report_latency():
+    if _client is None:
+        return
+    for host, s in _client.latency_summary().items():
+        print(f"📶 {host}: {s['attempts']} attempts, p50 {s['p50'] * 1000:.0f}ms, "
+              f"p95 {s['p95'] * 1000:.0f}ms, p99 {s['p99'] * 1000:.0f}ms, outcomes {s['outcomes']}")
@@ -0,0 +1,168 @@
+# backend/ingest_report.py - Maschinenlesbarer Bericht pro Ingest-Lauf (JSON + Prometheus-Textfile)
+
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+import numpy as np
+
+REPORT_DIR = Path(os.environ.get("INGEST_REPORT_DIR", Path(__file__).parent.parent / "data" / "reports"))
+# Für den node_exporter-Textfile-Collector (*.prom); leer = keine Prometheus-Datei
+PROM_TEXTFILE = os.environ.get("INGEST_PROM_TEXTFILE", str(REPORT_DIR / "news_ingest.prom"))
+
+
+class RunReport:
+    """Collects counters and end-to-end lags during one run and writes them out at the end.
+
+    ``counts`` are article counts per step (fetched, unique, analyzed, ...);
+    ``observe_persisted`` records the lag from ``publishedAt`` to the moment
+    an article hit the CSV.
+    """
+
+    def __init__(self, run_type: str = "ingest", **labels):
+        self.run_type = run_type
+        self.labels = labels
+        self.started_at = datetime.now(timezone.utc)
+        self.started = time.perf_counter()
+        self.counts = {}
+        self.lags = []
+        self.lock = threading.Lock()
+
+    def count(self, name: str, n: int = 1):
+        with self.lock:
+            self.counts[name] = self.counts.get(name, 0) + n
+
+    def observe_persisted(self, articles: list, persisted_at: float = None):
+        persisted_at = persisted_at or time.time()
+        with self.lock:
+            self.lags += [persisted_at - a["datetime"] for a in articles if a.get("datetime")]
+
+    def lag_summary(self) -> dict:
+        with self.lock:
+            lags = np.asarray(self.lags, dtype=np.float64)
+        if not len(lags):
+            return {"count": 0}
+        p50, p95 = np.percentile(lags, [50, 95])
+        return {"count": int(len(lags)), "p50": round(float(p50), 1), "p95": round(float(p95), 1),
+                "max": round(float(lags.max()), 1), "mean": round(float(lags.mean()), 1)}
+
+    def build(self, stages: dict = None, **sections) -> dict:
+        counts = dict(self.counts)
+        fetched = counts.get("fetched", 0)
+        report = {
+            "run_type": self.run_type,
+            "labels": self.labels,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "duration_seconds": round(time.perf_counter() - self.started, 3),
+            "counts": counts,
+            # Anteil der geholten Artikel, die als Duplikat verworfen wurden
+            "dedup_ratio": round(counts.get("duplicates", 0) / fetched, 4) if fetched else 0.0,
+            "lag_seconds": self.lag_summary(),
+            "stages": stages or {},
+        }
+        report.update(sections)
+        return report
+
+    def write(self, report: dict, directory: Path = REPORT_DIR, prom_path: str = PROM_TEXTFILE) -> Path:
+        """Write ``<run_type>-<timestamp>.json``, append to the JSONL history and refresh the textfile."""
+        directory.mkdir(parents=True, exist_ok=True)
+        stamp = self.started_at.strftime("%Y%m%dT%H%M%SZ")
+        path = directory / f"{self.run_type}-{stamp}.json"
+        _write_atomic(path, json.dumps(report, indent=2))
+        with open(directory / f"{self.run_type}_history.jsonl", "a", encoding="utf-8") as f:
+            f.write(json.dumps(report) + "\n")
+        if prom_path:
+            _write_atomic(Path(prom_path), to_prometheus(report))
+        print(f"🧾 Run report written to {path}")
+        return path
+
+
+def _write_atomic(path: Path, text: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    inner = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+    return "{" + inner + "}" if inner else ""
+
+
+def to_prometheus(report: dict) -> str:
+    """Render a report in the Prometheus text exposition format (gauges of the last run)."""
+    run = report["run_type"]
+    lines = []
+
+    def metric(name: str, help_text: str, samples: list):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for labels, value in samples:
+            lines.append(f"{name}{_labels(run=run, **labels)} {value}")
+
+    finished = datetime.fromisoformat(report["finished_at"]).timestamp()
+    metric("news_ingest_last_run_timestamp_seconds", "Unix time the last run finished.", [({}, round(finished, 3))])
+    metric("news_ingest_run_duration_seconds", "Wall time of the last run.", [({}, report["duration_seconds"])])
+    metric("news_ingest_articles", "Articles per step in the last run.",
+           [({"step": k}, v) for k, v in sorted(report["counts"].items())])
+    metric("news_ingest_dedup_ratio", "Share of fetched articles dropped as duplicates.", [({}, report["dedup_ratio"])])
+
+    stages = report.get("stages") or {}
+    metric("news_ingest_stage_wall_seconds", "Wall time per pipeline stage.",
+           [({"stage": k}, v["wall_seconds"]) for k, v in stages.items() if isinstance(v, dict) and "wall_seconds" in v])
+    metric("news_ingest_stage_busy_seconds", "Summed worker time per pipeline stage.",
+           [({"stage": k}, v["busy_seconds"]) for k, v in stages.items() if isinstance(v, dict) and "busy_seconds" in v])
+
+    lag = report.get("lag_seconds") or {}
+    metric("news_ingest_publish_to_persist_lag_seconds", "Lag from publishedAt to CSV write.",
+           [({"quantile": q}, lag[k]) for q, k in (("0.5", "p50"), ("0.95", "p95"), ("1", "max")) if k in lag])
+
+    openai_usage = report.get("openai") or {}
+    metric("news_ingest_openai_tokens", "OpenAI tokens used in the last run.",
+           [({"kind": "prompt"}, openai_usage.get("prompt_tokens", 0)),
+            ({"kind": "completion"}, openai_usage.get("completion_tokens", 0))])
+    metric("news_ingest_openai_calls", "OpenAI calls and failures in the last run.",
+           [({"outcome": k}, openai_usage.get(k, 0)) for k in ("calls", "api_errors", "parse_errors", "batch_retries")])
+    metric("news_ingest_openai_seconds", "Summed OpenAI request time.", [({}, round(openai_usage.get("seconds", 0.0), 3))])
+
+    parsing = report.get("parsing") or {}
+    metric("news_ingest_analysis_responses", "Analysis responses by parse outcome (process lifetime).",
+           [({"outcome": k}, parsing.get(k, 0)) for k in ("valid", "repaired", "coerced", "invalid")])
+    metric("news_ingest_analysis_parse_failure_ratio", "Share of analysis responses that could not be used.",
+           [({}, parsing.get("failure_rate", 0.0))])
+
+    cache = report.get("analysis_cache") or {}
+    metric("news_ingest_analysis_cache_lookups", "Analysis cache hits and misses in the last run.",
+           [({"outcome": k}, cache.get(k, 0)) for k in ("hits", "misses")])
+    metric("news_ingest_analysis_cache_entries", "Entries in the analysis cache.", [({}, cache.get("entries", 0))])
+
+    routing = report.get("routing") or {}
+    if routing:
+        metric("news_ingest_routing_escalation_ratio", "Share of articles escalated to the final model.",
+               [({}, routing.get("escalation_rate", 0.0))])
+        metric("news_ingest_routing_agreement_ratio", "Triage/final agreement on articles analyzed by both.",
+               [({"sample": "all"}, routing.get("agreement_rate") or 0.0),
+                ({"sample": "audit"}, routing.get("audit_agreement_rate") or 0.0)])
+        tiers = routing.get("tiers") or {}
+        metric("news_ingest_routing_cost_usd", "Estimated OpenAI cost per model tier.",
+               [({"model": m}, t.get("cost_usd", 0)) for m, t in tiers.items()])
+        metric("news_ingest_routing_latency_seconds", "Request latency per model tier.",
+               [({"model": m, "quantile": q}, t.get(k, 0)) for m, t in tiers.items()
+                for q, k in (("0.5", "latency_p50"), ("0.95", "latency_p95"))])
+
+    limits = report.get("rate_limits") or {}
+    metric("news_ingest_rate_limit_wait_seconds", "Time spent waiting for provider quota.",
+           [({"provider": p}, s.get("throttled_seconds", 0)) for p, s in limits.items()])
+
+    http = report.get("http") or {}
+    metric("news_ingest_http_latency_seconds", "HTTP attempt latency per host.",
+           [({"host": h, "quantile": q}, s.get(k, 0)) for h, s in http.items()
+            for q, k in (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99"))])
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,225 @@
+# backend/ingest_worker.py - Ingest über mehrere Prozesse/Maschinen, Shards (Kategorien/Symbole) per SQLite-Lease
+
+import argparse
+import multiprocessing
+import os
+import socket
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from finnhub_client import company_key
+from news_sources import FinnhubCategorySource, FinnhubCompanySource
+from dedup import canonical_url
+from watermarks import load_state, save_state, advance_watermarks
+from rate_limiter import set_quota_share, report_throttling
+from lease_store import LeaseStore, LeaseLost, LEASE_DB
+from news_ingest import (
+    FINNHUB_API_KEY, OUTPUT, NEWS_CATEGORIES, INITIAL_HOURS_BACK, INGEST_MODE, INGEST_MODES, POLL_MIN_SECONDS,
+    require_api_key, load_watchlist, select_new_articles, load_existing_entries, append_to_csv,
+    analyze_article, load_near_index,
+)
+
+WORKER_COUNT = int(os.environ.get("INGEST_WORKERS", "4"))
+# Artikel-Claims (Cross-Shard-Dedup) so lange aufbewahren
+CLAIM_RETENTION_DAYS = float(os.environ.get("INGEST_CLAIM_RETENTION_DAYS", "7"))
+
+
+# === 1) Shards ===
+def shard_names(mode: str = INGEST_MODE) -> list:
+    """One shard per category and per watchlist symbol – the same keys the watermarks use."""
+    shards = []
+    if mode in ("categories", "all"):
+        shards += NEWS_CATEGORIES
+    if mode in ("company", "all"):
+        shards += [company_key(symbol) for symbol in load_watchlist()]
+    return shards
+
+
+def article_key(article: dict) -> str:
+    return f"id:{article['id']}" if article.get("id") else f"url:{canonical_url(article.get('url', ''))}"
+
+
+def fetch_shard(shard: str, state: dict, from_dt: datetime, to_dt: datetime) -> list:
+    if shard.startswith("company:"):
+        source = FinnhubCompanySource(FINNHUB_API_KEY, [shard.split(":", 1)[1]], max_workers=1)
+    else:
+        source = FinnhubCategorySource(FINNHUB_API_KEY, [shard], max_workers=1)
+    articles = []
+    for key, result in source.fetch(state, from_dt, to_dt):
+        if isinstance(result, Exception):
+            raise result
+        articles += select_new_articles(key, result, state, from_dt, to_dt)
+    return articles
+
+
+# === 2) Einen Shard verarbeiten ===
+def process_shard(store: LeaseStore, shard: str, owner: str, near_index, existing_entries: set,
+                  output: Path = OUTPUT) -> dict:
+    """Fetch one shard, analyze its new articles oldest-first and advance its watermark.
+
+    The lease is renewed after every article and by a heartbeat while an
+    analysis runs (a GPT-4 call behind a shared quota can outlast the TTL);
+    if it was lost anyway, processing stops before anything else is written
+    for this shard.
+    """
+    state = {"categories": {}}
+    watermark = store.get_watermark(shard)
+    if watermark:
+        state["categories"][shard] = watermark
+
+    now = datetime.now(timezone.utc)
+    articles = fetch_shard(shard, state, now - timedelta(hours=INITIAL_HOURS_BACK), now)
+    counts = {"new": len(articles), "analyzed": 0, "claimed_elsewhere": 0, "failed": 0}
+
+    for article in sorted(articles, key=lambda a: (a.get("datetime", 0), a.get("id", 0))):
+        store.renew(shard, owner)
+        key = article_key(article)
+        if not store.claim(key, shard):
+            # Gleiche Story wird/wurde über einen anderen Shard analysiert
+            counts["claimed_elsewhere"] += 1
+        else:
+            try:
+                with store.heartbeat(shard, owner):
+                    analyze_article(article, near_index)
+            except Exception as e:
+                # Watermark bleibt unter diesem Artikel – der nächste Lauf versucht es erneut
+                store.unclaim(key)
+                print(f"❌ [{shard}] Analysis failed: {article.get('headline', '')[:30]}... Error: {e}")
+                counts["failed"] += 1
+                break
+            try:
+                store.renew(shard, owner)
+            except LeaseLost:
+                store.unclaim(key)
+                raise
+            # append_to_csv nimmt selbst die CSV-Sperre (csv_store.csv_lock)
+            append_to_csv([article], output, existing_entries)
+            counts["analyzed"] += 1
+
+        advance_watermarks(state, [article])
+        watermark = state["categories"].get(shard)
+        if watermark:
+            store.set_watermark(shard, owner, watermark)
+    return counts
+
+
+# === 3) Worker-Prozess ===
+def run_worker(worker_id: int, shards: list, once: bool = True, min_interval: float = POLL_MIN_SECONDS,
+               db_path: Path = LEASE_DB, quota_share: float = 1.0, output: Path = OUTPUT, since: float = None) -> dict:
+    """Lease shards until none is due (``once``) or forever, polling each at most every ``min_interval`` s.
+
+    In run-once mode a shard counts as done once it was completed after ``since``.
+    """
+    set_quota_share(quota_share)
+    store = LeaseStore(db_path)
+    owner = f"{socket.gethostname()}:{os.getpid()}:{worker_id}"
+    near_index = load_near_index(output)
+    existing_entries = load_existing_entries(output)
+    started = since or time.time()
+    totals = {"shards": 0, "new": 0, "analyzed": 0, "claimed_elsewhere": 0, "failed": 0, "lost": 0}
+
+    try:
+        while True:
+            # Run-once: jeder Shard genau einmal seit Start des Laufs
+            interval = time.time() - started if once else min_interval
+            shard = store.acquire(owner, shards, min_interval=interval)
+            if shard is None:
+                if once and not store.pending(shards, started):
+                    break
+                # Restliche Shards sind verleast – kurz warten, falls ein Lease abläuft
+                time.sleep(0.2)
+                continue
+
+            try:
+                counts = process_shard(store, shard, owner, near_index, existing_entries, output)
+            except LeaseLost:
+                print(f"⚠️  [{owner}] Lease on {shard} expired and was taken over – stopping this shard")
+                totals["lost"] += 1
+                continue
+            except Exception as e:
+                print(f"❌ [{owner}] {shard} failed: {e}")
+                counts = {"failed": 1}
+            # Auch nach Fehlern als erledigt markieren: der Watermark steht noch, der nächste Durchlauf holt nach
+            store.release(shard, owner, done=True)
+            totals["shards"] += 1
+            for k, v in counts.items():
+                totals[k] += v
+            if counts.get("new"):
+                print(f"✅ [{owner}] {shard}: {counts}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        store.close()
+
+    print(f"🏁 [{owner}] {totals}")
+    report_throttling()
+    return totals
+
+
+# === 4) Start mehrerer Worker ===
+def launch(workers: int = WORKER_COUNT, mode: str = INGEST_MODE, once: bool = True,
+           min_interval: float = POLL_MIN_SECONDS, db_path: Path = LEASE_DB, quota_share: float = None,
+           output: Path = OUTPUT):
+    """Register the shards and run ``workers`` processes on this machine.
+
+    Further machines run the same command against the same lease DB; pass
+    ``quota_share`` so all workers together stay within one API quota.
+    """
+    shards = shard_names(mode)
+    if not shards:
+        print("⚠️  No shards to process (empty watchlist?)")
+        return
+    store = LeaseStore(db_path)
+    # Bestehende Watermarks aus ingest_state.json übernehmen, damit der Wechsel nahtlos ist
+    store.register(shards, load_state()["categories"])
+    store.prune_claims(CLAIM_RETENTION_DAYS * 86400)
+    store.close()
+
+    quota_share = quota_share if quota_share is not None else 1.0 / max(1, workers)
+    print(f"🧩 {len(shards)} shards, {workers} workers on {socket.gethostname()} "
+          f"({quota_share:.0%} of the API quota each, lease DB {db_path})")
+    started = time.perf_counter()
+    since = time.time()
+    processes = [
+        multiprocessing.Process(target=run_worker, name=f"ingest-worker-{i}",
+                                args=(i, shards, once, min_interval, db_path, quota_share, output, since))
+        for i in range(workers)
+    ]
+    for p in processes:
+        p.start()
+    try:
+        for p in processes:
+            p.join()
+    except KeyboardInterrupt:
+        for p in processes:
+            p.join()
+
+    # Fortschritt für den Workflow-Commit zurück in ingest_state.json spiegeln
+    store = LeaseStore(db_path)
+    state = load_state()
+    state["categories"].update(store.watermarks())
+    save_state(state)
+    store.close()
+    print(f"✅ All workers finished in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run sharded ingest workers coordinated by SQLite leases.")
+    parser.add_argument("--workers", type=int, default=WORKER_COUNT, help="Worker processes on this machine")
+    parser.add_argument("--mode", choices=INGEST_MODES, default=INGEST_MODE)
+    parser.add_argument("--loop", action="store_true", help="Keep polling instead of processing every shard once")
+    parser.add_argument("--min-interval", type=float, default=POLL_MIN_SECONDS, help="Seconds between polls of one shard (--loop)")
+    parser.add_argument("--db", type=Path, default=LEASE_DB, help="Lease database shared by all workers")
+    parser.add_argument("--quota-share", type=float, help="Share of the API quotas per worker (default 1/--workers)")
+    parser.add_argument("--status", action="store_true", help="Print lease table and exit")
+    args = parser.parse_args()
+
+    if args.status:
+        now = time.time()
+        for shard, owner, expires_at, last_done, runs in LeaseStore(args.db).status():
+            lease = f"{owner} ({expires_at - now:.0f}s left)" if owner and expires_at > now else "free"
+            last = datetime.fromtimestamp(last_done, tz=timezone.utc).isoformat() if last_done else "never"
+            print(f"{shard:<20} {lease:<40} runs={runs:<5} last={last}")
+    else:
+        require_api_key()
+        launch(args.workers, args.mode, not args.loop, args.min_interval, args.db, args.quota_share)
@@ -0,0 +1,187 @@
+# backend/lease_store.py - SQLite-Leases für verteiltes Ingest (Shard-Zuteilung, Watermarks, Artikel-Claims)
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+LEASE_DB = Path(os.environ.get("INGEST_LEASE_DB", Path(__file__).parent.parent / "data" / "ingest_leases.db"))
+LEASE_TTL_SECONDS = float(os.environ.get("INGEST_LEASE_TTL_SECONDS", "60"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS shards (
+    shard      TEXT PRIMARY KEY,
+    owner      TEXT,
+    expires_at REAL NOT NULL DEFAULT 0,
+    last_done  REAL NOT NULL DEFAULT 0,
+    runs       INTEGER NOT NULL DEFAULT 0,
+    watermark  TEXT
+);
+CREATE TABLE IF NOT EXISTS claims (
+    article_key TEXT PRIMARY KEY,
+    shard       TEXT,
+    claimed_at  REAL NOT NULL
+);
+"""
+
+
+class LeaseLost(Exception):
+    """The worker no longer owns the shard (lease expired and was taken over)."""
+
+
+class LeaseStore:
+    """Shards (categories, ``company:SYM``) handed out as time-limited leases.
+
+    A shard is owned by at most one worker until ``expires_at``; workers
+    renew while they process it, and a crashed worker's shard becomes
+    available again once its lease expires. Writes that need ownership
+    (watermarks) check the owner in the same statement, so a worker whose
+    lease was taken over cannot overwrite the new owner's progress.
+
+    Every process opens its own connection. SQLite locking needs a local
+    filesystem, so workers on several machines need a DB on storage with
+    working POSIX locks.
+    """
+
+    def __init__(self, path: Path = LEASE_DB, ttl: float = LEASE_TTL_SECONDS):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    # === Shards ===
+    def register(self, shards: list, watermarks: dict = None):
+        """Add missing shards, seeding their watermark (e.g. from ingest_state.json)."""
+        watermarks = watermarks or {}
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            for shard in shards:
+                wm = watermarks.get(shard)
+                self.conn.execute("INSERT OR IGNORE INTO shards (shard, watermark) VALUES (?, ?)",
+                              (shard, json.dumps(wm) if wm else None))
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def acquire(self, owner: str, shards: list = None, min_interval: float = 0.0):
+        """Lease the free shard that was processed least recently, or return None.
+
+        Only shards whose last run is at least ``min_interval`` seconds ago
+        are due; ``shards`` restricts the choice to the given names.
+        """
+        now = time.time()
+        # BEGIN IMMEDIATE nimmt sofort den Schreib-Lock – zwei Worker können nicht denselben Shard wählen
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            sql = ("SELECT shard FROM shards WHERE (owner IS NULL OR expires_at < ?) AND last_done <= ?")
+            params = [now, now - min_interval]
+            if shards is not None:
+                sql += f" AND shard IN ({','.join('?' * len(shards))})"
+                params += list(shards)
+            row = self.conn.execute(sql + " ORDER BY last_done, shard LIMIT 1", params).fetchone()
+            if row:
+                self.conn.execute("UPDATE shards SET owner = ?, expires_at = ? WHERE shard = ?", (owner, now + self.ttl, row[0]))
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return row[0] if row else None
+
+    def renew(self, shard: str, owner: str):
+        """Extend the lease; raises ``LeaseLost`` if another worker took it over."""
+        cur = self.conn.execute("UPDATE shards SET expires_at = ? WHERE shard = ? AND owner = ? AND expires_at >= ?",
+                                (time.time() + self.ttl, shard, owner, time.time()))
+        if cur.rowcount != 1:
+            raise LeaseLost(shard)
+
+    @contextmanager
+    def heartbeat(self, shard: str, owner: str, interval: float = None):
+        """Keep renewing the lease in a background thread while a long step (an analysis) runs.
+
+        The thread uses its own connection; a lost lease only stops the
+        heartbeat – the caller's next ``renew`` raises ``LeaseLost``.
+        """
+        stop = threading.Event()
+        interval = interval or self.ttl / 3
+
+        def beat():
+            conn = LeaseStore(self.path, self.ttl)
+            try:
+                while not stop.wait(interval):
+                    conn.renew(shard, owner)
+            except LeaseLost:
+                pass
+            finally:
+                conn.close()
+
+        thread = threading.Thread(target=beat, name=f"lease-heartbeat-{shard}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def release(self, shard: str, owner: str, done: bool = True):
+        """Give the shard back; ``done`` marks this run as completed for scheduling."""
+        if done:
+            self.conn.execute("UPDATE shards SET owner = NULL, expires_at = 0, last_done = ?, runs = runs + 1 "
+                              "WHERE shard = ? AND owner = ?", (time.time(), shard, owner))
+        else:
+            self.conn.execute("UPDATE shards SET owner = NULL, expires_at = 0 WHERE shard = ? AND owner = ?", (shard, owner))
+
+    def pending(self, shards: list, since: float) -> int:
+        """Number of ``shards`` not completed since ``since`` (for run-once mode)."""
+        marks = ",".join("?" * len(shards))
+        row = self.conn.execute(f"SELECT COUNT(*) FROM shards WHERE shard IN ({marks}) AND last_done < ?",
+                                [*shards, since]).fetchone()
+        return row[0]
+
+    # === Watermarks ===
+    def get_watermark(self, shard: str):
+        row = self.conn.execute("SELECT watermark FROM shards WHERE shard = ?", (shard,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+    def set_watermark(self, shard: str, owner: str, watermark: dict):
+        cur = self.conn.execute("UPDATE shards SET watermark = ?, expires_at = ? WHERE shard = ? AND owner = ?",
+                                (json.dumps(watermark), time.time() + self.ttl, shard, owner))
+        if cur.rowcount != 1:
+            raise LeaseLost(shard)
+
+    def watermarks(self) -> dict:
+        rows = self.conn.execute("SELECT shard, watermark FROM shards WHERE watermark IS NOT NULL").fetchall()
+        return {shard: json.loads(wm) for shard, wm in rows}
+
+    # === Artikel-Claims ===
+    def claim(self, article_key: str, shard: str) -> bool:
+        """First worker to claim an article analyzes it; the same story under another symbol is skipped.
+
+        A claim left by the same shard counts as our own: only the lease holder
+        processes a shard, so such a claim stems from a run that died before
+        the watermark moved past the article, and it must be retried.
+        """
+        cur = self.conn.execute(
+            "INSERT INTO claims (article_key, shard, claimed_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (article_key) DO UPDATE SET claimed_at = excluded.claimed_at WHERE claims.shard = excluded.shard",
+            (article_key, shard, time.time()))
+        return cur.rowcount == 1
+
+    def unclaim(self, article_key: str):
+        self.conn.execute("DELETE FROM claims WHERE article_key = ?", (article_key,))
+
+    def prune_claims(self, older_than_seconds: float) -> int:
+        return self.conn.execute("DELETE FROM claims WHERE claimed_at < ?", (time.time() - older_than_seconds,)).rowcount
+
+    def status(self) -> list:
+        return self.conn.execute(
+            "SELECT shard, owner, expires_at, last_done, runs FROM shards ORDER BY shard").fetchall()
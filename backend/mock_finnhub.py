@@ -0,0 +1,181 @@
+# backend/mock_finnhub.py - Lokaler Finnhub-Ersatz (synthetisch oder aus dem Roh-Archiv) für Offline-Benchmarks
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs
+from raw_archive import ARCHIVE_DIR, archived_days, iter_records
+
+CATEGORIES = ["general", "forex", "earnings", "economy"]
+
+
+# === 1) Daten ===
+class SyntheticFeed:
+    """Deterministic stream of Finnhub-like articles.
+
+    New ids appear at ``arrival_rate`` per second, so ``minId`` polling
+    behaves like the real API; ``overlap`` of the stories are shared by all
+    categories (same id and URL) like the Walmart example in latest_news.csv.
+    """
+
+    def __init__(self, volume: int = 100, arrival_rate: float = 0.5, overlap: float = 0.5, seed: int = 42):
+        self.volume = volume
+        self.arrival_rate = arrival_rate
+        self.overlap = overlap
+        self.seed = seed
+        self.started = time.time()
+        self.base_id = 100_000
+
+    def _shared(self, n: int) -> bool:
+        return int(hashlib.md5(f"{self.seed}:{n}".encode()).hexdigest()[:4], 16) / 0xFFFF < self.overlap
+
+    def _article(self, n: int, category: str) -> dict:
+        shared = self._shared(n)
+        suffix = "" if shared else f"-{category}"
+        variant = 0 if shared else (CATEGORIES.index(category) + 1 if category in CATEGORIES else 9)
+        spacing = 1 / self.arrival_rate if self.arrival_rate > 0 else 60
+        return {
+            "category": category,
+            "datetime": int(self.started + (n - self.base_id) * spacing),
+            "headline": f"Synthetic market story {n}{suffix}: stocks move on macro data",
+            "id": n * 10 + variant,
+            "image": "",
+            "related": "",
+            "source": "MockWire",
+            "summary": f"Story {n}{suffix}. Investors weigh inflation, earnings and central bank signals. " * 3,
+            "url": f"https://mock.example.com/story/{n}{suffix}",
+        }
+
+    def news(self, category: str, min_id: int = 0) -> list:
+        top = self.base_id + int((time.time() - self.started) * self.arrival_rate)
+        articles = [self._article(n, category) for n in range(top, top - self.volume, -1)]
+        return [a for a in articles if a["id"] > min_id]
+
+    def company_news(self, symbol: str, from_date: str, to_date: str) -> list:
+        start = datetime.fromisoformat(from_date).replace(tzinfo=timezone.utc)
+        end = datetime.fromisoformat(to_date).replace(tzinfo=timezone.utc) + timedelta(days=1)
+        span = max((end - start).total_seconds(), 1)
+        seed = int(hashlib.md5(symbol.encode()).hexdigest()[:6], 16)
+        articles = []
+        for i in range(self.volume):
+            ts = int(start.timestamp() + span * (i + 0.5) / self.volume)
+            articles.append({
+                "category": "company", "datetime": ts, "headline": f"{symbol} update {i}: company news",
+                "id": seed * 1000 + i, "image": "", "related": symbol, "source": "MockWire",
+                "summary": f"{symbol} company-specific development number {i}.", "url": f"https://mock.example.com/{symbol}/{ts}/{i}",
+            })
+        return sorted(articles, key=lambda a: a["datetime"], reverse=True)
+
+
+class RecordedFeed:
+    """Serves payloads captured in the raw archive (newest record per endpoint/key wins)."""
+
+    def __init__(self, archive_dir: Path = ARCHIVE_DIR, days: int = 30):
+        self.records = {}
+        today = date.today()
+        for _, path in archived_days(today - timedelta(days=days), today, archive_dir):
+            for record in iter_records(path):
+                self.records[(record.get("endpoint"), record.get("key"))] = record.get("payload") or []
+
+    def news(self, category: str, min_id: int = 0) -> list:
+        return [a for a in self.records.get(("/news", category), []) if a.get("id", 0) > min_id]
+
+    def company_news(self, symbol: str, from_date: str, to_date: str) -> list:
+        return list(self.records.get(("/company-news", f"company:{symbol}"), []))
+
+
+# === 2) Server ===
+class MockFinnhubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, feed, latency_ms: float = 50, jitter_ms: float = 20,
+                 error_rate: float = 0.0, throttle_rate: float = 0.0):
+        super().__init__(address, _Handler)
+        self.feed = feed
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}/api/v1"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-Alive wie bei der echten API
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+        delay = max(0.0, random.gauss(server.latency_ms, server.jitter_ms)) / 1000
+        time.sleep(delay)
+
+        roll = random.random()
+        if roll < server.error_rate:
+            return self._send(500, {"error": "mock internal error"})
+        if roll < server.error_rate + server.throttle_rate:
+            return self._send(429, {"error": "API limit reached"}, {"Retry-After": "1"})
+
+        parts = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        if parts.path.endswith("/news"):
+            return self._send(200, server.feed.news(query.get("category", "general"), int(query.get("minId", 0) or 0)))
+        if parts.path.endswith("/company-news"):
+            today = date.today().isoformat()
+            return self._send(200, server.feed.company_news(
+                query.get("symbol", "AAPL"), query.get("from", today), query.get("to", today)))
+        return self._send(404, {"error": f"unknown endpoint {parts.path}"})
+
+
+def start_mock_server(host: str = "127.0.0.1", port: int = 0, feed=None, **options) -> MockFinnhubServer:
+    """Start the mock in a background thread; point ``FINNHUB_BASE_URL`` at ``server.base_url``."""
+    server = MockFinnhubServer((host, port), feed or SyntheticFeed(), **options)
+    threading.Thread(target=server.serve_forever, name="mock-finnhub", daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve synthetic or recorded Finnhub /news and /company-news payloads.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--recorded", action="store_true", help="Serve payloads from the raw archive instead of synthetic data")
+    parser.add_argument("--archive-dir", type=Path, default=ARCHIVE_DIR)
+    parser.add_argument("--volume", type=int, default=100, help="Articles per synthetic response")
+    parser.add_argument("--arrival-rate", type=float, default=0.5, help="New synthetic articles per second")
+    parser.add_argument("--overlap", type=float, default=0.5, help="Share of stories present in every category")
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--jitter-ms", type=float, default=20)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    args = parser.parse_args()
+
+    feed = RecordedFeed(args.archive_dir) if args.recorded else SyntheticFeed(args.volume, args.arrival_rate, args.overlap)
+    server = MockFinnhubServer((args.host, args.port), feed, args.latency_ms, args.jitter_ms, args.error_rate, args.throttle_rate)
+    print(f"🧪 Mock Finnhub listening on {server.base_url} – export FINNHUB_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
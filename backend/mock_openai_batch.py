@@ -0,0 +1,171 @@
+# backend/mock_openai_batch.py - Lokaler Ersatz für die OpenAI Files-/Batch-Endpunkte (Offline-Tests des Bulk-Modus)
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit
+
+
+def mock_completion(body: dict) -> dict:
+    """Chat completion with a valid analysis JSON for the title found in the prompt."""
+    prompt = body["messages"][-1]["content"]
+    title = prompt.split("Title: ", 1)[-1].split("\n", 1)[0]
+    content = json.dumps({
+        "impact": (len(title) % 7) - 3, "confidence": "medium", "markets": "S&P 500",
+        "patterns": "Similar to earlier moves on comparable news.",
+        "explanation": f"Bulk analysis of: {title}",
+    })
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "object": "chat.completion", "created": int(time.time()),
+        "model": body.get("model", "gpt-4"),
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4,
+                  "total_tokens": (len(prompt) + len(content)) // 4},
+    }
+
+
+# === 1) Server ===
+class MockBatchServer(ThreadingHTTPServer):
+    """Imitates ``/v1/files`` and ``/v1/batches``; a batch completes ``completion_seconds`` after creation.
+
+    ``fail_rate`` of the requests end up in the error file with status 500,
+    like individual failures inside a real batch.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, completion_seconds: float = 2.0, fail_rate: float = 0.0):
+        super().__init__(address, _Handler)
+        self.completion_seconds = completion_seconds
+        self.fail_rate = fail_rate
+        self.files = {}
+        self.batches = {}
+        # Reentrant: refresh() legt unter dem Lock die Ergebnisdateien an
+        self.lock = threading.RLock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}/v1"
+
+    def add_file(self, content: bytes, filename: str, purpose: str) -> dict:
+        meta = {"id": f"file-{uuid.uuid4().hex[:16]}", "object": "file", "bytes": len(content),
+                "created_at": int(time.time()), "filename": filename, "purpose": purpose, "status": "processed"}
+        with self.lock:
+            self.files[meta["id"]] = (meta, content)
+        return meta
+
+    def refresh(self, batch: dict) -> dict:
+        """Run the batch once its completion time has passed."""
+        if batch["status"] != "in_progress" or time.time() < batch["_due"]:
+            return batch
+        lines = self.files[batch["input_file_id"]][1].decode("utf-8").splitlines()
+        outputs, errors = [], []
+        for line in filter(None, lines):
+            request = json.loads(line)
+            entry = {"id": f"batch_req_{uuid.uuid4().hex[:12]}", "custom_id": request["custom_id"], "error": None}
+            if random.random() < self.fail_rate:
+                entry["response"] = {"status_code": 500, "request_id": uuid.uuid4().hex,
+                                     "body": {"error": {"message": "mock server error", "type": "server_error"}}}
+                errors.append(entry)
+            else:
+                entry["response"] = {"status_code": 200, "request_id": uuid.uuid4().hex,
+                                     "body": mock_completion(request["body"])}
+                outputs.append(entry)
+        to_jsonl = lambda entries: "".join(json.dumps(e) + "\n" for e in entries).encode("utf-8")
+        batch["output_file_id"] = self.add_file(to_jsonl(outputs), "output.jsonl", "batch_output")["id"] if outputs else None
+        batch["error_file_id"] = self.add_file(to_jsonl(errors), "errors.jsonl", "batch_output")["id"] if errors else None
+        batch["request_counts"] = {"total": len(outputs) + len(errors), "completed": len(outputs), "failed": len(errors)}
+        batch["status"] = "completed"
+        batch["completed_at"] = int(time.time())
+        return batch
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body, raw: bytes = None):
+        data = raw if raw is not None else json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/octet-stream" if raw is not None else "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _public(self, batch: dict) -> dict:
+        return {k: v for k, v in batch.items() if not k.startswith("_")}
+
+    def do_POST(self):
+        server = self.server
+        path = urlsplit(self.path).path.rstrip("/")
+        data = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if path.endswith("/files"):
+            # multipart/form-data mit den Feldern "file" und "purpose"
+            message = BytesParser().parsebytes(
+                b"Content-Type: " + self.headers["Content-Type"].encode("latin-1") + b"\r\n\r\n" + data)
+            fields = {part.get_param("name", header="content-disposition"): part for part in message.get_payload()}
+            upload = fields["file"]
+            purpose = fields["purpose"].get_payload(decode=True).decode() if "purpose" in fields else "batch"
+            return self._send(200, server.add_file(upload.get_payload(decode=True), upload.get_filename() or "input.jsonl", purpose))
+        if path.endswith("/batches"):
+            body = json.loads(data or b"{}")
+            if body.get("input_file_id") not in server.files:
+                return self._send(400, {"error": {"message": "unknown input_file_id", "type": "invalid_request_error"}})
+            batch = {"id": f"batch_{uuid.uuid4().hex[:16]}", "object": "batch", "endpoint": body.get("endpoint"),
+                     "input_file_id": body["input_file_id"], "completion_window": body.get("completion_window", "24h"),
+                     "status": "in_progress", "created_at": int(time.time()), "output_file_id": None,
+                     "error_file_id": None, "metadata": body.get("metadata"),
+                     "request_counts": {"total": 0, "completed": 0, "failed": 0},
+                     "_due": time.time() + server.completion_seconds}
+            with server.lock:
+                server.batches[batch["id"]] = batch
+            return self._send(200, self._public(batch))
+        return self._send(404, {"error": {"message": f"unknown endpoint {path}"}})
+
+    def do_GET(self):
+        server = self.server
+        parts = urlsplit(self.path).path.rstrip("/").split("/")
+        if len(parts) >= 2 and parts[-2] == "batches":
+            with server.lock:
+                batch = server.batches.get(parts[-1])
+                if batch is not None:
+                    server.refresh(batch)
+            if batch is None:
+                return self._send(404, {"error": {"message": "batch not found"}})
+            return self._send(200, self._public(batch))
+        if len(parts) >= 3 and parts[-1] == "content" and parts[-3] == "files":
+            entry = server.files.get(parts[-2])
+            if entry is None:
+                return self._send(404, {"error": {"message": "file not found"}})
+            return self._send(200, None, raw=entry[1])
+        return self._send(404, {"error": {"message": f"unknown endpoint {self.path}"}})
+
+
+def start_mock_batch_server(host: str = "127.0.0.1", port: int = 0, **options) -> MockBatchServer:
+    """Start the mock in a background thread; point ``OPENAI_BASE_URL`` at ``server.base_url``."""
+    server = MockBatchServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, name="mock-openai-batch", daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the OpenAI Files/Batch endpoints.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--completion-seconds", type=float, default=2.0, help="Time until a batch completes")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of requests that fail inside a batch")
+    args = parser.parse_args()
+
+    server = MockBatchServer((args.host, args.port), args.completion_seconds, args.fail_rate)
+    print(f"🧪 Mock OpenAI batch API listening on {server.base_url} – export OPENAI_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
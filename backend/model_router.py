@@ -0,0 +1,301 @@
+# backend/model_router.py - Gestufte Modellwahl: günstige Triage zuerst, GPT-4 nur bei hohem Impact oder Unsicherheit
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+import numpy as np
+from news_processor import (
+    OPENAI_MODEL, build_prompt, lookup_analysis, store_analysis, request_analysis, request_analysis_async,
+    get_fallback_analysis, record_usage,
+)
+import news_processor
+
+MODEL_ROUTING_ENABLED = os.environ.get("MODEL_ROUTING_ENABLED", "0") == "1"
+TRIAGE_MODEL = os.environ.get("ROUTE_TRIAGE_MODEL", "gpt-4o-mini")
+# Ab diesem |impact| der Triage wird mit dem großen Modell nachanalysiert
+ROUTE_IMPACT_THRESHOLD = float(os.environ.get("ROUTE_IMPACT_THRESHOLD", "4"))
+# Triage-Konfidenzen, die als unsicher gelten und ebenfalls eskalieren
+ROUTE_UNCERTAIN_CONFIDENCE = tuple(c.strip() for c in os.environ.get("ROUTE_UNCERTAIN_CONFIDENCE", "low").split(",") if c.strip())
+# Zufallsstichprobe nicht eskalierter Artikel, die trotzdem beide Modelle sieht (misst die Übereinstimmung unverzerrt)
+ROUTE_AUDIT_RATE = float(os.environ.get("ROUTE_AUDIT_RATE", "0.05"))
+ROUTING_LOG = Path(os.environ.get("ROUTING_LOG", Path(__file__).parent.parent / "data" / "routing_log.jsonl"))
+
+# USD pro 1 Mio. Tokens (Prompt, Completion); per ROUTE_PRICES='{"model": [in, out]}' überschreibbar
+PRICES_PER_MTOK = {
+    "gpt-4": (30.0, 60.0),
+    "gpt-4-turbo": (10.0, 30.0),
+    "gpt-4o": (2.5, 10.0),
+    "gpt-4o-mini": (0.15, 0.6),
+    "gpt-3.5-turbo": (0.5, 1.5),
+}
+_prices = None
+
+
+def prices() -> dict:
+    """Price table incl. ``ROUTE_PRICES`` overrides, parsed on first use; a malformed value only logs a warning."""
+    global _prices
+    if _prices is None:
+        table = dict(PRICES_PER_MTOK)
+        raw = os.environ.get("ROUTE_PRICES", "")
+        if raw.strip():
+            try:
+                table.update({k: (float(v[0]), float(v[1])) for k, v in json.loads(raw).items()})
+            except (ValueError, TypeError, AttributeError, IndexError, KeyError) as e:
+                print(f"⚠️  Ignoring malformed ROUTE_PRICES ({e}); using the default price table")
+                table = dict(PRICES_PER_MTOK)
+        _prices = table
+    return _prices
+
+
+def call_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    price_in, price_out = prices().get(model, (0.0, 0.0))
+    return (prompt_tokens * price_in + completion_tokens * price_out) / 1e6
+
+
+def agrees(a: dict, b: dict, tolerance: float = 2) -> bool:
+    """Same direction (bearish/neutral/bullish) and impact within ``tolerance``."""
+    ia, ib = float(a.get("impact", 0)), float(b.get("impact", 0))
+    return bool(np.sign(ia) == np.sign(ib) and abs(ia - ib) <= tolerance)
+
+
+# === 1) Router ===
+class ModelRouter:
+    """Analyzes with ``triage_model`` first and escalates to ``final_model`` only when needed.
+
+    An article escalates when the triage ``|impact|`` reaches
+    ``impact_threshold``, its confidence is in ``uncertain`` or the triage
+    call failed; otherwise the triage analysis is stored. ``audit_rate`` of
+    the other articles are escalated anyway, so the agreement between the
+    tiers is also known where the router trusts the cheap model. Every
+    decision goes to ``log_path`` for threshold tuning (``python model_router.py``).
+    """
+
+    def __init__(self, triage_model: str = TRIAGE_MODEL, final_model: str = OPENAI_MODEL,
+                 impact_threshold: float = ROUTE_IMPACT_THRESHOLD, uncertain: tuple = ROUTE_UNCERTAIN_CONFIDENCE,
+                 audit_rate: float = ROUTE_AUDIT_RATE, log_path: Path = ROUTING_LOG):
+        self.triage_model = triage_model
+        self.final_model = final_model
+        self.impact_threshold = impact_threshold
+        self.uncertain = uncertain
+        self.audit_rate = audit_rate
+        self.log_path = log_path
+        self.lock = threading.Lock()
+        self.tiers = {}
+        self.counts = {"articles": 0, "escalated": 0, "audited": 0, "triage_failed": 0, "fallbacks": 0}
+        self.pairs = []  # (triage, final, audited)
+
+    def _record_call(self, model: str, stats: dict):
+        with self.lock:
+            tier = self.tiers.setdefault(model, {"calls": 0, "cached": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                                                 "cost_usd": 0.0, "latencies": []})
+            if stats is None:
+                tier["cached"] += 1
+                return
+            tier["calls"] += 1
+            tier["prompt_tokens"] += stats["prompt_tokens"]
+            tier["completion_tokens"] += stats["completion_tokens"]
+            tier["cost_usd"] += call_cost(model, stats["prompt_tokens"], stats["completion_tokens"])
+            tier["latencies"].append(stats["seconds"])
+
+    def _cached(self, model: str, title: str, description: str, body: str = None):
+        cache_key, cached = lookup_analysis(title, description, body, model)
+        if cached:
+            self._record_call(model, None)
+        return cache_key, cached
+
+    def _failed(self, model: str, title: str, error):
+        record_usage(api_errors=1)
+        print(f"❌ Error with {model} analysis for '{title[:30]}...': {error}")
+
+    def _store(self, model: str, parsed, stats: dict, cache_key: str):
+        self._record_call(model, stats)
+        return store_analysis(parsed, cache_key, model) if parsed is not None else None
+
+    def _analyze(self, model: str, title: str, description: str, body: str = None):
+        """Result of ``model`` (cache first), None if the call failed or the answer was unusable."""
+        cache_key, cached = self._cached(model, title, description, body)
+        if cached:
+            return cached
+        try:
+            parsed, stats = request_analysis(build_prompt(title, description, body), model)
+        except Exception as e:
+            return self._failed(model, title, e)
+        return self._store(model, parsed, stats, cache_key)
+
+    async def _analyze_async(self, client, model: str, title: str, description: str, body: str = None,
+                             timeout: float = None):
+        """``_analyze`` on an AsyncOpenAI ``client``."""
+        cache_key, cached = self._cached(model, title, description, body)
+        if cached:
+            return cached
+        try:
+            parsed, stats = await request_analysis_async(client, build_prompt(title, description, body), model,
+                                                         timeout=timeout)
+        except asyncio.TimeoutError:
+            return self._failed(model, title, f"timed out after {timeout:.0f}s")
+        except Exception as e:
+            return self._failed(model, title, e)
+        return self._store(model, parsed, stats, cache_key)
+
+    def escalation_reason(self, triage: dict):
+        if triage is None:
+            return "triage_failed"
+        if abs(float(triage.get("impact", 0))) >= self.impact_threshold:
+            return "impact"
+        if triage.get("confidence") in self.uncertain:
+            return "uncertain"
+        if self.audit_rate > 0 and random.random() < self.audit_rate:
+            return "audit"
+        return None
+
+    def analyze(self, title: str, description: str, body: str = None) -> dict:
+        if not news_processor.client:
+            return get_fallback_analysis(title, description)
+        triage = self._analyze(self.triage_model, title, description, body)
+        reason = self.escalation_reason(triage)
+        final = self._analyze(self.final_model, title, description, body) if reason else None
+        return self._decide(title, description, triage, final, reason)
+
+    async def analyze_async(self, client, title: str, description: str, body: str = None,
+                            timeout: float = None) -> dict:
+        """``analyze`` on a shared AsyncOpenAI ``client`` (used by ``async_analyzer``)."""
+        if not client:
+            return get_fallback_analysis(title, description)
+        triage = await self._analyze_async(client, self.triage_model, title, description, body, timeout)
+        reason = self.escalation_reason(triage)
+        final = await self._analyze_async(client, self.final_model, title, description, body, timeout) if reason else None
+        return self._decide(title, description, triage, final, reason)
+
+    def _decide(self, title: str, description: str, triage: dict, final: dict, reason) -> dict:
+        with self.lock:
+            self.counts["articles"] += 1
+            self.counts["escalated"] += reason in ("impact", "uncertain", "triage_failed")
+            self.counts["audited"] += reason == "audit"
+            self.counts["triage_failed"] += reason == "triage_failed"
+            if triage is not None and final is not None:
+                self.pairs.append((triage, final, reason == "audit"))
+        self._log(title, triage, final, reason)
+
+        result = final or triage
+        if result is None:
+            with self.lock:
+                self.counts["fallbacks"] += 1
+            return get_fallback_analysis(title, description)
+        tier = self.final_model if final else self.triage_model
+        print(f"🧭 {tier}{f' (escalated: {reason})' if reason else ''}: {title[:50]}...")
+        return result
+
+    def _log(self, title: str, triage: dict, final: dict, reason):
+        entry = {"at": datetime.now(timezone.utc).isoformat(), "title": title[:200], "reason": reason,
+                 "triage_model": self.triage_model, "final_model": self.final_model,
+                 "triage": {k: triage[k] for k in ("impact", "confidence")} if triage else None,
+                 "final": {k: final[k] for k in ("impact", "confidence")} if final else None}
+        with self.lock:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def summary(self) -> dict:
+        with self.lock:
+            tiers = {}
+            for model, t in self.tiers.items():
+                lat = np.asarray(t["latencies"], dtype=np.float64)
+                tiers[model] = {k: v for k, v in t.items() if k != "latencies"}
+                tiers[model]["cost_usd"] = round(t["cost_usd"], 4)
+                if len(lat):
+                    p50, p95 = np.percentile(lat, [50, 95])
+                    tiers[model].update(latency_p50=round(float(p50), 3), latency_p95=round(float(p95), 3))
+            pairs = list(self.pairs)
+            counts = dict(self.counts)
+        articles = counts["articles"]
+        audited = [(t, f) for t, f, a in pairs if a]
+        final = tiers.get(self.final_model, {})
+        # Kosten, wenn jeder Artikel direkt ans große Modell gegangen wäre (Ø-Kosten pro Aufruf hochgerechnet)
+        per_final_call = final.get("cost_usd", 0) / final["calls"] if final.get("calls") else 0.0
+        return {
+            **counts,
+            "triage_model": self.triage_model,
+            "final_model": self.final_model,
+            "impact_threshold": self.impact_threshold,
+            "escalation_rate": round(counts["escalated"] / articles, 4) if articles else 0.0,
+            "agreement_rate": round(float(np.mean([agrees(t, f) for t, f, _ in pairs])), 4) if pairs else None,
+            "audit_agreement_rate": round(float(np.mean([agrees(t, f) for t, f in audited])), 4) if audited else None,
+            "cost_usd": round(sum(t["cost_usd"] for t in tiers.values()), 4),
+            "cost_if_all_final_usd": round(per_final_call * articles, 4),
+            "tiers": tiers,
+        }
+
+    def report(self) -> dict:
+        s = self.summary()
+        print(f"🧭 Model routing: {s['articles']} articles, {s['escalated']} escalated to {s['final_model']} "
+              f"({s['escalation_rate']:.0%}), {s['audited']} audited, cost ${s['cost_usd']:.4f} "
+              f"(all-{s['final_model']} estimate ${s['cost_if_all_final_usd']:.4f})")
+        if s["agreement_rate"] is not None:
+            audit = f", audit sample {s['audit_agreement_rate']:.0%}" if s["audit_agreement_rate"] is not None else ""
+            print(f"   - Triage/final agreement: {s['agreement_rate']:.0%}{audit}")
+        for model, t in s["tiers"].items():
+            print(f"   - {model}: {t['calls']} calls, {t['cached']} cached, p50 {t.get('latency_p50', 0):.2f}s, "
+                  f"${t['cost_usd']:.4f}")
+        return s
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_router():
+    """Process-wide router, or None unless ``MODEL_ROUTING_ENABLED=1``."""
+    global _router
+    if not MODEL_ROUTING_ENABLED:
+        return None
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter()
+        return _router
+
+
+# === 2) Schwellen aus dem Log ableiten ===
+def load_routing_log(path: Path = ROUTING_LOG) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def tune(path: Path = ROUTING_LOG, thresholds=(2, 3, 4, 5, 6), uncertain: tuple = ROUTE_UNCERTAIN_CONFIDENCE) -> list:
+    """Escalation rate and misses per impact threshold.
+
+    A miss is an article with both analyses whose triage would *not* have
+    escalated but whose final analysis disagrees; the audit sample keeps
+    this estimate unbiased for the articles the router does not escalate.
+    """
+    entries = [e for e in load_routing_log(path) if e.get("triage")]
+    if not entries:
+        raise ValueError(f"No triage decisions in {path}")
+    impacts = np.array([abs(float(e["triage"]["impact"])) for e in entries])
+    unsure = np.array([e["triage"]["confidence"] in uncertain for e in entries])
+    audited = [e for e in entries if e.get("final") and e.get("reason") == "audit"]
+    rows = []
+    print(f"📐 {len(entries)} triage decisions, {len(audited)} audited pairs ({path})")
+    print(f"{'threshold':>9} | {'escalated':>9} | {'audit misses':>12}")
+    for threshold in thresholds:
+        escalated = float(((impacts >= threshold) | unsure).mean())
+        kept = [e for e in audited if abs(float(e["triage"]["impact"])) < threshold]
+        misses = sum(1 for e in kept if not agrees(e["triage"], e["final"]))
+        miss_rate = misses / len(kept) if kept else None
+        rows.append({"threshold": threshold, "escalation_rate": round(escalated, 4),
+                     "audit_pairs": len(kept), "miss_rate": round(miss_rate, 4) if miss_rate is not None else None})
+        print(f"{threshold:>9g} | {escalated:>9.0%} | "
+              + (f"{miss_rate:>11.0%} ({misses}/{len(kept)})" if kept else f"{'n/a':>12}"))
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tune the model-routing thresholds from the routing log.")
+    parser.add_argument("--log", type=Path, default=ROUTING_LOG)
+    parser.add_argument("--thresholds", default="2,3,4,5,6", help="Comma-separated |impact| thresholds to compare")
+    args = parser.parse_args()
+    tune(args.log, [float(t) for t in args.thresholds.split(",")])
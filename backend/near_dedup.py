@@ -0,0 +1,142 @@
+# backend/near_dedup.py - SimHash-LSH zur Erkennung syndizierter Beinahe-Duplikate
+
+import csv
+import hashlib
+import os
+import re
+import threading
+from array import array
+from itertools import combinations
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# === 1) Konfiguration ===
+# Maximale Hamming-Distanz (von 64 Bit), ab der zwei Artikel als gleiche Story gelten
+NEAR_DUP_MAX_DISTANCE = int(os.environ.get("NEAR_DUP_MAX_DISTANCE", "6"))
+# Anzahl Bänder pro Hash-Schlüssel (siehe SimHashIndex)
+NEAR_DUP_BANDS_PER_KEY = int(os.environ.get("NEAR_DUP_BANDS_PER_KEY", "2"))
+# Wie weit die Historie aus der Ergebnis-CSV zurückreicht
+NEAR_DUP_HISTORY_DAYS = int(os.environ.get("NEAR_DUP_HISTORY_DAYS", "7"))
+
+FINGERPRINT_BITS = 64
+SHINGLE_SIZE = 3
+
+# Analysefelder, die bei einem Treffer übernommen werden
+ANALYSIS_FIELDS = ["sentiment", "markets", "intensity", "impact", "confidence", "patterns", "explanation"]
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+# === 2) Fingerprints ===
+def shingles(text: str, k: int = SHINGLE_SIZE) -> set:
+    tokens = _TOKEN_RE.findall(_TAG_RE.sub(" ", text or "").lower())
+    if len(tokens) < k:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)}
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash over word shingles; similar texts get fingerprints with a small Hamming distance."""
+    weights = [0] * FINGERPRINT_BITS
+    for shingle in shingles(text):
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def article_fingerprint(title: str, description: str) -> int:
+    return simhash(f"{title} {description}")
+
+
+# === 3) LSH-Index ===
+class SimHashIndex:
+    """Banded SimHash index.
+
+    The fingerprint is split into ``max_distance + bands_per_key`` bands. Two
+    fingerprints within ``max_distance`` bits differ in at most that many bands,
+    so they agree exactly on at least ``bands_per_key`` of them (pigeonhole).
+    One hash table per combination of ``bands_per_key`` bands therefore finds
+    every match while a lookup only scans the few entries sharing a bucket.
+    More bands per key means narrower buckets (faster lookups) at the cost of
+    more tables (memory, insert time).
+    """
+
+    def __init__(self, max_distance: int = NEAR_DUP_MAX_DISTANCE, bands_per_key: int = NEAR_DUP_BANDS_PER_KEY):
+        self.max_distance = max_distance
+        num_bands = max_distance + bands_per_key
+        band_bits = -(-FINGERPRINT_BITS // num_bands)
+        masks = [((1 << band_bits) - 1) << (b * band_bits) for b in range(num_bands)]
+        self.key_masks = [sum(masks[b] for b in combo) for combo in combinations(range(num_bands), bands_per_key)]
+        self.tables = [{} for _ in self.key_masks]
+        self.fingerprints = array("Q")
+        self.payloads = []
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.fingerprints)
+
+    def _keys(self, fingerprint: int):
+        for t, mask in enumerate(self.key_masks):
+            yield t, fingerprint & mask
+
+    def add(self, fingerprint: int, payload=None):
+        with self.lock:
+            idx = len(self.fingerprints)
+            self.fingerprints.append(fingerprint)
+            self.payloads.append(payload)
+            for t, key in self._keys(fingerprint):
+                self.tables[t].setdefault(key, []).append(idx)
+
+    def query(self, fingerprint: int):
+        """Return ``(distance, payload)`` of the closest entry within ``max_distance``, else None."""
+        best = None
+        seen = set()
+        with self.lock:
+            for t, key in self._keys(fingerprint):
+                for idx in self.tables[t].get(key, ()):
+                    if idx in seen:
+                        continue
+                    seen.add(idx)
+                    distance = (self.fingerprints[idx] ^ fingerprint).bit_count()
+                    if distance <= self.max_distance and (best is None or distance < best[0]):
+                        best = (distance, self.payloads[idx])
+                        if distance == 0:
+                            return best
+        return best
+
+
+# === 4) Index aus der Ergebnis-Historie aufbauen ===
+def is_reusable(analysis: dict) -> bool:
+    # "Analysis unavailable"-Fallbacks (API-/Parse-Fehler) nicht wiederverwenden
+    return not (analysis.get("confidence") == "low" and "unavailable" in (analysis.get("patterns") or ""))
+
+
+def build_index_from_csv(path: Path, days: int = NEAR_DUP_HISTORY_DAYS, max_distance: int = NEAR_DUP_MAX_DISTANCE) -> SimHashIndex:
+    index = SimHashIndex(max_distance)
+    if not path.exists():
+        return index
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    with open(path, "r", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            try:
+                published = datetime.fromisoformat(row.get("publishedAt", ""))
+            except ValueError:
+                continue
+            if published.tzinfo is None:
+                published = published.replace(tzinfo=timezone.utc)
+            if published < cutoff:
+                continue
+            if not is_reusable(row):
+                continue
+            payload = {field: row.get(field, "") for field in ANALYSIS_FIELDS}
+            payload["title"] = row.get("title", "")
+            index.add(article_fingerprint(row.get("title", ""), row.get("description", "")), payload)
+
+    return index
@@ -1,10 +1,8 @@
-import requests
 import os
-import pandas as pd
-from datetime import datetime, timezone
 from dotenv import load_dotenv
 from pathlib import Path
-import streamlit as st
+from finnhub_client import FETCH_CONCURRENCY, iter_categories
+from fast_parse import payloads_to_frame
 
 # Lade die .env-Datei exakt per Pfad
 dotenv_path = Path(__file__).resolve().parents[1] / ".env"
@@ -19,57 +17,24 @@ except (ImportError, AttributeError, KeyError):
 # Finnhub news categories to fetch
 NEWS_CATEGORIES = ["general", "forex", "earnings", "economy"]
 
-def fetch_news(categories=None, page_size=50):
+def fetch_news(categories=None, page_size=50, max_workers=FETCH_CONCURRENCY):
     if categories is None:
         categories = NEWS_CATEGORIES
     
-    all_articles = []
+    payloads = []
     
-    for category in categories:
-        url = "https://finnhub.io/api/v1/news"
-        params = {
-            "category": category,
-            "token": FINNHUB_API_KEY
-        }
-
-        try:
-            response = requests.get(url, params=params)
-            if response.status_code != 200:
-                print(f"Fehler beim Abrufen der {category} Nachrichten:", response.text)
-                continue
-
-            articles = response.json()
-            
-            # Add source_category to each article
-            for article in articles[:page_size//len(categories)]:  # Distribute page_size across categories
-                article['source_category'] = category
-                all_articles.append(article)
-                
-        except Exception as e:
-            print(f"Fehler beim Abrufen der {category} Nachrichten: {e}")
+    # Alle Kategorien parallel über eine gemeinsame Keep-Alive-Session abrufen
+    for category, articles in iter_categories(categories, FINNHUB_API_KEY, max_workers):
+        if isinstance(articles, Exception):
+            print(f"Fehler beim Abrufen der {category} Nachrichten: {articles}")
             continue
+            
+        # Distribute page_size across categories
+        payloads.append((category, articles[:page_size//len(categories)]))
 
-    # Sort articles by datetime (most recent first)
-    all_articles.sort(key=lambda x: x.get('datetime', 0), reverse=True)
-    
-    # Limit to page_size
-    all_articles = all_articles[:page_size]
-    
-    data = []
-    for article in all_articles:
-        # Convert Unix timestamp to ISO format
-        published_at = datetime.fromtimestamp(article.get('datetime', 0), tz=timezone.utc).isoformat()
-        
-        data.append({
-            "title": article.get("headline", ""),
-            "description": article.get("summary", ""),
-            "content": article.get("summary", ""),
-            "url": article.get("url", ""),
-            "publishedAt": published_at,
-            "source_category": article.get("source_category", "general")
-        })
-
-    df = pd.DataFrame(data)
+    # Spaltenweise direkt aus den Roh-Payloads: Duplikate zusammenfassen, neueste zuerst,
+    # auf page_size begrenzen, Zeitstempel vektorisiert nach ISO
+    df = payloads_to_frame(payloads, page_size)
     filename = "data/latest_news.csv"
     df.to_csv(filename, index=False)
     print(f"{len(df)} Nachrichten aus {len(categories)} Kategorien gespeichert in {filename}")
@@ -2,11 +2,30 @@
 
 import os
 import csv
+import argparse
+import time
+import threading
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-import requests
 from dotenv import load_dotenv
-from news_processor import analyze_news
+from news_processor import analyze_news, usage_summary
+from finnhub_client import FETCH_CONCURRENCY, COMPANY_CONCURRENCY
+from news_sources import FinnhubCategorySource, FinnhubCompanySource, load_sources, poll_sources
+from dedup import dedupe_articles, StreamingDeduper
+from pipeline import Stage, run_pipeline
+from prioritizer import PriorityBacklog
+from rate_limiter import report_throttling, throttling_summary
+from http_client import report_latency, latency_summary
+from fast_parse import iso_timestamps
+from csv_store import csv_lock
+from article_fetcher import ARTICLE_BODY_ENABLED, get_fetcher
+from relevance_gate import get_gate, light_analysis
+from ingest_report import RunReport
+from analysis_cache import get_cache, report_cache
+from structured_output import parse_summary
+from model_router import get_router
+from near_dedup import build_index_from_csv, article_fingerprint, is_reusable, ANALYSIS_FIELDS, NEAR_DUP_MAX_DISTANCE
+from watermarks import load_state, save_state, get_watermark, is_newer, advance_watermarks, held_back
 
 # Load environment variables
 load_dotenv()
@@ -19,11 +38,22 @@ try:
 except (ImportError, AttributeError, KeyError):
     FINNHUB_API_KEY = os.environ.get("FINNHUB_API_KEY")
 
-if not FINNHUB_API_KEY:
-    print("❌ ERROR: FINNHUB_API_KEY ist nicht gesetzt. Bitte lege ihn mit\n"
-          "   export FINNHUB_API_KEY=\"dein_key\"\n"
-          "in deiner Shell ab und lade dein Profil neu (z.B. `source ~/.zshrc`).")
-    exit(1)
+def require_api_key():
+    # Erst beim Abrufen prüfen, damit z.B. replay.py das Modul ohne Key importieren kann
+    if not FINNHUB_API_KEY:
+        print("❌ ERROR: FINNHUB_API_KEY ist nicht gesetzt. Bitte lege ihn mit\n"
+              "   export FINNHUB_API_KEY=\"dein_key\"\n"
+              "in deiner Shell ab und lade dein Profil neu (z.B. `source ~/.zshrc`).")
+        exit(1)
+
+def require_mode(mode: str):
+    # INGEST_MODE aus der Umgebung umgeht die argparse-choices
+    if mode not in INGEST_MODES:
+        print(f"❌ ERROR: Unbekannter INGEST_MODE {mode!r} – erlaubt: {', '.join(INGEST_MODES)}")
+        exit(1)
+    if mode in ("categories", "all") and not NEWS_CATEGORIES:
+        print("❌ ERROR: Keine News-Kategorien konfiguriert (NEWS_CATEGORIES ist leer).")
+        exit(1)
 
 # Pfad zum Datenordner
 DATA_DIR = Path(__file__).parent.parent / "data"
@@ -32,62 +62,126 @@ OUTPUT = DATA_DIR / "news_analysis_results.csv"
 # Finnhub news categories to fetch
 NEWS_CATEGORIES = ["general", "forex", "earnings", "economy"]
 
+# Zeitfenster für Kategorien, für die noch kein Watermark existiert (Erstlauf)
+INITIAL_HOURS_BACK = int(os.environ.get("INGEST_HOURS_BACK", "1"))
+
+# Watchlist für /company-news: WATCHLIST_SYMBOLS="AAPL,MSFT" oder eine Datei mit einem Symbol pro Zeile
+WATCHLIST_FILE = Path(os.environ.get("WATCHLIST_FILE", DATA_DIR / "watchlist.txt"))
+
+# categories | company | all
+INGEST_MODES = ("categories", "company", "all")
+INGEST_MODE = os.environ.get("INGEST_MODE", "categories")
+
+# Daemon: Grenzen für das adaptive Poll-Intervall und gewünschte neue Artikel pro Poll
+POLL_MIN_SECONDS = float(os.environ.get("INGEST_POLL_MIN_SECONDS", "30"))
+POLL_MAX_SECONDS = float(os.environ.get("INGEST_POLL_MAX_SECONDS", "900"))
+POLL_TARGET_ARTICLES = float(os.environ.get("INGEST_POLL_TARGET_ARTICLES", "2"))
+# Daemon-Dedup: Stories so lange merken, wie sie erneut geholt werden können (Company-News-Cursor ist tagesgenau)
+DEDUP_TTL_SECONDS = float(os.environ.get("INGEST_DEDUP_TTL_SECONDS", "172800"))
+DEDUP_MAX_ENTRIES = int(os.environ.get("INGEST_DEDUP_MAX_ENTRIES", "50000"))
+
+# Streaming-Pipeline: parallele Analysen, Queue-Größe und Micro-Batches beim Schreiben
+ANALYZE_WORKERS = int(os.environ.get("INGEST_ANALYZE_WORKERS", "4"))
+QUEUE_SIZE = int(os.environ.get("INGEST_QUEUE_SIZE", "50"))
+PERSIST_BATCH_SIZE = int(os.environ.get("INGEST_PERSIST_BATCH_SIZE", "10"))
+PERSIST_FLUSH_SECONDS = float(os.environ.get("INGEST_PERSIST_FLUSH_SECONDS", "2"))
+# Priorisierter Rückstau vor der Analyse (wichtigste Artikel zuerst, Deadline gegen Verhungern)
+ANALYZE_BACKLOG_SIZE = int(os.environ.get("INGEST_ANALYZE_BACKLOG_SIZE", "1000"))
+
+
+def load_watchlist() -> list:
+    symbols = os.environ.get("WATCHLIST_SYMBOLS", "")
+    if not symbols and WATCHLIST_FILE.exists():
+        symbols = WATCHLIST_FILE.read_text()
+    seen = []
+    for symbol in symbols.replace(",", "\n").splitlines():
+        symbol = symbol.split("#")[0].strip().upper()
+        if symbol and symbol not in seen:
+            seen.append(symbol)
+    return seen
+
 # === 2) Artikel holen ===
-def fetch_latest_articles(api_key: str, from_dt: datetime, to_dt: datetime):
+def select_new_articles(key: str, articles: list, state: dict, from_dt: datetime, to_dt: datetime) -> list:
+    """Tag articles with their source key and keep those above its watermark (or inside the window)."""
+    watermark = get_watermark(state, key)
+    selected = []
+    for article in articles:
+        if watermark:
+            # Alles oberhalb des Watermarks ist neu – auch nach Ausfällen (Catch-up)
+            is_new = is_newer(article, watermark)
+        else:
+            # Convert Unix timestamp to datetime
+            article_dt = datetime.fromtimestamp(article.get('datetime', 0), tz=timezone.utc)
+            # Only include articles within our time range
+            is_new = from_dt <= article_dt <= to_dt
+
+        if is_new:
+            article['source_category'] = key
+            selected.append(article)
+    return selected
+
+def fetch_latest_articles(api_key: str, from_dt: datetime, to_dt: datetime, max_workers: int = FETCH_CONCURRENCY, state: dict = None, categories: list = None):
     all_articles = []
+    state = state or {}
+    categories = categories or NEWS_CATEGORIES
     
-    print(f"🔍 Fetching articles from {len(NEWS_CATEGORIES)} categories...")
+    print(f"🔍 Fetching articles from {len(categories)} categories (max {max_workers} parallel)...")
     
-    for category in NEWS_CATEGORIES:
-        url = "https://finnhub.io/api/v1/news"
-        params = {
-            "category": category,
-            "token": api_key
-        }
-        
-        try:
-            print(f"📡 Fetching {category} news...")
-            resp = requests.get(url, params=params)
-            resp.raise_for_status()
-            articles = resp.json()
-            
-            print(f"📊 {category}: {len(articles)} articles received from API")
-            
-            # Add source_category to each article and filter by date
-            category_articles = 0
-            for article in articles:
-                # Convert Unix timestamp to datetime
-                article_dt = datetime.fromtimestamp(article.get('datetime', 0), tz=timezone.utc)
-                
-                # Only include articles within our time range
-                if from_dt <= article_dt <= to_dt:
-                    article['source_category'] = category
-                    all_articles.append(article)
-                    category_articles += 1
-                    
-            print(f"✅ {category}: {category_articles} articles in time range")
-                    
-        except Exception as e:
-            print(f"❌ Error fetching {category} news: {e}")
+    results = dict(FinnhubCategorySource(api_key, categories, max_workers).fetch(state, from_dt, to_dt))
+    
+    for category in categories:
+        articles = results.get(category, [])
+        if isinstance(articles, Exception):
+            print(f"❌ Error fetching {category} news: {articles}")
             continue
+            
+        print(f"📊 {category}: {len(articles)} articles received from API")
+        category_articles = select_new_articles(category, articles, state, from_dt, to_dt)
+        all_articles += category_articles
+        print(f"✅ {category}: {len(category_articles)} new articles")
+    
+    print(f"📈 Total new articles: {len(all_articles)}")
     
-    print(f"📈 Total articles in time range: {len(all_articles)}")
+    # Gleiche Story aus mehreren Kategorien nur einmal analysieren
+    total = len(all_articles)
+    all_articles = dedupe_articles(all_articles)
+    if total != len(all_articles):
+        print(f"🧹 Collapsed {total - len(all_articles)} cross-category duplicates → {len(all_articles)} unique articles")
     
     # Sort articles by datetime (most recent first)
     all_articles.sort(key=lambda x: x.get('datetime', 0), reverse=True)
     
     return all_articles
 
-# === 3) CSV schreiben (KORRIGIERTES FORMAT) ===
-def append_to_csv(articles: list, path: Path):
-    fieldnames = [
-        "title", "description", "publishedAt", "sentiment", "markets",
-        "intensity", "impact", "confidence", "patterns", "explanation", "image"
-    ]
+def fetch_company_articles(api_key: str, symbols: list, from_dt: datetime, to_dt: datetime, max_workers: int = COMPANY_CONCURRENCY, state: dict = None):
+    all_articles = []
+    state = state or {}
+    
+    print(f"🏢 Fetching company news for {len(symbols)} symbols (max {max_workers} parallel)...")
+    
+    results = FinnhubCompanySource(api_key, symbols, max_workers).fetch(state, from_dt, to_dt)
+    
+    failed = 0
+    for key, articles in results:
+        if isinstance(articles, Exception):
+            print(f"❌ Error fetching company news for {key}: {articles}")
+            failed += 1
+            continue
+        all_articles += select_new_articles(key, articles, state, from_dt, to_dt)
+    
+    print(f"📈 Company news: {len(all_articles)} new articles from {len(symbols) - failed}/{len(symbols)} symbols")
+    
+    total = len(all_articles)
+    all_articles = dedupe_articles(all_articles)
+    if total != len(all_articles):
+        print(f"🧹 Collapsed {total - len(all_articles)} duplicates across symbols → {len(all_articles)} unique articles")
     
-    path.parent.mkdir(parents=True, exist_ok=True)
+    all_articles.sort(key=lambda x: x.get('datetime', 0), reverse=True)
+    
+    return all_articles
 
-    # === 1) Bestehende Einträge aus der CSV lesen ===
+# === 3) CSV schreiben (KORRIGIERTES FORMAT) ===
+def load_existing_entries(path: Path) -> set:
     existing_entries = set()
     if path.exists():
         with open(path, "r", encoding="utf-8") as f:
@@ -95,106 +189,427 @@ def append_to_csv(articles: list, path: Path):
             for row in reader:
                 key = (row["title"].strip(), row["publishedAt"].strip())
                 existing_entries.add(key)
+    return existing_entries
+
+def split_stored(articles: list, existing_entries: set) -> tuple:
+    """``(fresh, stored)`` by the ``(title, publishedAt)`` key of ``append_to_csv`` – checked before
+    analyzing, so articles refetched behind a held-back watermark are not paid for twice."""
+    published = iso_timestamps([a.get("datetime", 0) for a in articles])
+    fresh, stored = [], []
+    for a, published_at in zip(articles, published):
+        (stored if (a.get("headline", "").strip(), published_at) in existing_entries else fresh).append(a)
+    return fresh, stored
+
+def upgrade_csv_header(path: Path, fieldnames: list) -> list:
+    """Add columns missing from an existing CSV's header (older rows get them empty); returns the header."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        if not reader.fieldnames or set(fieldnames) <= set(reader.fieldnames):
+            return reader.fieldnames or fieldnames
+        rows = list(reader)
+        added = [c for c in fieldnames if c not in reader.fieldnames]
+        columns = reader.fieldnames + added
+    tmp = path.with_suffix(".upgrade.tmp")
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp, path)
+    print(f"📋 CSV-Header erweitert um: {', '.join(added)}")
+    return columns
+
+def append_to_csv(articles: list, path: Path, existing_entries: set = None):
+    """Append analyzed articles, skipping ``(title, publishedAt)`` pairs already stored.
+
+    Long-running callers can pass the set from ``load_existing_entries`` once;
+    it is kept up to date here so the CSV is not re-read on every write.
+    Returns the articles that were actually written.
+    """
+    fieldnames = [
+        "title", "description", "publishedAt", "sentiment", "markets",
+        "intensity", "impact", "confidence", "patterns", "explanation", "image",
+        "source_categories"
+    ]
+    
+    # Gleiche Sperre wie ingest_worker/bulk_analyzer, damit kein paralleles Neuschreiben der CSV Zeilen verliert
+    with csv_lock(path):
+        # === 1) Bestehende Einträge aus der CSV lesen ===
+        if existing_entries is None:
+            existing_entries = load_existing_entries(path)
+
+        # === 2) Neue Artikel filtern ===
+        new_articles = []
+        # Zeitstempel für den ganzen Batch vektorisiert statt pro Zeile isoformat()
+        published = iso_timestamps([a.get("datetime", 0) for a in articles])
+        for a, published_at in zip(articles, published):
+            title = a.get("headline", "").strip()
+            key = (title, published_at)
+            if key not in existing_entries:
+                a["publishedAtISO"] = published_at
+                new_articles.append(a)
+                existing_entries.add(key)
 
-    # === 2) Neue Artikel filtern ===
-    new_articles = []
-    for a in articles:
-        title = a.get("headline", "").strip()
-        published_at = datetime.fromtimestamp(
-            a.get("datetime", 0), tz=timezone.utc
-        ).isoformat()
-        key = (title, published_at)
-        if key not in existing_entries:
-            a["publishedAtISO"] = published_at
-            new_articles.append(a)
-
-    if not new_articles:
-        print("ℹ️  Keine neuen Artikel zum Schreiben – alles bereits vorhanden.")
-        return
-
-    print(f"📝 Schreiben von {len(new_articles)} neuen Artikeln in {path}")
-
-    # === 3) Neue Artikel anhängen ===
-    write_header = not path.exists()
-    with open(path, "a", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        if write_header:
-            writer.writeheader()
-            print("📋 CSV-Header hinzugefügt")
-
-        for a in new_articles:
-            writer.writerow({
-                "title":       a.get("headline", ""),
-                "description": a.get("summary", ""),
-                "publishedAt": a.get("publishedAtISO"),
-                "sentiment":   a.get("sentiment", "Finance"),
-                "markets":     a.get("markets", ""),
-                "intensity":   a.get("intensity", "medium"),
-                "impact":      a.get("impact", "0"),
-                "confidence":  a.get("confidence", "medium"),
-                "patterns":    a.get("patterns", ""),
-                "explanation": a.get("explanation", ""),
-                "image":       ""
-            })
+        if not new_articles:
+            print("ℹ️  Keine neuen Artikel zum Schreiben – alles bereits vorhanden.")
+            return []
+
+        print(f"📝 Schreiben von {len(new_articles)} neuen Artikeln in {path}")
+
+        # === 3) Neue Artikel anhängen ===
+        write_header = not path.exists()
+        if not write_header:
+            # Ältere CSVs ohne source_categories einmalig um die Spalte erweitern
+            fieldnames = upgrade_csv_header(path, fieldnames)
+        with open(path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
+            if write_header:
+                writer.writeheader()
+                print("📋 CSV-Header hinzugefügt")
+
+            for a in new_articles:
+                writer.writerow({
+                    "title":       a.get("headline", ""),
+                    "description": a.get("summary", ""),
+                    "publishedAt": a.get("publishedAtISO"),
+                    "sentiment":   a.get("sentiment", "Finance"),
+                    "markets":     a.get("markets", ""),
+                    "intensity":   a.get("intensity", "medium"),
+                    "impact":      a.get("impact", "0"),
+                    "confidence":  a.get("confidence", "medium"),
+                    "patterns":    a.get("patterns", ""),
+                    "explanation": a.get("explanation", ""),
+                    "image":       "",
+                    "source_categories": ", ".join(a.get("source_categories") or [a.get("source_category", "")])
+                })
 
     print(f"✅ {len(new_articles)} Artikel erfolgreich angehängt.")
+    return new_articles
+
+# === 4) Analyse ===
+def load_near_index(path: Path = OUTPUT):
+    """Index of recent analyses in ``path`` for near-duplicate reuse (None if disabled)."""
+    if NEAR_DUP_MAX_DISTANCE < 0:
+        return None
+    near_index = build_index_from_csv(path)
+    print(f"🧬 Near-duplicate index: {len(near_index)} recent analyses (max distance {NEAR_DUP_MAX_DISTANCE})")
+    return near_index
+
+def analyze_article(article: dict, near_index=None) -> str:
+    """Analyze one article in place; returns how: ``"reused"`` (near-duplicate),
+    ``"gated"`` (relevance gate, no GPT-4 call) or ``"analyzed"``."""
+    title = article.get("headline", "")
+    description = article.get("summary", "")
+    fingerprint = article_fingerprint(title, description) if near_index is not None else None
+    match = near_index.query(fingerprint) if near_index is not None else None
 
-# === 4) Hauptfunktion ===
-def main():
+    gate = get_gate() if not match else None
+    if match:
+        distance, analysis = match
+        print(f"♻️  Near-duplicate (distance {distance}) of: {analysis.get('title', '')[:50]}... – reusing analysis")
+    elif gate is not None and not gate.is_relevant(title, description):
+        # Lokales Modell hält den Artikel für nicht marktbewegend – kein GPT-4-Aufruf
+        print(f"🚦 Not market-moving, skipping GPT-4: {title[:50]}...")
+        analysis = light_analysis(title, description)
+        outcome = "gated"
+    else:
+        # Volltext nur laden, wenn wirklich analysiert wird (Cache macht Wiederholungen kostenlos)
+        body = article.get("body")
+        if body is None and ARTICLE_BODY_ENABLED:
+            body = get_fetcher().fetch(article.get("url", ""))
+        # Mit MODEL_ROUTING_ENABLED=1 erst das günstige Triage-Modell, GPT-4 nur bei Bedarf
+        router = get_router()
+        analysis = router.analyze(title, description, body) if router else analyze_news(title, description, body)
+        outcome = "analyzed"
+        # Fallbacks nicht in den Index, sonst erben spätere Near-Duplikate den Fehler
+        if near_index is not None and is_reusable(analysis):
+            near_index.add(fingerprint, {**{f: analysis.get(f, "") for f in ANALYSIS_FIELDS}, "title": title})
+
+    # Update article with analysis results (matching your CSV format)
+    article.update({
+        "sentiment": analysis.get("sentiment", "Finance"),
+        "markets": analysis.get("markets", ""),
+        "intensity": analysis.get("intensity", "medium"),
+        "impact": analysis.get("impact", "0"),
+        "confidence": analysis.get("confidence", "medium"),
+        "patterns": analysis.get("patterns", ""),
+        "explanation": analysis.get("explanation", ""),
+    })
+    return "reused" if match else outcome
+
+# === 5) Hauptfunktion ===
+def main(mode: str = INGEST_MODE):
+    """Single ingest run as a streaming pipeline: fetch → dedup → analyze → persist.
+
+    Stages are connected by bounded queues; analyzed articles are written in
+    micro-batches while later ones are still being fetched or analyzed.
+    The analysis backlog is served by priority score, not strictly newest-first.
+    """
+    require_api_key()
+    require_mode(mode)
     now = datetime.now(timezone.utc)
-    # Erweitere Zeitfenster auf 6 Stunden für mehr Artikel
-    hours_back = 1
+    # Zeitfenster gilt nur noch für Kategorien ohne Watermark
+    hours_back = INITIAL_HOURS_BACK
     time_ago = now - timedelta(hours=hours_back)
+    state = load_state()
     
-    print(f"🕐 Current time: {now.isoformat()}")
-    print(f"⏰ Looking for articles from {time_ago.isoformat()} to {now.isoformat()}")
-    print(f"⏳ Time window: {hours_back} hours")
+    print(f"🕐 Current time: {now.isoformat()} (mode: {mode})")
+    fetch_categories_mode = mode in ("categories", "all")
+    symbols = load_watchlist() if mode in ("company", "all") else []
 
-    articles = fetch_latest_articles(FINNHUB_API_KEY, time_ago, now)
+    if fetch_categories_mode:
+        for category in NEWS_CATEGORIES:
+            watermark = get_watermark(state, category)
+            if watermark:
+                print(f"🔖 {category}: resuming after id {watermark.get('last_id')}")
+            else:
+                print(f"⏰ {category}: no watermark, looking back {hours_back} hours")
+    if mode in ("company", "all") and not symbols:
+        print(f"⚠️  Company mode requested but watchlist is empty (WATCHLIST_SYMBOLS / {WATCHLIST_FILE})")
 
-    if not articles:
-        print("⚠️  No articles found in time window!")
-        return
+    existing_entries = load_existing_entries(OUTPUT)
+    near_index = load_near_index()
+    deduper = StreamingDeduper()
+    lock = threading.Lock()
+    # Geholt, aber noch nicht persistiert (auch in Queues wartende) – hält die Watermarks zurück
+    pending = {}
+    # Persistiert bzw. als Duplikat verworfen, vom Watermark aber noch nicht erfasst (ältere Artikel offen)
+    settled = []
+    analyzed = 0
+    failed_articles = []
+    report = RunReport("ingest", mode=mode)
+    usage_before = usage_summary()
 
-    print(f"🎯 Found {len(articles)} articles to analyze")
-    analyzed_articles = []
+    # Finnhub-Kategorien/Watchlist plus weitere Quellen aus data/sources.json, parallel abgefragt
+    sources = load_sources(FINNHUB_API_KEY, NEWS_CATEGORIES if fetch_categories_mode else None, symbols)
 
-    for i, article in enumerate(articles, 1):
-        title = article.get("headline", "")
-        description = article.get("summary", "")
-        
-        print(f"🔄 [{i}/{len(articles)}] Analyzing: {title[:50]}...")
+    def fetch_stage(emit):
+        for key, articles in poll_sources(sources, state, time_ago, now):
+            if isinstance(articles, Exception):
+                print(f"❌ Error fetching {key} news: {articles}")
+                continue
+            selected, stored = split_stored(select_new_articles(key, articles, state, time_ago, now), existing_entries)
+            if not key.startswith("company:"):
+                print(f"📊 {key}: {len(articles)} received, {len(selected)} new, {len(stored)} already stored")
+            report.count("fetched", len(selected))
+            report.count("stored", len(stored))
+            with lock:
+                # Vor emit registrieren: ein neuerer Artikel darf den Watermark nicht über diesen hinausschieben
+                pending.update((id(a), a) for a in selected)
+                # Schon in der CSV – nur den Watermark nachziehen
+                settled.extend(stored)
+            for article in selected:
+                emit(article)
 
+    def dedup_stage(article):
+        with lock:
+            if not deduper.add(article):
+                # Kategorie/ID stecken jetzt in der behaltenen Kopie, die den Watermark weiter zurückhält
+                report.count("duplicates")
+                pending.pop(id(article), None)
+                settled.append(article)
+                return []
+        return [article]
+
+    def analyze_stage(article):
+        title = article.get("headline", "")
+        print(f"🔄 Analyzing: {title[:50]}...")
         try:
-            analysis = analyze_news(title, description)
-            print(f"✅ Analysis successful for article {i}")
+            report.count(analyze_article(article, near_index))
+            return [(article, None)]
         except Exception as e:
-            print(f"❌ Analysis failed for article {i}: {title[:30]}... Error: {e}")
-            continue
+            return [(article, e)]
+
+    def persist_stage(batch):
+        nonlocal analyzed
+        done = []
+        for article, error in batch:
+            if error:
+                print(f"❌ Analysis failed: {article.get('headline', '')[:30]}... Error: {error}")
+                failed_articles.append(article)
+                report.count("failed")
+            else:
+                done.append(article)
+        if done:
+            written = append_to_csv(done, OUTPUT, existing_entries)
+            report.count("persisted", len(written))
+            report.observe_persisted(written)
+            analyzed += len(done)
+        with lock:
+            for article, _ in batch:
+                pending.pop(id(article), None)
+            # Nur dieser Batch plus Zurückgehaltenes; nie über Fehlschläge oder noch offene Artikel hinaus
+            processed = settled + done
+            advance_watermarks(state, processed, failed_articles + list(pending.values()))
+            settled[:] = held_back(state, processed, failed_articles)
+        save_state(state)
 
-        # Update article with analysis results (matching your CSV format)
-        article.update({
-            "sentiment": analysis.get("sentiment", "Finance"),
-            "markets": analysis.get("markets", ""),
-            "intensity": analysis.get("intensity", "medium"),
-            "impact": analysis.get("impact", "0"),
-            "confidence": analysis.get("confidence", "medium"),
-            "patterns": analysis.get("patterns", ""),
-            "explanation": analysis.get("explanation", ""),
-        })
+    # Großer Rückstau vor der Analyse, damit die Priorisierung über den ganzen Batch greift
+    backlog = PriorityBacklog(maxsize=ANALYZE_BACKLOG_SIZE)
+    stats = run_pipeline(
+        fetch_stage,
+        [Stage("dedup", dedup_stage), Stage("analyze", analyze_stage, ANALYZE_WORKERS, inbox=backlog)],
+        persist_stage,
+        queue_size=QUEUE_SIZE,
+        batch_size=PERSIST_BATCH_SIZE,
+        flush_seconds=PERSIST_FLUSH_SECONDS,
+    )
 
-        analyzed_articles.append(article)
+    # Nach dem letzten Micro-Batch verworfene Duplikate und noch Zurückgehaltenes
+    save_state(advance_watermarks(state, settled, failed_articles + list(pending.values())))
 
     print(f"📊 Analysis summary:")
-    print(f"   - Total articles found: {len(articles)}")
-    print(f"   - Successfully analyzed: {len(analyzed_articles)}")
-    print(f"   - Failed analyses: {len(articles) - len(analyzed_articles)}")
+    counts = report.counts
+    print(f"   - Total articles found: {counts.get('fetched', 0)}")
+    print(f"   - Cross-source duplicates collapsed: {counts.get('duplicates', 0)}")
+    print(f"   - Successfully analyzed: {analyzed}")
+    print(f"   - Reused near-duplicate analyses: {counts.get('reused', 0)}")
+    print(f"   - Skipped by relevance gate: {counts.get('gated', 0)}")
+    print(f"   - Failed analyses: {len(failed_articles)}")
+    print(f"   - Promoted after waiting {backlog.max_wait:.0f}s: {backlog.promoted}")
+    print(f"   - Stage stats: {stats}")
 
-    if analyzed_articles:
-        append_to_csv(analyzed_articles, OUTPUT)
-        print(f"✅ Appended {len(analyzed_articles)} analyzed articles to {OUTPUT}")
-    else:
-        print("⚠️  No articles were successfully analyzed.")
+    if not counts.get("fetched"):
+        print("⚠️  No new articles found!")
+    usage = usage_summary()
+    report.count("unique", counts.get("fetched", 0) - counts.get("duplicates", 0))
+    sections = {
+        "openai": {k: round(v - usage_before.get(k, 0), 3) for k, v in usage.items()},
+        "rate_limits": throttling_summary(),
+        "http": latency_summary(),
+        "priority_promoted": backlog.promoted,
+        "parsing": parse_summary(),
+    }
+    if ARTICLE_BODY_ENABLED:
+        sections["article_bodies"] = get_fetcher().report()
+    if get_cache():
+        sections["analysis_cache"] = get_cache().stats()
+    if get_router():
+        sections["routing"] = get_router().report()
+    report.write(report.build(stats, **sections))
+    report_cache()
+    report_throttling()
+    report_latency()
+
+# === 6) Daemon ===
+class AdaptivePoller:
+    """Poll interval for one source, derived from an EWMA of its observed arrival rate.
+
+    The interval aims for ``target`` new articles per poll: busy categories
+    are polled often, quiet ones back off towards ``max_interval``.
+    """
+
+    def __init__(self, min_interval: float = POLL_MIN_SECONDS, max_interval: float = POLL_MAX_SECONDS,
+                 target: float = POLL_TARGET_ARTICLES, alpha: float = 0.3):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target = target
+        self.alpha = alpha
+        self.interval = min_interval
+        self.rate = None  # Artikel pro Sekunde
+        self.last_poll = None
+        self.next_due = 0.0
+
+    def record(self, new_articles: int, now: float):
+        if self.last_poll is not None:
+            observed = new_articles / max(now - self.last_poll, 1e-6)
+            self.rate = observed if self.rate is None else self.alpha * observed + (1 - self.alpha) * self.rate
+            interval = self.target / self.rate if self.rate > 0 else self.interval * 2
+            self.interval = min(self.max_interval, max(self.min_interval, interval))
+        self.last_poll = now
+        self.next_due = now + self.interval
+
+def poll_source(key: str, state: dict) -> list:
+    now = datetime.now(timezone.utc)
+    time_ago = now - timedelta(hours=INITIAL_HOURS_BACK)
+    if key == "company":
+        symbols = load_watchlist()
+        return fetch_company_articles(FINNHUB_API_KEY, symbols, time_ago, now, state=state) if symbols else []
+    return fetch_latest_articles(FINNHUB_API_KEY, time_ago, now, state=state, categories=[key])
+
+def run_daemon(mode: str = INGEST_MODE):
+    """Stay resident and write each article as soon as it is analyzed.
+
+    HTTP session and OpenAI client stay warm between polls; every category
+    (and the watchlist as a whole) gets its own adaptive poll interval. One
+    deduper spans all pollers, so a story seen in several categories is
+    analyzed once.
+    """
+    require_api_key()
+    require_mode(mode)
+    state = load_state()
+    existing_entries = load_existing_entries(OUTPUT)
+    near_index = load_near_index()
+    deduper = StreamingDeduper(ttl=DEDUP_TTL_SECONDS, max_entries=DEDUP_MAX_ENTRIES)
+
+    pollers = {}
+    if mode in ("categories", "all"):
+        pollers.update({category: AdaptivePoller() for category in NEWS_CATEGORIES})
+    if mode in ("company", "all"):
+        pollers["company"] = AdaptivePoller()
+
+    if not pollers:
+        print(f"❌ ERROR: Nichts zu pollen im Modus {mode!r}.")
+        exit(1)
+
+    print(f"🛰️  Ingest daemon started (mode: {mode}, poll interval {POLL_MIN_SECONDS:.0f}–{POLL_MAX_SECONDS:.0f}s)")
+
+    try:
+        while True:
+            for key, poller in pollers.items():
+                if poller.next_due > time.monotonic():
+                    continue
+
+                try:
+                    articles = poll_source(key, state)
+                except Exception as e:
+                    print(f"❌ Poll of {key} failed: {e}")
+                    articles = []
+                stored = {id(a) for a in split_stored(articles, existing_entries)[1]}
+
+                # Älteste zuerst, damit der Watermark nach jedem Artikel fortgeschrieben werden kann
+                duplicates = 0
+                for article in reversed(articles):
+                    title = article.get("headline", "")
+                    if id(article) in stored:
+                        # Schon in der CSV (über einem früheren Fehlschlag erneut geholt) – nicht neu analysieren
+                        save_state(advance_watermarks(state, [article]))
+                        continue
+                    if not deduper.add(article):
+                        # Schon über eine andere Kategorie analysiert – nur den Watermark nachziehen
+                        duplicates += 1
+                        save_state(advance_watermarks(state, [article]))
+                        continue
+                    try:
+                        analyze_article(article, near_index)
+                    except Exception as e:
+                        # Watermark bleibt unter diesem Artikel – nächster Poll versucht es erneut
+                        deduper.forget(article)
+                        print(f"❌ Analysis failed: {title[:30]}... Error: {e}")
+                        break
+                    append_to_csv([article], OUTPUT, existing_entries)
+                    save_state(advance_watermarks(state, [article]))
+
+                poller.record(len(articles), time.monotonic())
+                print(f"⏲️  {key}: {len(articles)} new ({duplicates} seen in other categories), "
+                      f"next poll in {poller.interval:.0f}s")
+
+            next_due = min(p.next_due for p in pollers.values())
+            time.sleep(max(0.0, next_due - time.monotonic()))
+    except KeyboardInterrupt:
+        print("🛑 Ingest daemon stopped.")
+    finally:
+        save_state(state)
+        report_throttling()
+        report_latency()
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Fetch, analyze and store the latest Finnhub news.")
+    parser.add_argument("--mode", choices=INGEST_MODES, default=INGEST_MODE,
+                        help="Generic news categories, watchlist company news, or both")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Stay resident and poll with adaptive intervals instead of a single run")
+    args = parser.parse_args()
+    if args.daemon:
+        run_daemon(args.mode)
+    else:
+        main(args.mode)
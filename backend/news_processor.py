@@ -1,8 +1,13 @@
+import asyncio
 import openai
 import os
-import json
+import threading
+import time
 from dotenv import load_dotenv
 from datetime import datetime
+from rate_limiter import get_limiter, estimate_tokens
+from analysis_cache import get_cache
+from structured_output import format_kwargs, parse_analysis, parse_batch_analyses
 
 load_dotenv()
 
@@ -20,14 +25,34 @@ else:
     print("❌ ERROR: OPENAI_API_KEY ist nicht gesetzt.")
     client = None
 
-def analyze_news(title, description):
-    if not client:
-        return get_fallback_analysis(title, description)
-        
-    prompt = (
+# Verbrauch und Fehler seit Prozessstart (für den Lauf-Report)
+USAGE = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "api_errors": 0, "parse_errors": 0,
+         "batch_retries": 0, "seconds": 0.0}
+_usage_lock = threading.Lock()
+
+def record_usage(**deltas):
+    with _usage_lock:
+        for key, value in deltas.items():
+            USAGE[key] = USAGE.get(key, 0) + value
+
+def usage_summary() -> dict:
+    with _usage_lock:
+        return dict(USAGE)
+
+# Modell und Prompt-Version fließen in den Cache-Schlüssel ein – bei Prompt-Änderungen PROMPT_VERSION erhöhen
+OPENAI_MODEL = os.environ.get("OPENAI_MODEL", "gpt-4")
+PROMPT_VERSION = "2"
+
+# Wie viel vom Volltext (article_fetcher) in den Prompt geht
+BODY_PROMPT_CHARS = int(os.environ.get("ARTICLE_BODY_PROMPT_CHARS", "6000"))
+
+def build_prompt(title, description, body=None):
+    article_text = f"Article text (excerpt): {body[:BODY_PROMPT_CHARS]}\n\n" if body else ""
+    return (
         f"You are a professional financial analyst. Your task is to analyze financial news articles exclusively in English.\n\n"
         f"Title: {title}\n"
         f"Description: {description}\n\n"
+        f"{article_text}"
         f"Respond with a valid JSON object including the following fields:\n"
         f"- impact: A number between -10 (very bearish) and +10 (very bullish)\n"
         f"- confidence: high, medium, or low\n"
@@ -40,46 +65,212 @@ def analyze_news(title, description):
         f"- Example response:\n"
         f"{{\"impact\": 3, \"confidence\": \"medium\", \"markets\": \"S&P 500, Tech\", \"patterns\": \"Similar to...\", \"explanation\": \"This news indicates...\"}}"
     )
-    
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.5,
-            max_tokens=1000
-        )
-        raw = response.choices[0].message.content.strip()
-        
-        # Remove markdown code blocks if present
-        if raw.startswith("```json"):
-            raw = raw[7:]
-        if raw.endswith("```"):
-            raw = raw[:-3]
-        raw = raw.strip()
-        
-        try:
-            parsed = json.loads(raw)
-            print(f"✅ Successfully analyzed: {title[:50]}...")
-        except json.JSONDecodeError as je:
-            print(f"⚠️ JSON parsing error for '{title[:30]}...': {je}")
-            print(f"Raw response: {raw}")
-            return get_fallback_analysis(title, description)
-        
-        # Ensure all required fields are present with proper types
-        # ANGEPASST AN DEIN CSV-FORMAT:
-        return {
-            "sentiment": parsed.get("sentiment", "Finance"),
-            "markets": parsed.get("markets", "Unknown"), 
-            "intensity": parsed.get("intensity", "medium"),
-            "impact": str(parsed.get("impact", 0)),
-            "confidence": parsed.get("confidence", "medium"),
-            "patterns": parsed.get("patterns", "No historical patterns identified"),
-            "explanation": parsed.get("explanation", "Analysis not available")
-        }
+
+def to_result(parsed):
+    # Ensure all required fields are present with proper types
+    # ANGEPASST AN DEIN CSV-FORMAT:
+    return {
+        "sentiment": parsed.get("sentiment", "Finance"),
+        "markets": parsed.get("markets", "Unknown"), 
+        "intensity": parsed.get("intensity", "medium"),
+        "impact": str(parsed.get("impact", 0)),
+        "confidence": parsed.get("confidence", "medium"),
+        "patterns": parsed.get("patterns", "No historical patterns identified"),
+        "explanation": parsed.get("explanation", "Analysis not available")
+    }
+
+def lookup_analysis(title, description, body=None, model=OPENAI_MODEL):
+    """``(cache_key, cached result or None)`` – same text with the same model/prompt is not analyzed twice."""
+    cache = get_cache()
+    if not cache:
+        return None, None
+    cache_key = cache.key(title, description, body, model, PROMPT_VERSION)
+    return cache_key, cache.get(cache_key)
+
+def store_analysis(parsed, cache_key, model=OPENAI_MODEL):
+    """Validated analysis → result dict; only real analyses are cached, never fallbacks."""
+    result = to_result(parsed)
+    cache = get_cache()
+    if cache and cache_key:
+        cache.put(cache_key, result, model, PROMPT_VERSION)
+    return result
+
+def analysis_failed(title, description, error):
+    record_usage(api_errors=1)
+    print(f"❌ Error with OpenAI analysis for '{title[:30]}...': {error}")
+    return get_fallback_analysis(title, description)
+
+def finish_analysis(parsed, title, description, cache_key, model=OPENAI_MODEL):
+    """Result of a completed request (sync or async): stored analysis, or the fallback if unusable."""
+    if parsed is None:
+        print(f"⚠️ JSON parsing error for '{title[:30]}...'")
+        return get_fallback_analysis(title, description)
+    print(f"✅ Successfully analyzed: {title[:50]}...")
+    return store_analysis(parsed, cache_key, model)
+
+def analyze_news(title, description, body=None):
+    cache_key, cached = lookup_analysis(title, description, body)
+    if cached:
+        return cached
+
+    if not client:
+        return get_fallback_analysis(title, description)
         
+    try:
+        parsed, _ = request_analysis(build_prompt(title, description, body))
     except Exception as e:
-        print(f"❌ Error with OpenAI analysis for '{title[:30]}...': {e}")
-        return get_fallback_analysis(title, description)
+        return analysis_failed(title, description, e)
+    return finish_analysis(parsed, title, description, cache_key)
+
+def completion_kwargs(prompt, model=OPENAI_MODEL, max_tokens=1000, batch=False):
+    """``chat.completions.create`` arguments for one analysis (or a ``batch`` prompt), shared by all callers."""
+    return {
+        "model": model,
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0.5,
+        "max_tokens": max_tokens,
+        # JSON-Schema (bzw. JSON-Modus), soweit das Modell es unterstützt
+        **format_kwargs(model, batch=batch),
+    }
+
+def read_completion(response, started):
+    """Record usage of a finished completion and parse it → ``(validated analysis or None, call stats)``."""
+    usage = getattr(response, "usage", None)
+    stats = {"seconds": time.perf_counter() - started,
+             "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+             "completion_tokens": getattr(usage, "completion_tokens", 0) or 0}
+    record_usage(calls=1, **stats)
+    # Toleranter Parser: Code-Fences, Begleittext und abgeschnittene Antworten werden repariert
+    parsed = parse_analysis(response.choices[0].message.content)
+    if parsed is None:
+        record_usage(parse_errors=1)
+    return parsed, stats
+
+def request_analysis(prompt, model=OPENAI_MODEL, max_tokens=1000):
+    """One chat completion → ``(validated analysis or None, call stats)``; API errors are raised."""
+    # Requests/min und Tokens/min (Prompt + maximale Antwort) vorab reservieren
+    get_limiter("openai").acquire(tokens=estimate_tokens(prompt) + max_tokens)
+    started = time.perf_counter()
+    response = client.chat.completions.create(**completion_kwargs(prompt, model, max_tokens))
+    return read_completion(response, started)
+
+async def request_analysis_async(async_client, prompt, model=OPENAI_MODEL, max_tokens=1000, timeout=None):
+    """``request_analysis`` on an AsyncOpenAI client; API errors and ``asyncio.TimeoutError`` are raised."""
+    await get_limiter("openai").acquire_async(tokens=estimate_tokens(prompt) + max_tokens)
+    started = time.perf_counter()
+    response = await asyncio.wait_for(
+        async_client.chat.completions.create(**completion_kwargs(prompt, model, max_tokens)), timeout)
+    return read_completion(response, started)
+
+# === Batch-Analyse: mehrere Artikel pro Request ===
+# Token-Budget pro Batch-Request (Prompt + erwartete Antworten) und Obergrenze Artikel pro Request
+BATCH_TOKEN_BUDGET = int(os.environ.get("ANALYSIS_BATCH_TOKEN_BUDGET", "6000"))
+BATCH_MAX_ARTICLES = int(os.environ.get("ANALYSIS_BATCH_MAX_ARTICLES", "10"))
+# Erwartete Antwortlänge pro Artikel (explanation ≥ 150 Wörter)
+BATCH_OUTPUT_TOKENS = int(os.environ.get("ANALYSIS_BATCH_OUTPUT_TOKENS", "450"))
+
+BATCH_INSTRUCTIONS = (
+    "You are a professional financial analyst. Your task is to analyze financial news articles exclusively in English.\n\n"
+    "For EACH article below, produce one JSON object with the following fields:\n"
+    "- id: The article id exactly as given\n"
+    "- impact: A number between -10 (very bearish) and +10 (very bullish)\n"
+    "- confidence: high, medium, or low\n"
+    "- markets: Affected markets or sectors (comma-separated)\n"
+    "- patterns: Similar historical events (in English, max 100 words)\n"
+    "- explanation: A detailed reasoning (at least 150 words, in English)\n\n"
+    "IMPORTANT:\n"
+    "- All text content must be written in **English** only.\n"
+    "- Return only a valid JSON object {\"results\": [...]} with one entry per article – no markdown, no commentary.\n"
+    "- Example response:\n"
+    "{\"results\": [{\"id\": \"a1\", \"impact\": 3, \"confidence\": \"medium\", \"markets\": \"S&P 500, Tech\", "
+    "\"patterns\": \"Similar to...\", \"explanation\": \"This news indicates...\"}]}\n\n"
+)
+
+def format_batch_article(article_id, title, description, body=None):
+    article_text = f"Article text (excerpt): {body[:BODY_PROMPT_CHARS]}\n" if body else ""
+    return f"### Article {article_id}\nTitle: {title}\nDescription: {description}\n{article_text}\n"
+
+def build_batch_prompt(entries):
+    """``entries``: list of ``(id, title, description, body)``."""
+    return BATCH_INSTRUCTIONS + "".join(format_batch_article(*entry) for entry in entries)
+
+def plan_batches(entries, token_budget=BATCH_TOKEN_BUDGET, max_articles=BATCH_MAX_ARTICLES):
+    """Greedy packing in input order: a batch is closed once the next article would exceed the budget."""
+    base = estimate_tokens(BATCH_INSTRUCTIONS)
+    batches, current, used = [], [], base
+    for entry in entries:
+        cost = estimate_tokens(format_batch_article(*entry)) + BATCH_OUTPUT_TOKENS
+        if current and (used + cost > token_budget or len(current) >= max_articles):
+            batches.append(current)
+            current, used = [], base
+        current.append(entry)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+def analyze_batch_request(entries):
+    """One chat completion for a whole batch; returns ``{id: result}`` for the valid elements."""
+    prompt = build_batch_prompt(entries)
+    max_tokens = BATCH_OUTPUT_TOKENS * len(entries) + 100
+    get_limiter("openai").acquire(tokens=estimate_tokens(prompt) + max_tokens)
+    started = time.perf_counter()
+    response = client.chat.completions.create(**completion_kwargs(prompt, OPENAI_MODEL, max_tokens, batch=True))
+    usage = getattr(response, "usage", None)
+    record_usage(calls=1, seconds=time.perf_counter() - started,
+                 prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+                 completion_tokens=getattr(usage, "completion_tokens", 0) or 0)
+    parsed = parse_batch_analyses(response.choices[0].message.content)
+    return {article_id: to_result(clean) for article_id, clean in parsed.items()}
+
+def analyze_news_batch(articles, token_budget=BATCH_TOKEN_BUDGET, max_articles=BATCH_MAX_ARTICLES):
+    """Analyze ``(title, description[, body])`` tuples with several articles per request.
+
+    Results come back in input order with the same dicts as ``analyze_news``.
+    Cached articles are skipped; elements that are missing or fail validation
+    are re-run one by one through ``analyze_news``.
+    """
+    articles = [tuple(a) + (None,) * (3 - len(a)) for a in articles]
+    results = [None] * len(articles)
+    cache = get_cache()
+    pending = []
+    for i, (title, description, body) in enumerate(articles):
+        cached = cache.get(cache.key(title, description, body, OPENAI_MODEL, PROMPT_VERSION)) if cache else None
+        if cached:
+            results[i] = cached
+        else:
+            pending.append((f"a{i}", title, description, body))
+
+    retry = []
+    if pending and client:
+        for batch in plan_batches(pending, token_budget, max_articles):
+            try:
+                parsed = analyze_batch_request(batch)
+            except Exception as e:
+                record_usage(api_errors=1)
+                print(f"❌ Error with OpenAI batch analysis ({len(batch)} articles): {e}")
+                parsed = {}
+            ok = 0
+            for article_id, title, description, body in batch:
+                result = parsed.get(article_id)
+                if result is None:
+                    retry.append((article_id, title, description, body))
+                    continue
+                results[int(article_id[1:])] = result
+                ok += 1
+                if cache:
+                    cache.put(cache.key(title, description, body, OPENAI_MODEL, PROMPT_VERSION), result,
+                              OPENAI_MODEL, PROMPT_VERSION)
+            print(f"✅ Batch analyzed: {ok}/{len(batch)} articles")
+    else:
+        retry = pending
+
+    if retry and client:
+        record_usage(batch_retries=len(retry))
+        print(f"🔁 Re-running {len(retry)} articles individually")
+    for article_id, title, description, body in retry:
+        results[int(article_id[1:])] = analyze_news(title, description, body)
+    return results
 
 def get_fallback_analysis(title, description):
     """Fallback analysis when OpenAI fails"""
@@ -0,0 +1,262 @@
+# backend/news_sources.py - Plugin-Schnittstelle für Nachrichtenquellen (Finnhub, RSS/Atom, lokale JSON-Dateien)
+
+import json
+import os
+import queue
+import threading
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from finnhub_client import (
+    iter_categories, iter_symbols, get_session, company_key,
+    FETCH_CONCURRENCY, COMPANY_CONCURRENCY,
+)
+from watermarks import get_watermark, request_params
+from http_client import get_client
+from fast_parse import parse_articles
+
+# Quellen-Konfiguration (Liste von {"type": ..., ...}); ohne Datei gelten die Finnhub-Defaults
+SOURCES_FILE = Path(os.environ.get("NEWS_SOURCES_FILE", Path(__file__).parent.parent / "data" / "sources.json"))
+
+# Parallel abgefragte Quellen
+SOURCE_CONCURRENCY = int(os.environ.get("NEWS_SOURCE_CONCURRENCY", "4"))
+
+
+# === 1) Einheitliches Artikel-Schema ===
+# Alle Quellen liefern Finnhub-förmige Dicts, weil der Rest der Pipeline
+# (Dedup, Watermarks, analyze_news, append_to_csv) mit diesen Feldern arbeitet.
+def normalize_article(raw: dict, source_category: str, **overrides) -> dict:
+    article = {
+        "id": raw.get("id") or 0,
+        "headline": (raw.get("headline") or raw.get("title") or "").strip(),
+        "summary": (raw.get("summary") or raw.get("description") or "").strip(),
+        "url": (raw.get("url") or "").strip(),
+        "datetime": int(raw.get("datetime") or 0),
+        "image": raw.get("image") or "",
+        "source": raw.get("source") or "",
+        "related": raw.get("related") or "",
+        "source_category": source_category,
+    }
+    article.update(overrides)
+    return article
+
+
+# === 2) Registry ===
+SOURCE_TYPES = {}
+
+
+def register_source(type_name: str):
+    def decorator(cls):
+        SOURCE_TYPES[type_name] = cls
+        cls.type_name = type_name
+        return cls
+    return decorator
+
+
+class NewsSource:
+    """Base class for news sources.
+
+    ``fetch`` yields ``(key, articles)`` pairs, where ``key`` is the
+    watermark/category key and ``articles`` a list of normalized articles
+    (or the exception that prevented fetching them).
+    """
+
+    type_name = ""
+
+    def fetch(self, state: dict, from_dt: datetime, to_dt: datetime):
+        raise NotImplementedError
+
+
+@register_source("finnhub")
+class FinnhubCategorySource(NewsSource):
+    def __init__(self, api_key: str, categories: list, max_workers: int = FETCH_CONCURRENCY):
+        self.api_key = api_key
+        self.categories = list(categories)
+        self.max_workers = max_workers
+
+    def fetch(self, state, from_dt, to_dt):
+        # Kategorien mit Watermark fragen per minId nur nach neueren Artikeln
+        params = request_params(state, self.categories)
+        for category, articles in iter_categories(self.categories, self.api_key, self.max_workers, params):
+            if isinstance(articles, Exception):
+                yield category, articles
+            else:
+                yield category, parse_articles(articles, category)
+
+
+@register_source("finnhub_company")
+class FinnhubCompanySource(NewsSource):
+    def __init__(self, api_key: str, symbols: list, max_workers: int = COMPANY_CONCURRENCY):
+        self.api_key = api_key
+        self.symbols = list(symbols)
+        self.max_workers = max_workers
+
+    def date_ranges(self, state, from_dt, to_dt) -> dict:
+        # Pro Symbol ab dem Tag des letzten gesehenen Artikels abfragen (Datums-Cursor)
+        date_ranges = {}
+        for symbol in self.symbols:
+            watermark = get_watermark(state, company_key(symbol))
+            start = datetime.fromtimestamp(watermark["last_datetime"], tz=timezone.utc) if watermark else from_dt
+            date_ranges[symbol] = (start.strftime("%Y-%m-%d"), to_dt.strftime("%Y-%m-%d"))
+        return date_ranges
+
+    def fetch(self, state, from_dt, to_dt):
+        date_ranges = self.date_ranges(state, from_dt, to_dt)
+        for symbol, articles in iter_symbols(self.symbols, self.api_key, date_ranges, self.max_workers):
+            key = company_key(symbol)
+            if isinstance(articles, Exception):
+                yield key, articles
+            else:
+                yield key, parse_articles(articles, key)
+
+
+def _parse_feed_date(text: str) -> int:
+    if not text:
+        return 0
+    text = text.strip()
+    try:
+        dt = parsedate_to_datetime(text)
+    except (TypeError, ValueError):
+        try:
+            dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            return 0
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _child_text(element, *names) -> str:
+    for child in element:
+        if _local_name(child.tag) in names:
+            if _local_name(child.tag) == "link" and child.get("href"):
+                return child.get("href")
+            return (child.text or "").strip()
+    return ""
+
+
+@register_source("rss")
+class FeedSource(NewsSource):
+    """RSS 2.0 or Atom feed; entries have no numeric id, so watermarks use the timestamp."""
+
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.url = url
+
+    def parse(self, content: bytes) -> list:
+        key = f"rss:{self.name}"
+        root = ET.fromstring(content)
+        articles = []
+        for element in root.iter():
+            if _local_name(element.tag) not in ("item", "entry"):
+                continue
+            link = _child_text(element, "link")
+            articles.append(normalize_article({
+                "headline": _child_text(element, "title"),
+                "summary": _child_text(element, "description", "summary", "content"),
+                "url": link,
+                "datetime": _parse_feed_date(_child_text(element, "pubDate", "published", "updated")),
+                "source": self.name,
+            }, key))
+        return articles
+
+    def fetch(self, state, from_dt, to_dt):
+        key = f"rss:{self.name}"
+        try:
+            resp = get_client(get_session()).get(self.url)
+            resp.raise_for_status()
+            yield key, self.parse(resp.content)
+        except Exception as e:
+            yield key, e
+
+
+@register_source("local")
+class LocalJSONSource(NewsSource):
+    """Drop folder with ``*.json`` files, each a list of articles (Finnhub or normalized layout).
+
+    Useful for manual imports and for benchmarking the multi-source path offline.
+    """
+
+    def __init__(self, name: str, directory: str):
+        self.name = name
+        self.directory = Path(directory)
+
+    def fetch(self, state, from_dt, to_dt):
+        key = f"local:{self.name}"
+        articles = []
+        for path in sorted(self.directory.glob("*.json")):
+            try:
+                payload = json.loads(path.read_text(encoding="utf-8"))
+            except Exception as e:
+                print(f"⚠️  Skipping unreadable drop file {path}: {e}")
+                continue
+            mtime = int(path.stat().st_mtime)
+            for raw in payload if isinstance(payload, list) else [payload]:
+                if not isinstance(raw, dict):
+                    continue
+                # id 0: Watermark läuft über den Zeitstempel (Dedup über die URL), nicht über fremde/zufällige IDs
+                articles.append(normalize_article(raw, key, id=0, datetime=int(raw.get("datetime") or mtime)))
+        yield key, articles
+
+
+# === 3) Quellen bauen ===
+def build_source(spec: dict, api_key: str = None) -> NewsSource:
+    spec = dict(spec)
+    type_name = spec.pop("type")
+    if type_name not in SOURCE_TYPES:
+        raise ValueError(f"Unknown news source type '{type_name}' (known: {', '.join(sorted(SOURCE_TYPES))})")
+    if type_name.startswith("finnhub"):
+        spec.setdefault("api_key", api_key)
+    return SOURCE_TYPES[type_name](**spec)
+
+
+def load_sources(api_key: str, categories: list = None, symbols: list = None, path: Path = SOURCES_FILE) -> list:
+    """Finnhub categories/watchlist as requested, plus any extra sources listed in ``path``."""
+    sources = []
+    if categories:
+        sources.append(FinnhubCategorySource(api_key, categories))
+    if symbols:
+        sources.append(FinnhubCompanySource(api_key, symbols))
+    if path.exists():
+        for spec in json.loads(path.read_text(encoding="utf-8")):
+            sources.append(build_source(spec, api_key))
+    return sources
+
+
+# === 4) Quellen parallel abfragen ===
+def poll_sources(sources: list, state: dict, from_dt: datetime, to_dt: datetime, max_workers: int = SOURCE_CONCURRENCY):
+    """Poll all sources in parallel and yield ``(key, articles)`` as each batch arrives."""
+    results = queue.Queue(maxsize=max(1, max_workers) * 4)
+    pending = list(sources)
+    lock = threading.Lock()
+    done = object()
+
+    def _worker():
+        while True:
+            with lock:
+                if not pending:
+                    break
+                source = pending.pop(0)
+            try:
+                for item in source.fetch(state, from_dt, to_dt):
+                    results.put(item)
+            except Exception as e:
+                results.put((getattr(source, "name", source.type_name), e))
+        results.put(done)
+
+    workers = max(1, min(max_workers, len(sources)))
+    for _ in range(workers):
+        threading.Thread(target=_worker, name="news-source", daemon=True).start()
+
+    finished = 0
+    while finished < workers:
+        item = results.get()
+        if item is done:
+            finished += 1
+        else:
+            yield item
@@ -0,0 +1,151 @@
+# backend/pipeline.py - Gestufte Streaming-Pipeline mit begrenzten Queues
+
+import queue
+import threading
+import time
+
+_STOP = object()
+
+
+class Stage:
+    """One pipeline step: ``fn(item)`` returns an iterable of items for the next stage (or None).
+
+    ``inbox`` replaces the default bounded FIFO in front of the stage, e.g.
+    with a ``prioritizer.PriorityBacklog``.
+    """
+
+    def __init__(self, name: str, fn, workers: int = 1, inbox: queue.Queue = None):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.inbox = inbox
+        self.items_in = 0
+        self.items_out = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.first_started = None
+        self.last_finished = None
+        self.lock = threading.Lock()
+
+    def stats(self) -> dict:
+        wall = (self.last_finished - self.first_started) if self.last_finished is not None else 0.0
+        return {
+            "workers": self.workers,
+            "in": self.items_in,
+            "out": self.items_out,
+            "errors": self.errors,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "wall_seconds": round(wall, 3),
+        }
+
+
+def _run_stage(stage: Stage, inbox: queue.Queue, outbox: queue.Queue, remaining: list):
+    while True:
+        item = inbox.get()
+        if item is _STOP:
+            # Stop-Signal für die Geschwister-Worker zurücklegen; der letzte reicht es weiter
+            inbox.put(_STOP)
+            with stage.lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                outbox.put(_STOP)
+            return
+
+        started = time.perf_counter()
+        with stage.lock:
+            if stage.first_started is None:
+                stage.first_started = started
+        try:
+            results = list(stage.fn(item) or ())
+        except Exception as e:
+            print(f"❌ Stage '{stage.name}' failed on an item: {e}")
+            results = []
+            with stage.lock:
+                stage.errors += 1
+        with stage.lock:
+            stage.items_in += 1
+            stage.items_out += len(results)
+            finished = time.perf_counter()
+            stage.busy_seconds += finished - started
+            stage.last_finished = finished
+
+        for result in results:
+            # Blockiert bei voller Queue – Backpressure hält den Speicher flach
+            outbox.put(result)
+
+
+def run_pipeline(source, stages: list, sink, queue_size: int = 50, batch_size: int = 10,
+                 flush_seconds: float = 2.0) -> dict:
+    """Run ``source → stages → sink`` with bounded queues between the steps.
+
+    ``source(emit)`` produces items; each stage runs on its own worker
+    threads; ``sink(batch)`` is called from the main thread with
+    micro-batches of at most ``batch_size`` items, or whatever arrived within
+    ``flush_seconds``, so results are persisted while later items are still
+    in flight. Returns per-stage statistics.
+    """
+    queues = [stage.inbox or queue.Queue(maxsize=queue_size) for stage in stages]
+    queues.append(queue.Queue(maxsize=queue_size))
+    threads = []
+    source_stats = {"out": 0, "errors": 0}
+    sink_stats = {"batches": 0, "items": 0, "busy_seconds": 0.0}
+    run_started = time.perf_counter()
+
+    def _source():
+        def emit(item):
+            source_stats["out"] += 1
+            queues[0].put(item)
+        try:
+            source(emit)
+        except Exception as e:
+            print(f"❌ Pipeline source failed: {e}")
+            source_stats["errors"] += 1
+        finally:
+            source_stats["wall_seconds"] = round(time.perf_counter() - run_started, 3)
+            queues[0].put(_STOP)
+
+    threads.append(threading.Thread(target=_source, name="pipeline-source", daemon=True))
+    for i, stage in enumerate(stages):
+        remaining = [stage.workers]
+        for w in range(stage.workers):
+            threads.append(threading.Thread(
+                target=_run_stage, args=(stage, queues[i], queues[i + 1], remaining),
+                name=f"pipeline-{stage.name}-{w}", daemon=True,
+            ))
+    for t in threads:
+        t.start()
+
+    outbox = queues[-1]
+    batch = []
+    deadline = time.monotonic() + flush_seconds
+    done = False
+    while not done:
+        try:
+            item = outbox.get(timeout=max(0.0, deadline - time.monotonic()))
+            if item is _STOP:
+                done = True
+            else:
+                batch.append(item)
+        except queue.Empty:
+            pass
+
+        if batch and (done or len(batch) >= batch_size or time.monotonic() >= deadline):
+            sink_started = time.perf_counter()
+            sink(batch)
+            sink_stats["busy_seconds"] += time.perf_counter() - sink_started
+            sink_stats["batches"] += 1
+            sink_stats["items"] += len(batch)
+            batch = []
+        if time.monotonic() >= deadline or not batch:
+            deadline = time.monotonic() + flush_seconds
+
+    for t in threads:
+        t.join()
+
+    stats = {"source": source_stats}
+    stats.update({stage.name: stage.stats() for stage in stages})
+    sink_stats["busy_seconds"] = round(sink_stats["busy_seconds"], 3)
+    stats["sink"] = sink_stats
+    stats["wall_seconds"] = round(time.perf_counter() - run_started, 3)
+    return stats
@@ -0,0 +1,126 @@
+# backend/prioritizer.py - Priorisierung des Analyse-Rückstaus (Kategorie, Quelle, Keywords, Aktualität) mit Deadline
+
+import heapq
+import math
+import os
+import queue
+import re
+import time
+from collections import deque
+
+# Maximale Wartezeit im Rückstau – danach wird ein Artikel unabhängig vom Score als Nächstes analysiert
+PRIORITY_MAX_WAIT_SECONDS = float(os.environ.get("PRIORITY_MAX_WAIT_SECONDS", "120"))
+# Halbwertszeit des Aktualitäts-Bonus
+PRIORITY_RECENCY_HALF_LIFE_HOURS = float(os.environ.get("PRIORITY_RECENCY_HALF_LIFE_HOURS", "6"))
+
+# === 1) Signale ===
+CATEGORY_WEIGHTS = {
+    "economy": 3.0,
+    "earnings": 2.5,
+    "company": 2.5,
+    "forex": 2.0,
+    "general": 1.0,
+}
+
+SOURCE_WEIGHTS = {
+    "reuters": 2.0,
+    "bloomberg": 2.0,
+    "dow jones": 1.5,
+    "wsj": 1.5,
+    "financial times": 1.5,
+    "cnbc": 1.0,
+    "marketwatch": 0.5,
+}
+
+# Marktbewegende Begriffe (positiv) und typische Ratgeber-/Lifestyle-Themen (negativ)
+KEYWORD_WEIGHTS = {
+    r"fed|federal reserve|fomc|powell": 3.0,
+    r"rate (?:hike|cut)s?|interest rates?": 2.5,
+    r"inflation|cpi|pce": 2.0,
+    r"payrolls|jobs report|unemployment": 2.0,
+    r"gdp|recession": 2.0,
+    r"ecb|boj|bank of england|lagarde": 2.0,
+    r"opec|tariffs?|sanctions": 1.5,
+    r"guidance|profit warning|downgrade|upgrade": 1.5,
+    r"merger|acquisition|takeover|buyout": 1.5,
+    r"bankruptcy|default|chapter 11": 2.0,
+    r"personal finance|retirement|mortgage tips?|credit cards?|should you|how to": -2.0,
+}
+_KEYWORD_PATTERNS = [(re.compile(rf"\b(?:{p})\b", re.IGNORECASE), w) for p, w in KEYWORD_WEIGHTS.items()]
+MAX_KEYWORD_SCORE = 6.0
+RECENCY_WEIGHT = 2.0
+
+
+def score_article(article: dict, now: float = None) -> float:
+    """Cheap local importance score; higher means analyze sooner."""
+    now = time.time() if now is None else now
+    category = (article.get("source_category") or "general").split(":", 1)[0]
+    score = max((CATEGORY_WEIGHTS.get(c.split(":", 1)[0], 1.0)
+                 for c in article.get("source_categories") or [category]), default=1.0)
+
+    source = (article.get("source") or "").lower()
+    score += max((w for name, w in SOURCE_WEIGHTS.items() if name in source), default=0.0)
+
+    text = f"{article.get('headline', '')} {article.get('summary', '')}"
+    keywords = sum(w for pattern, w in _KEYWORD_PATTERNS if pattern.search(text))
+    score += min(MAX_KEYWORD_SCORE, keywords)
+
+    age_hours = max(0.0, now - (article.get("datetime") or 0)) / 3600
+    score += RECENCY_WEIGHT * math.pow(0.5, age_hours / PRIORITY_RECENCY_HALF_LIFE_HOURS)
+    return score
+
+
+# === 2) Rückstau ===
+class PriorityBacklog(queue.Queue):
+    """Drop-in ``queue.Queue`` that hands out the highest-scoring article first.
+
+    Every item also gets a deadline ``max_wait`` seconds after it was queued;
+    once the oldest waiting item is overdue it is served next regardless of
+    its score, so low-priority stories are delayed but never starved.
+    Non-dict items (pipeline control sentinels) are delivered only after all
+    queued articles.
+    """
+
+    def __init__(self, maxsize: int = 0, score_fn=score_article, max_wait: float = PRIORITY_MAX_WAIT_SECONDS):
+        self.score_fn = score_fn
+        self.max_wait = max_wait
+        self.promoted = 0
+        super().__init__(maxsize)
+
+    # queue.Queue ruft diese Hooks unter seinem eigenen Lock auf
+    def _init(self, maxsize):
+        self.heap = []         # (-score, seq) – Reihenfolge nach Wichtigkeit
+        self.arrivals = deque()  # (deadline, seq) – Reihenfolge nach Eingang
+        self.items = {}
+        self.controls = deque()
+        self.seq = 0
+
+    def _qsize(self):
+        return len(self.items) + len(self.controls)
+
+    def _put(self, item):
+        if not isinstance(item, dict):
+            self.controls.append(item)
+            return
+        self.seq += 1
+        self.items[self.seq] = item
+        heapq.heappush(self.heap, (-self.score_fn(item), self.seq))
+        self.arrivals.append((time.monotonic() + self.max_wait, self.seq))
+
+    def _get(self):
+        # Bereits ausgelieferte Einträge liegen noch in der jeweils anderen Struktur – hier verwerfen
+        while self.heap and self.heap[0][1] not in self.items:
+            heapq.heappop(self.heap)
+        while self.arrivals and self.arrivals[0][1] not in self.items:
+            self.arrivals.popleft()
+        if not self.items:
+            return self.controls.popleft()
+
+        deadline, seq = self.arrivals[0]
+        if deadline <= time.monotonic():
+            self.arrivals.popleft()
+            if self.heap[0][1] != seq:
+                self.promoted += 1
+        else:
+            seq = heapq.heappop(self.heap)[1]
+        return self.items.pop(seq)
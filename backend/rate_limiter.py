@@ -0,0 +1,143 @@
+# backend/rate_limiter.py - Token-Bucket Rate-Limiter pro Provider (Finnhub, OpenAI)
+
+import asyncio
+import os
+import threading
+import time
+
+# === 1) Konfiguration (0 = kein Limit) ===
+FINNHUB_REQUESTS_PER_MINUTE = float(os.environ.get("FINNHUB_REQUESTS_PER_MINUTE", "60"))
+OPENAI_REQUESTS_PER_MINUTE = float(os.environ.get("OPENAI_REQUESTS_PER_MINUTE", "500"))
+OPENAI_TOKENS_PER_MINUTE = float(os.environ.get("OPENAI_TOKENS_PER_MINUTE", "10000"))
+
+
+# === 2) Token-Bucket ===
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``rate_per_minute``.
+
+    ``reserve`` takes the tokens immediately (the balance may go negative)
+    and returns how long the caller has to wait before using them, so
+    concurrent callers queue up fairly instead of polling.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: float = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, amount: float = 1) -> float:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    def drain(self, seconds: float):
+        """Push the bucket into debt, e.g. after the provider answered with 429/Retry-After."""
+        with self.lock:
+            self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+# === 3) Limiter pro Provider ===
+class ProviderLimiter:
+    """Combines several buckets (e.g. requests/min and tokens/min) and tracks throttle time."""
+
+    def __init__(self, name: str, requests_per_minute: float = 0, tokens_per_minute: float = 0):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.throttled_calls = 0
+        self.throttled_seconds = 0.0
+
+    def _reserve(self, tokens: float) -> float:
+        wait = 0.0
+        if self.requests:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens and tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+        with self.lock:
+            self.calls += 1
+            if wait > 0:
+                self.throttled_calls += 1
+                self.throttled_seconds += wait
+        return wait
+
+    def acquire(self, tokens: float = 0) -> float:
+        """Block until one request (plus ``tokens`` for token-metered APIs) may be sent."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: float = 0) -> float:
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float):
+        for bucket in (self.requests, self.tokens):
+            if bucket:
+                bucket.drain(seconds)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "provider": self.name,
+                "calls": self.calls,
+                "throttled_calls": self.throttled_calls,
+                "throttled_seconds": round(self.throttled_seconds, 3),
+            }
+
+
+# === 4) Registry ===
+_limiters = {}
+_registry_lock = threading.Lock()
+
+_DEFAULTS = {
+    "finnhub": {"requests_per_minute": FINNHUB_REQUESTS_PER_MINUTE},
+    "openai": {"requests_per_minute": OPENAI_REQUESTS_PER_MINUTE, "tokens_per_minute": OPENAI_TOKENS_PER_MINUTE},
+}
+# Unveränderte Quoten – set_quota_share rechnet immer von hier aus, damit wiederholte Aufrufe nicht multiplizieren
+_BASE_QUOTAS = {provider: dict(quotas) for provider, quotas in _DEFAULTS.items()}
+
+
+def get_limiter(provider: str) -> ProviderLimiter:
+    """Return the shared limiter for a provider, so all callers in the process draw from one quota."""
+    with _registry_lock:
+        if provider not in _limiters:
+            _limiters[provider] = ProviderLimiter(provider, **_DEFAULTS.get(provider, {}))
+        return _limiters[provider]
+
+
+def set_quota_share(share: float):
+    """Scale this process's quotas, e.g. to ``1 / n`` when n worker processes share one API key.
+
+    The share always applies to the configured quotas, so calling it again replaces the previous share.
+    """
+    with _registry_lock:
+        for provider, quotas in _BASE_QUOTAS.items():
+            _DEFAULTS[provider] = {k: v * share for k, v in quotas.items()}
+        _limiters.clear()
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (≈ 4 characters per token) for budgeting before the call."""
+    return len(text) // 4 + 1
+
+
+def throttling_summary() -> dict:
+    return {name: limiter.stats() for name, limiter in list(_limiters.items())}
+
+
+def report_throttling():
+    for limiter in list(_limiters.values()):
+        s = limiter.stats()
+        if s["calls"]:
+            print(f"⏱️  {s['provider']}: {s['calls']} calls, {s['throttled_calls']} throttled, "
+                  f"{s['throttled_seconds']:.1f}s waiting for quota")
@@ -0,0 +1,82 @@
+# backend/raw_archive.py - Tagesweise, komprimierte Ablage aller Roh-Payloads (JSONL.gz)
+
+import gzip
+import json
+import os
+import threading
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+# === 1) Konfiguration ===
+ARCHIVE_DIR = Path(os.environ.get("RAW_ARCHIVE_DIR", Path(__file__).parent.parent / "data" / "raw"))
+ARCHIVE_ENABLED = os.environ.get("RAW_ARCHIVE_ENABLED", "1") == "1"
+
+_write_lock = threading.Lock()
+
+
+def archive_path(day: date, base: Path = ARCHIVE_DIR) -> Path:
+    return base / f"{day.year:04d}" / f"{day.month:02d}" / f"{day.isoformat()}.jsonl.gz"
+
+
+# === 2) Schreiben ===
+def archive_payload(source: str, endpoint: str, key: str, params: dict, payload, fetched_at: datetime = None):
+    """Append one raw API response as a JSON line to today's compressed partition.
+
+    Each call adds a separate gzip member, which ``gzip.open`` reads back as
+    one continuous stream, so appending never rewrites the file.
+    """
+    if not ARCHIVE_ENABLED:
+        return
+    fetched_at = fetched_at or datetime.now(timezone.utc)
+    record = {
+        "fetched_at": fetched_at.isoformat(),
+        "source": source,
+        "endpoint": endpoint,
+        "key": key,
+        "params": {k: v for k, v in params.items() if k != "token"},
+        "payload": payload,
+    }
+    path = archive_path(fetched_at.date())
+    line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+    try:
+        with _write_lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "ab") as f:
+                f.write(gzip.compress(line))
+    except Exception as e:
+        # Archivierung darf das Ingest nie blockieren
+        print(f"⚠️  Could not archive raw payload for {key}: {e}")
+
+
+# === 3) Lesen ===
+def archived_days(start: date, end: date, base: Path = ARCHIVE_DIR):
+    day = start
+    while day <= end:
+        path = archive_path(day, base)
+        if path.exists():
+            yield day, path
+        day += timedelta(days=1)
+
+
+def iter_records(path: Path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # Abgebrochene letzte Zeile (z.B. Absturz beim Schreiben) überspringen
+                continue
+
+
+def iter_articles(path: Path):
+    """Yield the archived articles of one partition, tagged like a live fetch would tag them."""
+    for record in iter_records(path):
+        payload = record.get("payload")
+        if not isinstance(payload, list):
+            continue
+        for article in payload:
+            article["source_category"] = record.get("key", "general")
+            yield article
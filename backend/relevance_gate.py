@@ -0,0 +1,254 @@
+# backend/relevance_gate.py - Lokaler Relevanz-Filter (TF-IDF + Naive Bayes in NumPy) vor dem GPT-4-Aufruf
+
+import argparse
+import csv
+import json
+import math
+import os
+import re
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+import numpy as np
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+RESULTS_CSV = DATA_DIR / "news_analysis_results.csv"
+MODEL_FILE = Path(os.environ.get("RELEVANCE_MODEL_FILE", DATA_DIR / "relevance_model.json"))
+RELEVANCE_GATE_ENABLED = os.environ.get("RELEVANCE_GATE_ENABLED", "0") == "1"
+# Ab diesem |impact| gilt ein Artikel in den historischen Labels als marktbewegend
+IMPACT_THRESHOLD = float(os.environ.get("RELEVANCE_IMPACT_THRESHOLD", "2"))
+# Schwelle wird so gewählt, dass mindestens dieser Anteil marktbewegender Artikel durchkommt
+TARGET_RECALL = float(os.environ.get("RELEVANCE_TARGET_RECALL", "0.95"))
+
+# Markierung für übersprungene Artikel – solche Zeilen fließen nicht ins Training zurück
+GATE_MARKER = "Skipped by local relevance gate"
+_TOKEN_RE = re.compile(r"[a-z][a-z0-9&'\-]+")
+_STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the this to was were will with
+""".split())
+
+
+def tokenize(text: str) -> list:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def _features(tokens: list) -> Counter:
+    # Unigramme plus Bigramme ("rate cut", "jobs report")
+    return Counter(tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])])
+
+
+# === 1) Trainingsdaten ===
+def load_labeled_rows(path: Path = RESULTS_CSV, impact_threshold: float = IMPACT_THRESHOLD) -> list:
+    """``(publishedAt, text, label)`` from past LLM analyses, oldest first.
+
+    Fallback rows (API errors) and rows the gate itself skipped carry no LLM
+    judgement and are left out.
+    """
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            patterns = row.get("patterns") or ""
+            if "unavailable" in patterns.lower() or patterns.startswith(GATE_MARKER):
+                continue
+            try:
+                impact = float(row.get("impact") or 0)
+            except ValueError:
+                continue
+            text = f"{row.get('title', '')} {row.get('description', '')}"
+            rows.append((row.get("publishedAt", ""), text, int(abs(impact) >= impact_threshold)))
+    rows.sort(key=lambda r: r[0])
+    return rows
+
+
+# === 2) Modell ===
+class RelevanceModel:
+    """Multinomial naive Bayes over TF-IDF weighted uni-/bigrams.
+
+    Training happens in NumPy; for inference the model collapses to one
+    log-odds weight per term, so scoring an article is a dictionary lookup
+    per token plus a sigmoid.
+    """
+
+    def __init__(self, weights: dict = None, bias: float = 0.0, threshold: float = 0.0, metrics: dict = None):
+        self.weights = weights or {}
+        self.bias = bias
+        self.threshold = threshold
+        self.metrics = metrics or {}
+
+    @classmethod
+    def train(cls, texts: list, labels: list, min_df: int = 2, max_features: int = 20000, alpha: float = 1.0):
+        docs = [_features(tokenize(t)) for t in texts]
+        df = Counter(term for doc in docs for term in doc)
+        vocab = [t for t, n in df.most_common(max_features) if n >= min_df]
+        index = {t: i for i, t in enumerate(vocab)}
+        y = np.asarray(labels, dtype=np.int8)
+
+        # Klassenverteilungen aus sublinearer TF als Koordinatenlisten statt dichter Matrix – Speicher bleibt O(Tokens);
+        # die IDF gewichtet nur einmal, als Feature-Gewicht im Gewichtsvektor unten
+        idf = np.log((1 + len(docs)) / (1 + np.array([df[t] for t in vocab], dtype=np.float64))) + 1
+        cols, values, classes = [], [], []
+        for doc, label in zip(docs, y):
+            for term, count in doc.items():
+                col = index.get(term)
+                if col is not None:
+                    cols.append(col)
+                    values.append(1 + math.log(count))
+                    classes.append(label)
+        totals = np.zeros((2, len(vocab)), dtype=np.float64)
+        np.add.at(totals, (np.asarray(classes, dtype=np.intp), np.asarray(cols, dtype=np.intp)), values)
+
+        counts = totals + alpha
+        log_prob = np.log(counts / counts.sum(axis=1, keepdims=True))
+        priors = np.array([(y == 0).sum() + 1, (y == 1).sum() + 1], dtype=np.float64)
+        delta = (log_prob[1] - log_prob[0]) * idf
+        weights = {t: float(w) for t, w in zip(vocab, delta)}
+        return cls(weights, float(np.log(priors[1] / priors[0])))
+
+    def log_odds(self, text: str) -> float:
+        """Log-odds that the article is market-moving (the threshold lives on this scale,
+        since naive Bayes probabilities saturate at 0/1)."""
+        log_odds = self.bias
+        weights = self.weights
+        for term, count in _features(tokenize(text)).items():
+            w = weights.get(term)
+            if w is not None:
+                log_odds += w * (1 + math.log(count))
+        return log_odds
+
+    def score(self, text: str) -> float:
+        """Probability that the article is market-moving."""
+        return 1 / (1 + math.exp(-max(-50.0, min(50.0, self.log_odds(text)))))
+
+    def is_relevant(self, title: str, description: str) -> bool:
+        return self.log_odds(f"{title} {description}") >= self.threshold
+
+    def save(self, path: Path = MODEL_FILE):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"bias": self.bias, "threshold": self.threshold, "metrics": self.metrics,
+                                   "weights": self.weights}), encoding="utf-8")
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path = MODEL_FILE):
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return cls(data["weights"], data["bias"], data["threshold"], data.get("metrics"))
+
+
+# === 3) Bewertung ===
+def evaluate(scores, labels, threshold: float) -> dict:
+    """Precision/recall of "relevant" against the LLM labels, plus the share of GPT-4 calls skipped."""
+    scores = np.asarray(scores)
+    labels = np.asarray(labels, dtype=bool)
+    passed = scores >= threshold
+    tp = int((passed & labels).sum())
+    fp = int((passed & ~labels).sum())
+    fn = int((~passed & labels).sum())
+    return {
+        "threshold": round(float(threshold), 4),
+        "articles": int(len(labels)),
+        "market_moving": int(labels.sum()),
+        "precision": round(tp / (tp + fp), 4) if tp + fp else 0.0,
+        "recall": round(tp / (tp + fn), 4) if tp + fn else 0.0,
+        "skipped_share": round(float((~passed).mean()), 4) if len(labels) else 0.0,
+        "missed_market_moving": fn,
+    }
+
+
+def pick_threshold(scores, labels, target_recall: float = TARGET_RECALL) -> float:
+    """Highest threshold that still lets ``target_recall`` of market-moving articles through."""
+    positives = np.sort(np.asarray(scores)[np.asarray(labels, dtype=bool)])
+    if not len(positives):
+        return 0.0
+    k = int(math.floor((1 - target_recall) * len(positives)))
+    return float(positives[min(k, len(positives) - 1)])
+
+
+def fit_calibrated(rows: list, target_recall: float = TARGET_RECALL, calibration: float = 0.2) -> RelevanceModel:
+    """Train on the older rows and pick the threshold on the newest ``calibration`` share,
+    which the model has not seen (in-sample scores would overstate recall)."""
+    split = int(len(rows) * (1 - calibration))
+    fit, calib = rows[:split], rows[split:]
+    model = RelevanceModel.train([r[1] for r in fit], [r[2] for r in fit])
+    model.threshold = pick_threshold([model.log_odds(r[1]) for r in calib], [r[2] for r in calib], target_recall)
+    return model
+
+
+def train_and_report(path: Path = RESULTS_CSV, target_recall: float = TARGET_RECALL,
+                     impact_threshold: float = IMPACT_THRESHOLD, holdout: float = 0.2,
+                     model_path: Path = MODEL_FILE, calibration: float = 0.2) -> RelevanceModel:
+    """Train on the older part of the history, pick the threshold on a calibration slice and report
+    on the newest part, then refit the same way on everything and save."""
+    rows = load_labeled_rows(path, impact_threshold)
+    if len(rows) < 20:
+        raise ValueError(f"Only {len(rows)} labeled rows in {path} – need at least 20 to train")
+    split = int(len(rows) * (1 - holdout))
+    train, test = rows[:split], rows[split:]
+
+    model = fit_calibrated(train, target_recall, calibration)
+    threshold = model.threshold
+
+    started = time.perf_counter()
+    test_scores = [model.log_odds(r[1]) for r in test]
+    per_article_us = (time.perf_counter() - started) / max(1, len(test)) * 1e6
+    metrics = evaluate(test_scores, [r[2] for r in test], threshold)
+    metrics["score_microseconds"] = round(per_article_us, 1)
+    metrics["trained_on"] = len(rows)
+    metrics["impact_threshold"] = impact_threshold
+    metrics["trained_at"] = datetime.now(timezone.utc).isoformat()
+
+    print(f"🎯 Relevance gate on {len(test)} held-out articles (|impact| ≥ {impact_threshold:g} = market-moving, "
+          f"{metrics['market_moving']} of them)")
+    print(f"   - Precision: {metrics['precision']:.1%}  Recall: {metrics['recall']:.1%} "
+          f"({metrics['missed_market_moving']} market-moving articles would have been skipped)")
+    print(f"   - GPT-4 calls saved: {metrics['skipped_share']:.1%} at log-odds threshold {threshold:.2f}")
+    print(f"   - Scoring: {per_article_us:.1f} µs per article")
+
+    final = fit_calibrated(rows, target_recall, calibration)
+    final.metrics = metrics
+    final.save(model_path)
+    print(f"💾 Model saved to {model_path} ({len(final.weights)} terms, log-odds threshold {final.threshold:.2f})")
+    return final
+
+
+# === 4) Gate ===
+_model = None
+
+
+def get_gate():
+    """Loaded model if the gate is enabled and trained, else None."""
+    global _model
+    if not RELEVANCE_GATE_ENABLED:
+        return None
+    if _model is None and MODEL_FILE.exists():
+        _model = RelevanceModel.load(MODEL_FILE)
+        print(f"🚦 Relevance gate active (log-odds threshold {_model.threshold:.2f}, "
+              f"recall {_model.metrics.get('recall', 0):.0%} on held-out data)")
+    return _model
+
+
+def light_analysis(title: str, description: str) -> dict:
+    """Result stored for articles the gate skips – neutral, low confidence, no GPT-4 call."""
+    return {
+        "sentiment": "Finance",
+        "markets": "General",
+        "intensity": "low",
+        "impact": "0",
+        "confidence": "low",
+        "patterns": f"{GATE_MARKER} (not market-moving)",
+        "explanation": f"Classified as not market-moving by the local relevance model: {title}",
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train/evaluate the local relevance gate on past LLM analyses.")
+    parser.add_argument("--csv", type=Path, default=RESULTS_CSV)
+    parser.add_argument("--target-recall", type=float, default=TARGET_RECALL)
+    parser.add_argument("--impact-threshold", type=float, default=IMPACT_THRESHOLD)
+    parser.add_argument("--holdout", type=float, default=0.2, help="Newest share of rows used for evaluation")
+    parser.add_argument("--calibration", type=float, default=0.2,
+                        help="Newest share of the training rows used to pick the threshold")
+    parser.add_argument("--model", type=Path, default=MODEL_FILE)
+    args = parser.parse_args()
+    train_and_report(args.csv, args.target_recall, args.impact_threshold, args.holdout, args.model, args.calibration)
@@ -0,0 +1,96 @@
+# backend/replay.py - Archivierte Roh-Payloads offline erneut analysieren (dedup → analyze → store)
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
+from dedup import dedupe_articles, canonical_url
+from raw_archive import ARCHIVE_DIR, archived_days, iter_articles
+from fast_parse import iso_timestamps
+from news_ingest import OUTPUT, analyze_article, append_to_csv, load_existing_entries, load_near_index
+
+
+def _seen_keys(article: dict):
+    if article.get("id"):
+        yield ("id", article["id"])
+    url = canonical_url(article.get("url", ""))
+    if url:
+        yield ("url", url)
+
+
+def replay(start: date, end: date, workers: int = 4, output: Path = OUTPUT, archive_dir: Path = ARCHIVE_DIR,
+           reuse_near_duplicates: bool = False, dry_run: bool = False) -> dict:
+    """Stream archived days through the ingest pipeline.
+
+    Days are processed one at a time so memory stays bounded by the size of
+    a single partition; duplicates are tracked across days.
+    """
+    existing_entries = load_existing_entries(output)
+    near_index = load_near_index(output) if reuse_near_duplicates else None
+    seen = set()
+    totals = {"days": 0, "raw": 0, "unique": 0, "stored": 0, "analyzed": 0, "failed": 0}
+    started = time.perf_counter()
+
+    def _analyze(article):
+        try:
+            analyze_article(article, near_index)
+            return article, None
+        except Exception as e:
+            return article, e
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="replay") as pool:
+        for day, path in archived_days(start, end, archive_dir):
+            raw = list(iter_articles(path))
+            articles = [a for a in dedupe_articles(raw) if not any(k in seen for k in _seen_keys(a))]
+            for a in articles:
+                seen.update(_seen_keys(a))
+
+            # Schon in ``output`` gespeicherte Artikel nicht erneut (kostenpflichtig) analysieren
+            published = iso_timestamps([a.get("datetime", 0) for a in articles])
+            fresh = [a for a, p in zip(articles, published)
+                     if (a.get("headline", "").strip(), p) not in existing_entries]
+
+            totals["days"] += 1
+            totals["raw"] += len(raw)
+            totals["unique"] += len(articles)
+            totals["stored"] += len(articles) - len(fresh)
+            print(f"📂 {day}: {len(raw)} raw → {len(articles)} unique articles, {len(fresh)} not yet in {output.name}")
+            articles = fresh
+
+            if dry_run or not articles:
+                continue
+
+            analyzed = []
+            for article, error in pool.map(_analyze, articles):
+                if error:
+                    print(f"❌ Analysis failed: {article.get('headline', '')[:30]}... Error: {error}")
+                    totals["failed"] += 1
+                else:
+                    analyzed.append(article)
+
+            analyzed.sort(key=lambda x: x.get("datetime", 0), reverse=True)
+            append_to_csv(analyzed, output, existing_entries)
+            totals["analyzed"] += len(analyzed)
+
+    elapsed = time.perf_counter() - started
+    rate = totals["unique"] / elapsed if elapsed > 0 else 0.0
+    print(f"✅ Replay finished: {totals['days']} days, {totals['raw']} raw, {totals['unique']} unique, "
+          f"{totals['stored']} already stored, {totals['analyzed']} analyzed, {totals['failed']} failed "
+          f"in {elapsed:.1f}s ({rate:.1f} articles/s)")
+    return totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay archived Finnhub payloads through dedup → analyze → store.")
+    parser.add_argument("--start", type=date.fromisoformat, required=True, help="First day (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, help="Last day (YYYY-MM-DD), defaults to --start")
+    parser.add_argument("--workers", type=int, default=4, help="Parallel analysis workers")
+    parser.add_argument("--output", type=Path, default=OUTPUT, help="Target CSV (e.g. a separate file for a new prompt)")
+    parser.add_argument("--archive-dir", type=Path, default=ARCHIVE_DIR)
+    parser.add_argument("--reuse-near-duplicates", action="store_true",
+                        help="Reuse analyses of near-duplicate stories instead of re-analyzing them")
+    parser.add_argument("--dry-run", action="store_true", help="Only read and dedupe, do not analyze")
+    args = parser.parse_args()
+    replay(args.start, args.end or args.start, args.workers, args.output, args.archive_dir,
+           args.reuse_near_duplicates, args.dry_run)
@@ -0,0 +1,313 @@
+# backend/structured_output.py - Schema-erzwungene JSON-Antworten, toleranter (Streaming-)Parser und typisierte Validierung
+
+import json
+import math
+import os
+import re
+import threading
+
+IMPACT_MIN, IMPACT_MAX = -10, 10
+CONFIDENCE_LEVELS = ("high", "medium", "low")
+_NEGATIONS = {"not", "no", "never", "neither", "nor"}
+# "auto" wählt json_schema/json_object je nach Modell; "none" schickt kein response_format
+RESPONSE_FORMAT_MODE = os.environ.get("OPENAI_RESPONSE_FORMAT", "auto")
+
+# === 1) Schema ===
+ANALYSIS_PROPERTIES = {
+    "impact": {"type": "number", "description": "-10 (very bearish) to +10 (very bullish)"},
+    "confidence": {"type": "string", "enum": list(CONFIDENCE_LEVELS)},
+    "markets": {"type": "string", "description": "Affected markets or sectors, comma-separated"},
+    "patterns": {"type": "string", "description": "Similar historical events, max 100 words"},
+    "explanation": {"type": "string", "description": "Detailed reasoning, at least 150 words"},
+}
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": ANALYSIS_PROPERTIES,
+    "required": list(ANALYSIS_PROPERTIES),
+    "additionalProperties": False,
+}
+# Mehrere Artikel pro Request: Top-Level muss ein Objekt sein, daher {"results": [...]}
+BATCH_SCHEMA = {
+    "type": "object",
+    "properties": {"results": {"type": "array", "items": {
+        "type": "object",
+        "properties": {"id": {"type": "string"}, **ANALYSIS_PROPERTIES},
+        "required": ["id", *ANALYSIS_PROPERTIES],
+        "additionalProperties": False,
+    }}},
+    "required": ["results"],
+    "additionalProperties": False,
+}
+
+# Modelle mit Structured Outputs (json_schema) bzw. nur JSON-Modus
+_SCHEMA_MODELS = ("gpt-4o", "gpt-4.1", "gpt-5", "o1", "o3", "o4")
+_JSON_MODE_MODELS = ("gpt-4-turbo", "gpt-4-1106", "gpt-4-0125", "gpt-3.5-turbo")
+
+
+def response_format(model: str, batch: bool = False, mode: str = RESPONSE_FORMAT_MODE):
+    """``response_format`` argument for ``model``, or None if it supports neither schema nor JSON mode."""
+    if mode == "none":
+        return None
+    if mode == "json_schema" or (mode == "auto" and model.startswith(_SCHEMA_MODELS)):
+        return {"type": "json_schema", "json_schema": {
+            "name": "news_analysis_batch" if batch else "news_analysis", "strict": True,
+            "schema": BATCH_SCHEMA if batch else ANALYSIS_SCHEMA}}
+    if mode == "json_object" or (mode == "auto" and model.startswith(_JSON_MODE_MODELS)):
+        return {"type": "json_object"}
+    return None
+
+
+def format_kwargs(model: str, batch: bool = False) -> dict:
+    """Extra ``chat.completions.create`` kwargs (empty if the model has no structured output)."""
+    fmt = response_format(model, batch)
+    return {"response_format": fmt} if fmt else {}
+
+
+# === 2) Toleranter Parser ===
+class TolerantJSONParser:
+    """Incremental JSON parser that can close a truncated document.
+
+    ``feed`` takes the response text chunk by chunk (e.g. from a streamed
+    completion); text before the first ``{``/``[`` (code fences, prose) is
+    skipped. ``value`` returns ``(parsed, repaired)`` at any point: a cut-off
+    string value is closed, an unfinished key or number is dropped, and open
+    objects/arrays are closed.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.length = 0
+        self.start = None
+        self.end = None
+        self.stack = []  # [Typ ("{"/"["), Zustand ("key", "colon", "value", "after")]
+        self.in_string = False
+        self.string_is_key = False
+        self.escape = False
+        self.token = ""
+        self.safe_cut = None
+        self.safe_closers = ""
+
+    def _closers(self) -> str:
+        return "".join("}" if kind == "{" else "]" for kind, _ in reversed(self.stack))
+
+    def _value_done(self, cut: int):
+        if not self.stack:
+            self.end = cut
+            return
+        self.stack[-1][1] = "after"
+        self.safe_cut, self.safe_closers = cut, self._closers()
+
+    def feed(self, chunk: str):
+        i = self.length
+        self.chunks.append(chunk)
+        self.length += len(chunk)
+        for c in chunk:
+            self._step(c, i)
+            i += 1
+        return self
+
+    def _step(self, c: str, i: int):
+        if self.end is not None:
+            return
+        if self.start is None:
+            if c in "{[":
+                self.start = i
+                self.stack.append([c, "key" if c == "{" else "value"])
+                self.safe_cut, self.safe_closers = i + 1, self._closers()
+            return
+        if self.in_string:
+            if self.escape:
+                self.escape = False
+            elif c == "\\":
+                self.escape = True
+            elif c == '"':
+                self.in_string = False
+                if self.string_is_key:
+                    self.stack[-1][1] = "colon"
+                else:
+                    self._value_done(i + 1)
+            return
+        if self.token:
+            if c.isalnum() or c in "+-.":
+                self.token += c
+                return
+            self.token = ""
+            self._value_done(i)
+        if c.isspace():
+            return
+        if c == '"':
+            self.in_string = True
+            self.string_is_key = self.stack[-1] == ["{", "key"]
+        elif c in "{[":
+            self.stack.append([c, "key" if c == "{" else "value"])
+            self.safe_cut, self.safe_closers = i + 1, self._closers()
+        elif c in "}]":
+            self.stack.pop()
+            self._value_done(i + 1)
+        elif c == ":":
+            self.stack[-1][1] = "value"
+        elif c == ",":
+            self.stack[-1][1] = "key" if self.stack[-1][0] == "{" else "value"
+        else:
+            self.token = c
+
+    def value(self):
+        text = "".join(self.chunks)
+        if self.start is None:
+            raise ValueError("no JSON object in response")
+        if self.end is not None:
+            return json.loads(text[self.start:self.end]), False
+
+        candidates = []
+        if self.in_string and not self.string_is_key:
+            # Abgeschnittener String-Wert (meist die explanation) wird geschlossen statt verworfen
+            tail = text[self.start:-1] if self.escape else text[self.start:]
+            candidates.append(tail + '"' + self._closers())
+        elif self.token and self.stack and self.stack[-1][1] == "value":
+            candidates.append(text[self.start:] + self._closers())
+        candidates.append(text[self.start:self.safe_cut] + self.safe_closers)
+        for candidate in candidates:
+            try:
+                return json.loads(candidate), True
+            except json.JSONDecodeError:
+                continue
+        raise ValueError("response could not be repaired")
+
+
+def parse_json(text: str):
+    """``(parsed, repaired)`` for a complete, fenced or truncated JSON response.
+
+    Prose before the answer may contain braces of its own, so every ``{``/``[``
+    is tried as a start: the first one that parses completely wins, otherwise
+    the first non-empty repaired document.
+    """
+    text = text or ""
+    repaired_fallback = None
+    for match in re.finditer(r"[{\[]", text):
+        try:
+            parsed, repaired = TolerantJSONParser().feed(text[match.start():]).value()
+        except (ValueError, IndexError):
+            continue
+        if not isinstance(parsed, (dict, list)):
+            continue
+        if not repaired:
+            return parsed, False
+        if repaired_fallback is None and parsed:
+            repaired_fallback = (parsed, True)
+    if repaired_fallback is not None:
+        return repaired_fallback
+    raise ValueError("no JSON object in response")
+
+
+# === 3) Typisierte Validierung ===
+class AnalysisValidationError(ValueError):
+    pass
+
+
+def validate_analysis(obj) -> tuple:
+    """Typed check of one analysis; returns ``(clean, coerced)``.
+
+    ``impact`` must be a finite number (clamped to [-10, 10]) and ``explanation``
+    non-empty, otherwise ``AnalysisValidationError``. Recoverable deviations
+    (list of markets, unknown confidence, missing patterns) are normalized
+    and reported as ``coerced``.
+    """
+    if not isinstance(obj, dict):
+        raise AnalysisValidationError(f"expected an object, got {type(obj).__name__}")
+    coerced = False
+
+    impact = obj.get("impact")
+    if isinstance(impact, str):
+        try:
+            impact = float(impact.strip().lstrip("+"))
+            coerced = True
+        except ValueError:
+            raise AnalysisValidationError(f"impact is not a number: {obj.get('impact')!r}")
+    if isinstance(impact, bool) or not isinstance(impact, (int, float)) or not math.isfinite(impact):
+        raise AnalysisValidationError(f"impact is not a number: {impact!r}")
+    if not IMPACT_MIN <= impact <= IMPACT_MAX:
+        impact = max(IMPACT_MIN, min(IMPACT_MAX, impact))
+        coerced = True
+    impact = int(impact) if float(impact).is_integer() else round(float(impact), 1)
+
+    explanation = obj.get("explanation")
+    if not isinstance(explanation, str) or not explanation.strip():
+        raise AnalysisValidationError("explanation is missing")
+
+    confidence = str(obj.get("confidence") or "").strip().lower()
+    if confidence not in CONFIDENCE_LEVELS:
+        # Nur eindeutige ganze Wörter übernehmen ("High confidence"); "not high", "medium-high" → low
+        words = re.findall(r"[a-z']+", confidence)
+        levels = {w for w in words if w in CONFIDENCE_LEVELS}
+        negated = any(w in _NEGATIONS or w.endswith("n't") for w in words)
+        confidence = levels.pop() if len(levels) == 1 and not negated else "low"
+        coerced = True
+
+    markets = obj.get("markets")
+    if isinstance(markets, list):
+        markets = ", ".join(str(m) for m in markets)
+        coerced = True
+    if not isinstance(markets, str) or not markets.strip():
+        markets = "Unknown"
+        coerced = True
+
+    patterns = obj.get("patterns")
+    if not isinstance(patterns, str) or not patterns.strip():
+        patterns = "No historical patterns identified"
+        coerced = True
+
+    return {"impact": impact, "confidence": confidence, "markets": markets.strip(),
+            "patterns": patterns.strip(), "explanation": explanation.strip()}, coerced
+
+
+# === 4) Zähler ===
+PARSE_STATS = {"responses": 0, "valid": 0, "repaired": 0, "coerced": 0, "invalid": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(**deltas):
+    with _stats_lock:
+        for key, value in deltas.items():
+            PARSE_STATS[key] += value
+
+
+def parse_analysis(raw: str):
+    """Parse and validate one analysis response; returns the clean dict or None (counted as invalid)."""
+    try:
+        parsed, repaired = parse_json(raw)
+        clean, coerced = validate_analysis(parsed)
+    except ValueError as e:
+        _count(responses=1, invalid=1)
+        print(f"⚠️ Unusable analysis response: {e}")
+        return None
+    _count(responses=1, valid=1, repaired=int(repaired), coerced=int(coerced))
+    return clean
+
+
+def parse_batch_analyses(raw: str) -> dict:
+    """``{id: clean}`` for every valid element of a ``{"results": [...]}`` or bare array response."""
+    try:
+        parsed, repaired = parse_json(raw)
+    except ValueError as e:
+        _count(responses=1, invalid=1)
+        print(f"⚠️ Unusable batch response: {e}")
+        return {}
+    if isinstance(parsed, dict):
+        parsed = parsed.get("results") or parsed.get("articles") or []
+    results = {}
+    for item in parsed if isinstance(parsed, list) else []:
+        try:
+            clean, coerced = validate_analysis(item)
+        except AnalysisValidationError:
+            _count(responses=1, invalid=1)
+            continue
+        _count(responses=1, valid=1, repaired=int(repaired), coerced=int(coerced))
+        results[str(item.get("id"))] = clean
+    return results
+
+
+def parse_summary() -> dict:
+    with _stats_lock:
+        s = dict(PARSE_STATS)
+    s["failure_rate"] = round(s["invalid"] / s["responses"], 4) if s["responses"] else 0.0
+    return s
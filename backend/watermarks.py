@@ -0,0 +1,115 @@
+# backend/watermarks.py - Persistierte High-Water-Marks für inkrementelles Ingest
+
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Pfad zur Zustandsdatei (wird vom Workflow zusammen mit der CSV committet)
+STATE_FILE = Path(__file__).parent.parent / "data" / "ingest_state.json"
+
+
+# === 1) Zustand laden / speichern ===
+def load_state(path: Path = STATE_FILE) -> dict:
+    try:
+        if path.exists() and path.read_text().strip():
+            state = json.loads(path.read_text())
+        else:
+            state = {}
+    except Exception as e:
+        print(f"⚠️  Konnte Ingest-Zustand nicht laden ({path}): {e}")
+        state = {}
+    state.setdefault("categories", {})
+    return state
+
+
+def save_state(state: dict, path: Path = STATE_FILE):
+    """Write the state atomically so an interrupted run never leaves a half-written file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    state["updated_at"] = datetime.now(timezone.utc).isoformat()
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(state, indent=4))
+    os.replace(tmp, path)
+
+
+# === 2) Watermarks lesen ===
+def get_watermark(state: dict, category: str):
+    return state.get("categories", {}).get(category)
+
+
+def is_newer(article: dict, watermark: dict) -> bool:
+    """True if the article lies above the watermark (by Finnhub id, else by timestamp)."""
+    article_id = article.get("id")
+    if article_id and watermark.get("last_id"):
+        return article_id > watermark["last_id"]
+    return article.get("datetime", 0) > watermark.get("last_datetime", 0)
+
+
+def request_params(state: dict, categories) -> dict:
+    """Build per-category extra query params (``minId``) for ``fetch_categories``."""
+    params = {}
+    for category in categories:
+        watermark = get_watermark(state, category)
+        if watermark and watermark.get("last_id"):
+            params[category] = {"minId": watermark["last_id"]}
+    return params
+
+
+# === 3) Watermarks fortschreiben ===
+def _category_keys(article: dict):
+    """Yield ``(category, (id, datetime))`` for every category an article came from."""
+    source_ids = article.get("source_ids") or {article.get("source_category"): article.get("id")}
+    for cat, article_id in source_ids.items():
+        if cat:
+            yield cat, (article_id or 0, article.get("datetime", 0))
+
+
+def _first_failures(failed) -> dict:
+    first_failure = {}
+    for a in failed:
+        for cat, key in _category_keys(a):
+            if cat not in first_failure or key < first_failure[cat]:
+                first_failure[cat] = key
+    return first_failure
+
+
+def advance_watermarks(state: dict, processed: list, failed: list = ()) -> dict:
+    """Move each category's watermark past the processed articles.
+
+    If an article of a category failed, the watermark stops just below it so
+    the next run picks it up again. Everything above it is fetched again too;
+    callers drop those already stored (``split_stored`` in news_ingest) before
+    analyzing, so they are not analyzed twice.
+    """
+    categories = state.setdefault("categories", {})
+    first_failure = _first_failures(failed)
+
+    for a in processed:
+        for cat, key in _category_keys(a):
+            if cat in first_failure and key >= first_failure[cat]:
+                continue
+            current = categories.get(cat, {})
+            if key > (current.get("last_id", 0), current.get("last_datetime", 0)):
+                categories[cat] = {"last_id": key[0], "last_datetime": key[1]}
+
+    return state
+
+
+def held_back(state: dict, processed: list, failed: list = ()) -> list:
+    """Processed articles a watermark could not cover yet because an older one was still open.
+
+    Articles blocked by a failure are left out – the next run fetches them
+    again anyway – so a streaming caller only has to carry the ones above
+    still-pending articles into its next ``advance_watermarks`` call.
+    """
+    categories = state.get("categories", {})
+    first_failure = _first_failures(failed)
+    held = []
+    for a in processed:
+        for cat, key in _category_keys(a):
+            current = categories.get(cat, {})
+            blocked = cat in first_failure and key >= first_failure[cat]
+            if not blocked and key > (current.get("last_id", 0), current.get("last_datetime", 0)):
+                held.append(a)
+                break
+    return held
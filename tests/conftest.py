@@ -0,0 +1,6 @@
+# tests/conftest.py - Backend-Module liegen flach in backend/ und importieren sich gegenseitig ohne Paketpräfix
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
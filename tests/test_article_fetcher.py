@@ -0,0 +1,86 @@
+# tests/test_article_fetcher.py - ArticleFetcher gegen den lokalen Artikel-Server aus bench_article_fetcher
+
+import threading
+import pytest
+from article_fetcher import ArticleFetcher, ArticleCache
+from bench_article_fetcher import start_article_server
+
+
+@pytest.fixture
+def server():
+    server = start_article_server(latency_ms=20, paragraphs=4)
+    yield server
+    server.shutdown()
+
+
+def _urls(server, articles=12, domains=2, missing=2):
+    port = server.server_address[1]
+    # 127.0.0.x sind getrennte "Domains" für das Limit pro Domain
+    good = [f"http://127.0.0.{1 + i % domains}:{port}/news/{i}" for i in range(articles)]
+    bad = [f"http://127.0.0.1:{port}/news/{i}/missing" for i in range(missing)]
+    return good, bad
+
+
+def test_fetch_many_extracts_text_and_respects_domain_limit(server, tmp_path):
+    good, bad = _urls(server)
+    fetcher = ArticleFetcher(ArticleCache(tmp_path), concurrency=8, per_domain=2)
+    try:
+        bodies = fetcher.fetch_many(good + bad)
+    finally:
+        fetcher.close()
+
+    assert all(bodies[url] and bodies[url].startswith("Story") for url in good)
+    assert "Subscribe" not in bodies[good[0]]
+    assert all(bodies[url] is None for url in bad)
+    assert fetcher.stats["downloaded"] == len(good)
+    assert fetcher.stats["failed"] == len(bad)
+    assert server.requests == len(good) + len(bad)
+    assert 1 <= server.peak <= 2
+
+
+def test_second_pass_is_served_from_cache(server, tmp_path):
+    good, bad = _urls(server)
+    first = ArticleFetcher(ArticleCache(tmp_path), concurrency=8, per_domain=2)
+    try:
+        cold = first.fetch_many(good + bad)
+    finally:
+        first.close()
+    requests_after_cold = server.requests
+
+    second = ArticleFetcher(ArticleCache(tmp_path), concurrency=8, per_domain=2)
+    try:
+        warm = second.fetch_many(good + bad)
+    finally:
+        second.close()
+
+    # Texte und dauerhafte 404-Fehler kommen aus dem Cache, kein weiterer Request
+    assert warm == cold
+    assert server.requests == requests_after_cold
+    assert second.cache.hits == len(good) + len(bad)
+    assert second.cache.misses == 0
+    assert second.stats["downloaded"] == 0
+
+
+def test_cache_io_runs_off_the_event_loop(server, tmp_path):
+    good, bad = _urls(server, articles=4, missing=1)
+    cache = ArticleCache(tmp_path)
+    threads = []
+    lookup, store = cache.lookup, cache.store
+
+    def recording_lookup(url):
+        threads.append(threading.current_thread().name)
+        return lookup(url)
+
+    def recording_store(*args):
+        threads.append(threading.current_thread().name)
+        return store(*args)
+
+    cache.lookup, cache.store = recording_lookup, recording_store
+    fetcher = ArticleFetcher(cache, concurrency=4, per_domain=2)
+    try:
+        fetcher.fetch_many(good + bad)
+    finally:
+        fetcher.close()
+
+    assert len(threads) == 2 * (len(good) + len(bad))
+    assert "article-fetcher" not in threads
@@ -0,0 +1,93 @@
+# tests/test_bulk_analyzer.py - Bulk-Analyse (submit → collect → merge) gegen den lokalen Batch-API-Ersatz
+
+import csv
+import json
+import random
+import openai
+import pytest
+import bulk_analyzer
+import mock_openai_batch
+from analysis_cache import AnalysisCache
+from bulk_analyzer import pending_analysis, request_id, select_rows, write_requests, submit, collect
+from mock_openai_batch import start_mock_batch_server
+
+FIELDNAMES = ["title", "description", "publishedAt", "sentiment", "markets", "intensity", "impact",
+              "confidence", "patterns", "explanation", "image"]
+DONE = {"sentiment": "Finance", "markets": "Gold", "intensity": "high", "impact": "5", "confidence": "high",
+        "patterns": "Earlier rallies", "explanation": "Already analyzed"}
+
+
+@pytest.fixture
+def server(monkeypatch):
+    # Fester Seed, damit immer dieselben Requests im Batch scheitern
+    monkeypatch.setattr(mock_openai_batch, "random", random.Random(7))
+    server = start_mock_batch_server(completion_seconds=0.2, fail_rate=0.3)
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = AnalysisCache(tmp_path / "analysis_cache.db")
+    monkeypatch.setattr(bulk_analyzer, "get_cache", lambda: cache)
+    return cache
+
+
+def _write_csv(path, rows: int = 30):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        for i in range(rows):
+            row = {"title": f"Story {i}", "description": f"Description {i}",
+                   "publishedAt": f"2026-10-01T{i % 24:02d}:00:00+00:00", "image": ""}
+            # Jede dritte Zeile ist schon analysiert, der Rest wartet auf die Bulk-Analyse
+            row.update(DONE if i % 3 == 0 else pending_analysis(row["title"]))
+            writer.writerow(row)
+
+
+def _failed_ids(client, server) -> set:
+    failed = set()
+    for batch in server.batches.values():
+        if batch["error_file_id"]:
+            for line in client.files.content(batch["error_file_id"]).text.splitlines():
+                if line.strip():
+                    failed.add(json.loads(line)["custom_id"])
+    return failed
+
+
+def test_submit_and_collect_merge_results_and_keep_failed_placeholders(server, cache, tmp_path):
+    csv_path, jobs_path = tmp_path / "results.csv", tmp_path / "bulk" / "jobs.json"
+    _write_csv(csv_path)
+    client = openai.OpenAI(api_key="sk-test", base_url=server.base_url)
+
+    rows = select_rows(csv_path)
+    assert len(rows) == 20
+    for path in write_requests(rows, jobs_path.parent):
+        submit(client, path, csv_path, jobs_path)
+    totals = collect(client, wait=True, poll_seconds=0.05, jobs_path=jobs_path)
+
+    failed = _failed_ids(client, server)
+    assert 0 < len(failed) < 20
+    assert totals["merged_jobs"] == 1
+    assert totals["results"] == 20 - len(failed)
+    assert totals["failed"] == len(failed)
+    assert totals["rows_updated"] == 20 - len(failed)
+
+    with open(csv_path, encoding="utf-8") as f:
+        merged = list(csv.DictReader(f))
+    assert [r["title"] for r in merged] == [f"Story {i}" for i in range(30)]
+    for i, row in enumerate(merged):
+        key = request_id(row["title"], row["description"])
+        if i % 3 == 0:
+            assert {k: row[k] for k in DONE} == DONE
+        elif key in failed:
+            assert row["patterns"] == bulk_analyzer.PENDING_PATTERNS
+            assert cache.get(key) is None
+        else:
+            assert row["explanation"] == f"Bulk analysis of: {row['title']}"
+            assert row["confidence"] == "medium"
+            assert cache.get(key)["explanation"] == row["explanation"]
+
+    # Nur die gescheiterten Platzhalter bleiben für den nächsten Lauf übrig; der Job ist erledigt
+    assert {request_id(r["title"], r["description"]) for r in select_rows(csv_path)} == failed
+    assert collect(client, jobs_path=jobs_path)["merged_jobs"] == 0